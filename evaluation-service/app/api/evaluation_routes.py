@@ -1,7 +1,25 @@
 import logging
-from fastapi import APIRouter, HTTPException
-from app.schemas.evaluation_schemas import EvaluationRequest, EvaluationResponse
+import os
+from typing import AsyncIterator, Optional
+from fastapi import APIRouter, Header, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from app.schemas.evaluation_schemas import (
+    EvaluationRequest,
+    EvaluationResponse,
+    BatchEvaluationRequest,
+    BatchEvaluationResponse,
+    BatchStreamResult,
+    BatchStreamSummary,
+    EvaluationJobRequest,
+    EvaluationJob,
+    StoredEvaluationList,
+    ExamRegistrationRequest,
+    ExamRegistration,
+)
 from app.services.evaluation_service import EvaluationService
+from app.services.job_queue import JobRunner
+from app.services.result_store import result_store, IdempotencyConflictError
+from app.services.question_bank import question_bank, QuestionConflictError, UnknownQuestionError
 
 # Configure logging
 logging.basicConfig(
@@ -14,23 +32,213 @@ router = APIRouter()
 
 # Initialize Service (Singleton pattern effectively)
 evaluation_service = EvaluationService()
+# Background grading of queued jobs; started / stopped by the app lifespan
+job_runner = JobRunner(evaluation_service)
+
+# Largest batch accepted in one request (a 40-student, 10-question quiz = 400)
+MAX_BATCH_SIZE = int(os.getenv("EVALUATION_MAX_BATCH_SIZE", "500"))
+# Largest job accepted by POST /evaluate/jobs (a whole exam)
+MAX_JOB_SIZE = int(os.getenv("EVALUATION_MAX_JOB_SIZE", "10000"))
+
+# Most questions accepted by one POST /evaluate/exams
+MAX_EXAM_QUESTIONS = int(os.getenv("EVALUATION_MAX_EXAM_QUESTIONS", "1000"))
+# Most stored results returned by one GET /evaluate/results page
+MAX_RESULTS_PAGE = int(os.getenv("EVALUATION_MAX_RESULTS_PAGE", "1000"))
 
 @router.post("/", response_model=EvaluationResponse)
-async def evaluate(request: EvaluationRequest):
+async def evaluate(request: EvaluationRequest, idempotency_key: Optional[str] = Header(None)):
     """
     Strict Contract-Driven Evaluation Pipeline.
     Delegates all logic to EvaluationService.
     """
+    if request.idempotency_key is None:
+        request.idempotency_key = idempotency_key
     try:
-        logger.info(f"Received evaluation request for Q: {request.question[:30]}...")
+        logger.info(f"Received evaluation request for Q: {(request.question or request.question_id or '')[:30]}...")
         
         response = await evaluation_service.evaluate_student_answer(request)
         
         logger.info(f"Evaluation complete. Score: {response.final_score}, Grade: {response.grade}")
         return response
 
+    except IdempotencyConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except UnknownQuestionError as e:
+        raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
         logger.error(f"❌ SERVICE ERROR: {str(e)}", exc_info=True)
         # In a real production app, we might want to return a cleaner error or a fallback
         # But for now, 500 is appropriate for unhandled orchestration errors.
         raise HTTPException(status_code=500, detail=f"Evaluation failed: {str(e)}")
+
+
+@router.post("/batch", response_model=BatchEvaluationResponse)
+async def evaluate_batch(request: BatchEvaluationRequest):
+    """
+    Grades a list of answers concurrently.
+    Per-item failures are reported inline; results keep the input order.
+    """
+    if len(request.evaluations) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: {len(request.evaluations)} items (max {MAX_BATCH_SIZE})."
+        )
+
+    logger.info(f"Received batch evaluation request with {len(request.evaluations)} items")
+
+    results   = await evaluation_service.evaluate_batch(request.evaluations)
+    succeeded = sum(1 for r in results if r.status == "ok")
+
+    logger.info(f"Batch evaluation complete. {succeeded}/{len(results)} succeeded")
+    return BatchEvaluationResponse(
+        results=results,
+        succeeded=succeeded,
+        failed=len(results) - succeeded,
+    )
+
+
+@router.post("/batch/stream")
+async def evaluate_batch_stream(request: BatchEvaluationRequest, http_request: Request, format: Optional[str] = None):
+    """
+    POST /evaluate/batch, streamed: each item's result is sent the moment it
+    is graded, tagged with its item_id and index, followed by a summary.
+    NDJSON by default; server-sent events with ?format=sse or
+    `Accept: text/event-stream`.
+    """
+    if len(request.evaluations) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: {len(request.evaluations)} items (max {MAX_BATCH_SIZE})."
+        )
+    if format is None:
+        format = "sse" if "text/event-stream" in http_request.headers.get("accept", "") else "ndjson"
+    if format not in ("ndjson", "sse"):
+        raise HTTPException(status_code=400, detail=f"Unknown stream format '{format}' (ndjson | sse).")
+
+    def encode(event: str, payload: str) -> str:
+        if format == "sse":
+            return f"event: {event}\ndata: {payload}\n\n"
+        return payload + "\n"
+
+    async def stream() -> AsyncIterator[str]:
+        logger.info(f"Received streaming batch request with {len(request.evaluations)} items")
+        succeeded = failed = 0
+        error = None
+        try:
+            async for index, result in evaluation_service.evaluate_batch_stream(request.evaluations):
+                if result.status == "ok":
+                    succeeded += 1
+                else:
+                    failed += 1
+                item = BatchStreamResult(index=index, **result.model_dump())
+                yield encode("result", item.model_dump_json())
+        except Exception as e:
+            # Headers are already sent — report the failure in-band
+            logger.error(f"❌ Streaming batch failed: {e}", exc_info=True)
+            error = f"Evaluation failed: {e}"
+        summary = BatchStreamSummary(succeeded=succeeded, failed=failed, error=error)
+        logger.info(f"Streaming batch complete. {succeeded}/{len(request.evaluations)} succeeded")
+        yield encode("error" if error else "done", summary.model_dump_json())
+
+    media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+    # No proxy buffering, or the client would still get everything at the end
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return StreamingResponse(stream(), media_type=media_type, headers=headers)
+
+
+@router.post("/jobs", response_model=EvaluationJob, status_code=202)
+async def create_job(request: EvaluationJobRequest):
+    """
+    Queues a list of answers for background grading and returns at once.
+    Poll GET /evaluate/jobs/{job_id} for progress and results, or pass a
+    webhook_url to be notified when the job completes.
+    """
+    if not request.evaluations:
+        raise HTTPException(status_code=422, detail="A job needs at least one evaluation.")
+    if len(request.evaluations) > MAX_JOB_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Job too large: {len(request.evaluations)} items (max {MAX_JOB_SIZE})."
+        )
+
+    job_id = await job_runner.submit(request.evaluations, request.webhook_url)
+    return await job_runner.get(job_id, include_results=False)
+
+
+@router.get("/jobs/{job_id}", response_model=EvaluationJob)
+async def get_job(job_id: str, include_results: bool = True):
+    """
+    Job progress; `results` holds every item graded so far, in input order.
+    """
+    job = await job_runner.get(job_id, include_results=include_results)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found.")
+    return job
+
+
+@router.get("/results", response_model=StoredEvaluationList)
+async def get_results(
+    student_id: Optional[str] = None,
+    exam_id: Optional[str] = None,
+    question_id: Optional[str] = None,
+    all_versions: bool = False,
+    limit: int = MAX_RESULTS_PAGE,
+    offset: int = 0,
+):
+    """
+    Stored results for a student, exam and/or question, newest first.
+    Only results of the current pipeline version unless all_versions=true.
+    """
+    if not (student_id or exam_id or question_id):
+        raise HTTPException(status_code=422, detail="Filter by at least one of student_id, exam_id, question_id.")
+    if not 1 <= limit <= MAX_RESULTS_PAGE or offset < 0:
+        raise HTTPException(status_code=422, detail=f"limit must be 1-{MAX_RESULTS_PAGE} and offset >= 0.")
+
+    # Results saved moments ago may still be in the write-behind backlog
+    await result_store.flush()
+    results = await result_store.query(
+        student_id=student_id,
+        exam_id=exam_id,
+        question_id=question_id,
+        pipeline_version=None if all_versions else evaluation_service.pipeline_version,
+        limit=limit,
+        offset=offset,
+    )
+    return StoredEvaluationList(results=results, count=len(results))
+
+
+@router.post("/exams", response_model=ExamRegistration)
+async def register_exam(request: ExamRegistrationRequest):
+    """
+    Registers (or updates) an exam's questions, reference answers and marks
+    and precomputes everything derived from the reference answers.
+    Evaluation requests can then send just a question_id and the answer.
+    """
+    if not request.questions:
+        raise HTTPException(status_code=422, detail="An exam needs at least one question.")
+    if len(request.questions) > MAX_EXAM_QUESTIONS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Exam too large: {len(request.questions)} questions (max {MAX_EXAM_QUESTIONS})."
+        )
+    question_ids = [q.question_id for q in request.questions]
+    if len(set(question_ids)) != len(question_ids):
+        raise HTTPException(status_code=422, detail="question_id values must be unique.")
+
+    logger.info(f"Registering exam {request.exam_id} with {len(request.questions)} questions")
+    try:
+        questions = await evaluation_service.register_exam(request.exam_id, request.questions)
+    except QuestionConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return ExamRegistration(exam_id=request.exam_id, questions=questions, count=len(questions))
+
+
+@router.get("/exams/{exam_id}", response_model=ExamRegistration)
+async def get_exam(exam_id: str):
+    """
+    The exam's registered questions.
+    """
+    questions = [evaluation_service.registered_question(stored) for stored in question_bank.exam(exam_id)]
+    if not questions:
+        raise HTTPException(status_code=404, detail=f"Exam {exam_id} not found.")
+    return ExamRegistration(exam_id=exam_id, questions=questions, count=len(questions))
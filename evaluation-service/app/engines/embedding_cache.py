@@ -0,0 +1,125 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Iterable, List, Optional
+
+import numpy as np
+
+from app.utils.metrics import counter, gauge
+
+
+# ── Cache metrics (labelled by cache name, e.g. "reference") ─────────────────
+CACHE_HITS = counter(
+    "embedding_cache_hits_total",
+    "Embedding cache lookups served from memory",
+    ["cache"],
+)
+CACHE_MISSES = counter(
+    "embedding_cache_misses_total",
+    "Embedding cache lookups that required an encode",
+    ["cache"],
+)
+CACHE_EVICTIONS = counter(
+    "embedding_cache_evictions_total",
+    "Embeddings evicted to stay within the entry / memory cap",
+    ["cache"],
+)
+CACHE_ENTRIES = gauge(
+    "embedding_cache_entries",
+    "Embeddings currently cached",
+    ["cache"],
+)
+CACHE_BYTES = gauge(
+    "embedding_cache_bytes",
+    "Memory held by cached embedding arrays",
+    ["cache"],
+)
+
+
+class EmbeddingCache:
+    """
+    Bounded, content-addressed LRU cache of embedding vectors.
+
+    Keys are SHA-256 digests of the exact text, so identical reference
+    answers share one entry regardless of which request sent them. Entries
+    are evicted least-recently-used first once either `max_entries` or
+    `max_bytes` is exceeded. Safe to use from executor threads.
+    """
+
+    def __init__(self, name: str, max_entries: int = 10_000, max_bytes: int = 64 * 1024 * 1024):
+        self.name        = name
+        self.max_entries = max(0, max_entries)
+        self.max_bytes   = max(0, max_bytes)
+        self.hits        = 0
+        self.misses      = 0
+
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._bytes = 0
+        self._lock  = threading.Lock()
+
+        CACHE_ENTRIES.set_function(lambda: len(self._entries), cache=name)
+        CACHE_BYTES.set_function(lambda: self._bytes, cache=name)
+
+    @staticmethod
+    def key(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def get(self, text: str) -> Optional[np.ndarray]:
+        k = self.key(text)
+        with self._lock:
+            vector = self._entries.get(k)
+            if vector is None:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(k)
+                self.hits += 1
+        if vector is None:
+            CACHE_MISSES.inc(cache=self.name)
+        else:
+            CACHE_HITS.inc(cache=self.name)
+        return vector
+
+    def put(self, text: str, vector: np.ndarray) -> None:
+        if self.max_entries == 0 or vector.nbytes > self.max_bytes:
+            return
+        k = self.key(text)
+        evicted = 0
+        with self._lock:
+            previous = self._entries.pop(k, None)
+            if previous is not None:
+                self._bytes -= previous.nbytes
+            self._entries[k] = vector
+            self._bytes += vector.nbytes
+
+            while self._entries and (
+                len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+            ):
+                _, old = self._entries.popitem(last=False)
+                self._bytes -= old.nbytes
+                evicted += 1
+        if evicted:
+            CACHE_EVICTIONS.inc(evicted, cache=self.name)
+
+    def missing(self, texts: Iterable[str]) -> List[str]:
+        """
+        Distinct texts (in first-seen order) that are not cached yet.
+        Does not touch the hit/miss counters.
+        """
+        with self._lock:
+            return [t for t in dict.fromkeys(texts) if self.key(t) not in self._entries]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries":     len(self._entries),
+                "bytes":       self._bytes,
+                "hits":        self.hits,
+                "misses":      self.misses,
+                "max_entries": self.max_entries,
+                "max_bytes":   self.max_bytes,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
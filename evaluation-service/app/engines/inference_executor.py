@@ -0,0 +1,57 @@
+import os
+import asyncio
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+# --- Executor Configuration ---
+# Max CPU-bound inference calls (MiniLM encode / NLI forward pass) running at
+# once. Every other coroutine keeps running on the event loop meanwhile.
+INFERENCE_MAX_WORKERS = int(os.getenv("INFERENCE_MAX_WORKERS", "2"))
+
+# Optional cap on torch intra-op threads, so N workers × M torch threads does
+# not oversubscribe the CPU. Unset → torch default.
+TORCH_NUM_THREADS = os.getenv("TORCH_NUM_THREADS")
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_inference_executor() -> ThreadPoolExecutor:
+    """
+    Returns the process-wide inference executor (created on first use).
+    """
+    global _executor
+    if _executor is None:
+        if TORCH_NUM_THREADS:
+            import torch
+            torch.set_num_threads(int(TORCH_NUM_THREADS))
+        _executor = ThreadPoolExecutor(
+            max_workers=max(1, INFERENCE_MAX_WORKERS),
+            thread_name_prefix="inference",
+        )
+        logger.info(f"Inference executor started with {INFERENCE_MAX_WORKERS} worker(s)")
+    return _executor
+
+
+async def run_inference(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Runs a blocking engine call on the inference executor and awaits it
+    without blocking the event loop.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_inference_executor(), functools.partial(fn, *args, **kwargs)
+    )
+
+
+def shutdown_inference_executor() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True, cancel_futures=True)
+    _executor = None
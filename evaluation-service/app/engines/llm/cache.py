@@ -0,0 +1,164 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+from typing import Any, Dict, Optional
+
+from app.utils.metrics import counter
+from app.utils.storage import SQLiteDatabase, cache_path
+
+logger = logging.getLogger(__name__)
+
+
+# --- Cache Configuration ---
+LLM_CACHE_ENABLED     = os.getenv("LLM_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+LLM_CACHE_PATH        = os.getenv("LLM_CACHE_PATH", cache_path("llm_cache.sqlite3"))
+LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "50000"))
+# A hit refreshes last_access (the LRU order) only if the stored value is
+# older than this, so most hits are a read with no write.
+LLM_CACHE_TOUCH_INTERVAL = float(os.getenv("LLM_CACHE_TOUCH_INTERVAL", "3600"))   # seconds
+
+# Eviction runs every N writes rather than on each one.
+EVICT_EVERY_WRITES = 100
+
+CACHE_LOOKUPS = counter(
+    "llm_cache_lookups_total",
+    "LLM judgment cache lookups by outcome (hit / miss / expired)",
+    ["outcome"],
+)
+CACHE_WRITES = counter(
+    "llm_cache_writes_total",
+    "LLM judgments written to the cache",
+)
+CACHE_EVICTIONS = counter(
+    "llm_cache_evictions_total",
+    "LLM judgments evicted (expired or over the size cap)",
+)
+
+
+LLM_CACHE_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS llm_cache ("
+    " key TEXT PRIMARY KEY,"
+    " model TEXT NOT NULL,"
+    " content TEXT NOT NULL,"
+    " created_at REAL NOT NULL,"
+    " last_access REAL NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS idx_llm_cache_last_access ON llm_cache(last_access)",
+)
+
+
+class LLMResponseCache:
+    """
+    Disk-backed, content-addressed cache of raw LLM completions.
+
+    Every call is made with temperature=0, so the same (model, prompt,
+    generation parameters) always yields the same judgment. The key is a
+    SHA-256 of exactly those fields; the stored value is the raw completion
+    text, re-parsed on every hit so the caller sees identical behaviour.
+
+    Entries older than `ttl_seconds` are ignored and purged; beyond
+    `max_entries` the least-recently-used rows are evicted (recency is
+    tracked to within `touch_interval`).
+
+    get() / set() block on SQLite: call them off the event loop
+    (asyncio.to_thread), as LLMClient does.
+    """
+
+    def __init__(
+        self,
+        path: str = LLM_CACHE_PATH,
+        ttl_seconds: float = LLM_CACHE_TTL_SECONDS,
+        max_entries: int = LLM_CACHE_MAX_ENTRIES,
+        enabled: bool = LLM_CACHE_ENABLED,
+        touch_interval: float = LLM_CACHE_TOUCH_INTERVAL,
+    ):
+        self.path           = path
+        self.ttl_seconds    = ttl_seconds
+        self.max_entries    = max_entries
+        self.enabled        = enabled
+        self.touch_interval = touch_interval
+
+        self._db = SQLiteDatabase(path, LLM_CACHE_SCHEMA, "LLM response cache")
+        self._writes = 0
+
+    @staticmethod
+    def make_key(model: str, prompt: str, params: Dict[str, Any]) -> str:
+        material = json.dumps(
+            {"model": model, "prompt": prompt, "params": params},
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        if not self.enabled:
+            return None
+        now = time.time()
+        try:
+            with self._db.lock:
+                conn = self._db.connection()
+                row = conn.execute(
+                    "SELECT content, created_at, last_access FROM llm_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    outcome = "miss"
+                elif now - row[1] > self.ttl_seconds:
+                    conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                    outcome, row = "expired", None
+                else:
+                    if now - row[2] > self.touch_interval:
+                        conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+                    outcome = "hit"
+        except sqlite3.Error as e:
+            # A broken cache must never fail an evaluation.
+            logger.warning(f"LLM cache read failed: {e}")
+            return None
+
+        CACHE_LOOKUPS.inc(outcome=outcome)
+        return row[0] if row is not None else None
+
+    def set(self, key: str, model: str, content: str) -> None:
+        if not self.enabled:
+            return
+        now = time.time()
+        try:
+            with self._db.lock:
+                conn = self._db.connection()
+                conn.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, model, content, created_at, last_access)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    (key, model, content, now, now),
+                )
+                self._writes += 1
+                if self._writes % EVICT_EVERY_WRITES == 0:
+                    self._evict(conn, now)
+        except sqlite3.Error as e:
+            logger.warning(f"LLM cache write failed: {e}")
+            return
+        CACHE_WRITES.inc()
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        expired = conn.execute(
+            "DELETE FROM llm_cache WHERE created_at < ?", (now - self.ttl_seconds,)
+        ).rowcount
+        (count,) = conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()
+        overflow = max(0, count - self.max_entries)
+        if overflow:
+            conn.execute(
+                "DELETE FROM llm_cache WHERE key IN"
+                " (SELECT key FROM llm_cache ORDER BY last_access ASC LIMIT ?)",
+                (overflow,),
+            )
+        if expired or overflow:
+            CACHE_EVICTIONS.inc(expired + overflow)
+            logger.info(f"LLM cache evicted {expired} expired and {overflow} LRU entries")
+
+    def close(self) -> None:
+        self._db.close()
+
+
+# Process-wide cache shared by every LLMClient.
+llm_cache = LLMResponseCache()
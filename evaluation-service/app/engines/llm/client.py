@@ -6,16 +6,84 @@ import time
 import logging
 import asyncio
 from typing import Dict, Any, Optional
+from app.engines.llm.http_pool import get_http_client
+from app.engines.llm.cache import llm_cache
+from app.engines.llm.resilience import LLM_HEDGES, BreakerTicket, CircuitOpenError, llm_breaker, llm_latency
+from app.engines.llm.rate_limiter import (
+    LLM_BACKOFF_SECONDS, THROTTLE_STATUS, backoff_delay, llm_limiter, parse_retry_after,
+)
+from app.engines.llm.usage import record_usage
+from app.utils.metrics import counter
+from app.utils.timing import stage
 
 logger = logging.getLogger(__name__)
 
+LLM_HTTP_REQUESTS = counter(
+    "llm_http_requests_total",
+    "OpenRouter HTTP attempts by status code (\"error\" = transport failure)",
+    ["status"],
+)
+LLM_RETRIES = counter(
+    "llm_retries_total",
+    "LLM attempts retried after a failed attempt",
+)
+LLM_FAILURES = counter(
+    "llm_failures_total",
+    "LLM calls that failed after exhausting every retry",
+)
+
+# Attempts after the first; 429 / 5xx / network / unparseable responses are retried
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+# 408 timeout, 409 conflict, 429 rate limited, 5xx provider/upstream errors
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+# Any OpenAI-compatible chat-completions API, e.g. the local mock server
+# (benchmarks/mock_llm_server.py) for offline load tests.
+OPENROUTER_BASE_URL = os.getenv("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1")
+
+
 class LLMClient:
-    OPENROUTER_API_URL = "https://openrouter.ai/api/v1/chat/completions"
+    OPENROUTER_API_URL = f"{OPENROUTER_BASE_URL.rstrip('/')}/chat/completions"
 
     def __init__(self, model: str):
         self.model = model
 
-    async def send_prompt(self, prompt: str, retries: int = 1) -> Dict[str, Any]:
+    async def send_prompt(
+        self,
+        prompt: str,
+        retries: Optional[int] = None,
+        use_cache: bool = True,
+        max_tokens: int = 500,
+        template: str = "unknown",
+    ) -> Any:
+        """
+        Sends one chat-completion request and returns the parsed JSON
+        (an object, or an array for packed prompts).
+        `template` names the prompt template for token / cost accounting.
+        `retries` defaults to LLM_MAX_RETRIES.
+        """
+        generation_params = {
+            "temperature": 0, # Deterministic output
+            "max_tokens": max_tokens
+        }
+
+        # ── Judgment cache ───────────────────────────────────────────────────
+        # temperature=0 → identical (model, prompt, params) give identical
+        # judgments, so a stored completion is returned without a network call.
+        # use_cache=False bypasses the lookup but still refreshes the entry.
+        cache_key = None
+        if llm_cache.enabled:
+            cache_key = llm_cache.make_key(self.model, prompt, generation_params)
+            # SQLite runs on a worker thread, never on the event loop
+            cached = await asyncio.to_thread(llm_cache.get, cache_key) if use_cache else None
+            if cached is not None:
+                try:
+                    parsed = self._parse_json(cached)
+                    record_usage(template, self.model, None, cached=True)
+                    return parsed
+                except RuntimeError:
+                    logger.warning("Ignoring unparseable cached LLM response")
+
         api_key = os.getenv("OPENROUTER_API_KEY")
 
         if not api_key:
@@ -26,8 +94,9 @@ class LLMClient:
             "messages": [
                 {"role": "user", "content": prompt}
             ],
-            "temperature": 0, # Deterministic output
-            "max_tokens": 500
+            **generation_params,
+            # Ask OpenRouter to report the call's cost alongside token counts
+            "usage": {"include": True},
         }
 
         headers = {
@@ -38,41 +107,173 @@ class LLMClient:
         }
 
         last_error = None
+        retries = LLM_MAX_RETRIES if retries is None else retries
+
+        # Shared, pooled client (keep-alive / optional HTTP/2) — see http_pool.py
+        client = get_http_client()
+
+        for attempt in range(retries + 1):
+            if attempt:
+                LLM_RETRIES.inc()
+            # Fail fast while the provider is known to be down — see resilience.py
+            ticket = llm_breaker.allow()
+            if ticket is None:
+                raise CircuitOpenError("LLM Interaction Failed: OpenRouter circuit breaker is open")
+            retry_after = None
+            try:
+                with stage("llm_http"):
+                    response = await self._post_hedged(client, headers, payload, ticket)
+
+                if response.status_code in THROTTLE_STATUS:
+                    retry_after = parse_retry_after(response.headers.get("Retry-After"))
+
+                if response.status_code != 200:
+                    error_msg = f"OpenRouter API Error {response.status_code}: {response.text}"
+                    logger.warning(f"Attempt {attempt+1} failed: {error_msg}")
+                    last_error = error_msg
+                    if response.status_code not in RETRYABLE_STATUS:
+                        break  # bad request / auth / unknown model: retrying won't help
+                    await self._backoff(attempt, retries, retry_after)
+                    continue
+
+                data = response.json()
+                # Tokens are billed even if the content turns out unusable
+                record_usage(template, self.model, data.get("usage"))
+                content = data.get("choices", [{}])[0].get("message", {}).get("content", "")
+                
+                if not content:
+                    raise ValueError("Empty content from LLM")
+
+                with stage("llm_parse"):
+                    parsed = self._parse_json(content)
+                if cache_key is not None:
+                    await asyncio.to_thread(llm_cache.set, cache_key, self.model, content)
+                return parsed
+
+            except (httpx.RequestError, ValueError, RuntimeError) as e:
+                last_error = str(e)
+                logger.warning(f"Attempt {attempt+1} exception: {e}")
+                await self._backoff(attempt, retries)
+        
+        # If all retries fail
+        LLM_FAILURES.inc()
+        logger.error(f"All LLM attempts failed. Last error: {last_error}")
+        raise RuntimeError(f"LLM Interaction Failed: {last_error}")
 
-        async with httpx.AsyncClient(timeout=45.0) as client:
-            for attempt in range(retries + 1):
+    async def _post(
+        self,
+        client: httpx.AsyncClient,
+        headers: Dict[str, str],
+        payload: Dict[str, Any],
+        ticket: BreakerTicket,
+        admitted: Optional[asyncio.Event] = None,
+    ) -> httpx.Response:
+        """
+        One OpenRouter HTTP request, admitted by the rate limiter and
+        reported to the limiter, the circuit breaker (under `ticket`) and
+        the latency tracker. `admitted` is set once the limiter has let the
+        request through.
+        """
+        failed: Optional[bool] = None  # None: cancelled (a hedge lost) / no verdict
+        try:
+            # Process-wide token bucket + AIMD concurrency window — see rate_limiter.py
+            async with llm_limiter.slot() as slot:
+                if admitted is not None:
+                    admitted.set()
+                started = time.perf_counter()
                 try:
                     response = await client.post(
                         self.OPENROUTER_API_URL,
                         headers=headers,
                         json=payload
                     )
+                except httpx.RequestError as e:
+                    LLM_HTTP_REQUESTS.inc(status="error")
+                    failed = True
+                    if isinstance(e, httpx.TimeoutException):
+                        slot.throttled("timeout")
+                    raise
+                LLM_HTTP_REQUESTS.inc(status=str(response.status_code))
 
-                    if response.status_code != 200:
-                        error_msg = f"OpenRouter API Error {response.status_code}: {response.text}"
-                        logger.warning(f"Attempt {attempt+1} failed: {error_msg}")
-                        last_error = error_msg
-                        await asyncio.sleep(1) # Backoff
-                        continue
-
-                    data = response.json()
-                    content = data.get("choices", [{}])[0].get("message", {}).get("content", "")
-                    
-                    if not content:
-                        raise ValueError("Empty content from LLM")
-
-                    return self._parse_json(content)
-
-                except (httpx.RequestError, ValueError, RuntimeError) as e:
-                    last_error = str(e)
-                    logger.warning(f"Attempt {attempt+1} exception: {e}")
-                    await asyncio.sleep(1)
-        
-        # If all retries fail
-        logger.error(f"All LLM attempts failed. Last error: {last_error}")
-        raise RuntimeError(f"LLM Interaction Failed: {last_error}")
+                failed = response.status_code >= 500
+                if response.status_code == 200:
+                    slot.succeeded()
+                    llm_latency.observe(time.perf_counter() - started)
+                elif response.status_code in THROTTLE_STATUS:
+                    retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                    slot.throttled(str(response.status_code), retry_after)
+                return response
+        finally:
+            llm_breaker.record(ticket, failed)
+
+    async def _post_hedged(
+        self,
+        client: httpx.AsyncClient,
+        headers: Dict[str, str],
+        payload: Dict[str, Any],
+        ticket: BreakerTicket,
+    ) -> httpx.Response:
+        """
+        Sends the request; if it is still outstanding after the hedging
+        delay (a high percentile of recent latencies), sends a duplicate and
+        returns whichever answers 200 first. The slower one is cancelled.
+        temperature=0 makes the two interchangeable.
+
+        The delay counts from when the request holds a limiter slot, so time
+        spent queued behind the limiter never triggers a hedge, and no hedge
+        is sent while the limiter is congested (throttled provider).
+        """
+        delay = llm_latency.hedge_delay()
+        if delay is None or llm_breaker.state != llm_breaker.CLOSED:
+            return await self._post(client, headers, payload, ticket)
+
+        admitted = asyncio.Event()
+        primary = asyncio.create_task(self._post(client, headers, payload, ticket, admitted))
+        admission = asyncio.create_task(admitted.wait())
+        hedge = None
+        try:
+            await asyncio.wait({primary, admission}, return_when=asyncio.FIRST_COMPLETED)
+            if not primary.done():
+                await asyncio.wait({primary}, timeout=delay)
+            if primary.done():
+                return primary.result()
+            if llm_limiter.congested:
+                return await primary
+
+            LLM_HEDGES.inc(outcome="fired")
+            hedge = asyncio.create_task(self._post(client, headers, payload, ticket))
+            pending = {primary, hedge}
+            fallback = None  # first non-winning outcome, used if neither succeeds
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None and task.result().status_code == 200:
+                        LLM_HEDGES.inc(outcome="won" if task is hedge else "lost")
+                        return task.result()
+                    fallback = fallback or task
+            return fallback.result()  # re-raises its exception, if any
+        finally:
+            for task in (admission, primary, hedge):
+                if task is None:
+                    continue
+                if not task.done():
+                    task.cancel()
+                elif not task.cancelled():
+                    task.exception()  # mark retrieved so asyncio doesn't log it
+
+    @staticmethod
+    async def _backoff(attempt: int, retries: int, retry_after: Optional[float] = None) -> None:
+        """
+        Sleeps before the next attempt (none after the last one): the
+        provider's Retry-After if given, else jittered exponential backoff.
+        """
+        if attempt >= retries:
+            return
+        delay = backoff_delay(attempt, retry_after)
+        LLM_BACKOFF_SECONDS.inc(delay)
+        await asyncio.sleep(delay)
 
-    def _parse_json(self, content: str) -> Dict[str, Any]:
+    def _parse_json(self, content: str) -> Any:
         """
         Robustly cleaner and parses JSON from LLM output.
         Removes markdown code blocks if present.
@@ -0,0 +1,105 @@
+import os
+import asyncio
+import logging
+from typing import Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+# --- Pool Configuration ---
+MAX_CONNECTIONS    = int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", "20"))
+MAX_KEEPALIVE      = int(os.getenv("LLM_HTTP_MAX_KEEPALIVE", "10"))
+KEEPALIVE_EXPIRY   = float(os.getenv("LLM_HTTP_KEEPALIVE_EXPIRY", "90"))   # seconds
+REQUEST_TIMEOUT    = float(os.getenv("LLM_HTTP_TIMEOUT", "45"))            # seconds
+CONNECT_TIMEOUT    = float(os.getenv("LLM_HTTP_CONNECT_TIMEOUT", "10"))    # seconds
+HTTP2_ENABLED      = os.getenv("LLM_HTTP2", "false").lower() in ("1", "true", "yes")
+WARMUP_CONNECTIONS = int(os.getenv("LLM_HTTP_WARMUP_CONNECTIONS", "2"))
+
+# One client per process, shared by every LLMClient instance.
+_client: Optional[httpx.AsyncClient] = None
+_http2_active = False
+
+
+def _http2_available() -> bool:
+    """
+    HTTP/2 needs the optional `h2` package (pip install "httpx[http2]").
+    """
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _build_client() -> httpx.AsyncClient:
+    global _http2_active
+    http2 = HTTP2_ENABLED
+    if http2 and not _http2_available():
+        logger.warning("LLM_HTTP2 is enabled but 'h2' is not installed — falling back to HTTP/1.1")
+        http2 = False
+    _http2_active = http2
+
+    limits = httpx.Limits(
+        max_connections=MAX_CONNECTIONS,
+        max_keepalive_connections=MAX_KEEPALIVE,
+        keepalive_expiry=KEEPALIVE_EXPIRY,
+    )
+    timeout = httpx.Timeout(REQUEST_TIMEOUT, connect=CONNECT_TIMEOUT)
+
+    logger.info(
+        f"Creating shared LLM HTTP client (http2={http2}, max_connections={MAX_CONNECTIONS}, "
+        f"max_keepalive={MAX_KEEPALIVE}, keepalive_expiry={KEEPALIVE_EXPIRY}s)"
+    )
+    return httpx.AsyncClient(limits=limits, timeout=timeout, http2=http2)
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Returns the process-wide client.
+    Created lazily if the app lifespan has not opened it (e.g. standalone scripts).
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _build_client()
+    return _client
+
+
+async def open_http_client(warmup_url: Optional[str] = None) -> httpx.AsyncClient:
+    """
+    Creates the shared client and, if `warmup_url` is given, pre-opens
+    connections so the first graded answers skip the TCP + TLS handshake.
+    """
+    client = get_http_client()
+    if warmup_url and WARMUP_CONNECTIONS > 0:
+        await warm_up(client, warmup_url)
+    return client
+
+
+async def warm_up(client: httpx.AsyncClient, url: str) -> None:
+    """
+    Fires concurrent HEAD requests so the pool holds ready keep-alive
+    connections. Any HTTP response counts (the status is irrelevant);
+    network errors are logged and ignored — warm-up must never block startup.
+    """
+    # Over HTTP/2 a single connection multiplexes every request.
+    count = 1 if _http2_active else WARMUP_CONNECTIONS
+
+    async def _ping() -> bool:
+        try:
+            await client.head(url, timeout=CONNECT_TIMEOUT)
+            return True
+        except httpx.HTTPError as e:
+            logger.warning(f"LLM connection warm-up failed: {e}")
+            return False
+
+    results = await asyncio.gather(*(_ping() for _ in range(count)))
+    logger.info(f"Warmed {sum(results)}/{count} LLM connection(s) to {url}")
+
+
+async def close_http_client() -> None:
+    global _client
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+    _client = None
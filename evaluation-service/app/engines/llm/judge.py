@@ -1,12 +1,24 @@
+import logging
+import math
+from typing import Dict, List, Optional, Tuple
+
 from app.engines.llm.client import LLMClient
 from app.engines.llm.prompts import (
     EVALUATION_PROMPT,
     ADAPTIVE_EVALUATION_PROMPT,
     BALANCED_TEACHER_PROMPT,
+    BALANCED_TEACHER_PACKED_PROMPT,
+    BALANCED_TEACHER_PACKED_ANSWER,
 )
 
+logger = logging.getLogger(__name__)
+
 
 class LLMJudge:
+    # Completion budget for packed prompts: per answer + JSON array overhead
+    PACKED_TOKENS_PER_ANSWER = 300
+    PACKED_TOKENS_OVERHEAD   = 100
+
     def __init__(self):
         self.model  = "openai/gpt-4o-mini"
         self.client = LLMClient(model=self.model)
@@ -29,7 +41,7 @@ class LLMJudge:
 
     async def evaluate(self, question, student_answer, rubric, max_score):
         prompt = self._build_prompt(question, student_answer, rubric, max_score)
-        parsed = await self.client.send_prompt(prompt)
+        parsed = await self.client.send_prompt(prompt, template="EVALUATION_PROMPT")
 
         conceptual = float(parsed.get("conceptual_understanding", 0.0))
         clarity    = float(parsed.get("language_clarity", 0.0))
@@ -70,7 +82,7 @@ class LLMJudge:
         prompt = self._build_adaptive_prompt(
             question, student_answer, rubric_weights, total_marks, style, signals
         )
-        parsed = await self.client.send_prompt(prompt)
+        parsed = await self.client.send_prompt(prompt, template="ADAPTIVE_EVALUATION_PROMPT")
 
         return {
             "concept":      max(0.0, min(float(parsed.get("concept", 0.0)),      1.0)),
@@ -108,6 +120,7 @@ class LLMJudge:
         total_marks: float,
         similarity_band: str,
         signals: dict,
+        use_cache: bool = True,
     ) -> dict:
         """
         Balanced Teacher pipeline evaluation.
@@ -120,13 +133,25 @@ class LLMJudge:
           • If similarity_band == "Full": concept = max(concept, 0.85)
           • If similarity_band == "Noise" and word-count ≤ 3: concept = 0.0
             (ambiguous single-word answer that didn't match any reference)
+
+        use_cache=False forces a fresh LLM call (the result is still cached).
         """
         prompt = self._build_balanced_prompt(
             question, student_answer, reference_answer,
             total_marks, similarity_band, signals
         )
-        parsed = await self.client.send_prompt(prompt)
+        parsed = await self.client.send_prompt(
+            prompt, use_cache=use_cache, template="BALANCED_TEACHER_PROMPT"
+        )
 
+        return self._apply_balanced_guardrails(parsed, student_answer, similarity_band, signals)
+
+    def _apply_balanced_guardrails(self, parsed: dict, student_answer: str,
+                                   similarity_band: str, signals: dict) -> dict:
+        """
+        Clamps the LLM scores and applies the code-level guardrails shared by
+        the single-answer and packed Balanced Teacher paths.
+        """
         concept      = max(0.0, min(float(parsed.get("concept",      0.0)), 1.0))
         completeness = max(0.0, min(float(parsed.get("completeness", 0.0)), 1.0))
         clarity      = max(0.0, min(float(parsed.get("clarity",      0.0)), 1.0))
@@ -159,3 +184,127 @@ class LLMJudge:
             "feedback":     feedback,
             "confidence":   1.0,
         }
+
+    # ─────────────────────────────────────────────────────────────────────
+    # Packed Balanced Teacher: N answers to one question, one request
+    # ─────────────────────────────────────────────────────────────────────
+    def _build_packed_prompt(self, question, reference_answer, total_marks,
+                             answers: Dict[str, dict]):
+        blocks = []
+        for answer_id, answer in answers.items():
+            signals = answer["signals"]
+            blocks.append(BALANCED_TEACHER_PACKED_ANSWER.format(
+                answer_id=answer_id,
+                similarity_band=answer["similarity_band"],
+                sim_score=signals.get("similarity", 0.0),
+                nli_score=signals.get("nli", 0.0),
+                depth_score=signals.get("depth", {}).get("depth_score", 0.0),
+                student_answer=answer["student_answer"],
+            ))
+
+        return BALANCED_TEACHER_PACKED_PROMPT.format(
+            answer_count=len(answers),
+            question=question,
+            reference_answer=reference_answer or "Not provided",
+            total_marks=total_marks,
+            answers="\n".join(blocks),
+        )
+
+    @staticmethod
+    def _validate_packed_element(element) -> Optional[Tuple[str, dict]]:
+        """
+        Returns (answer_id, scores) for a well-formed array element, else None.
+        Well-formed = an object with a string answer_id, finite numeric
+        concept / completeness / clarity and a string feedback.
+        """
+        if not isinstance(element, dict):
+            return None
+        answer_id = element.get("answer_id")
+        if not isinstance(answer_id, str):
+            return None
+        for key in ("concept", "completeness", "clarity"):
+            value = element.get(key)
+            if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+                return None
+        if not isinstance(element.get("feedback"), str):
+            return None
+        return answer_id.strip(), element
+
+    async def evaluate_balanced_packed(
+        self,
+        question: str,
+        reference_answer: str | None,
+        total_marks: float,
+        answers: List[dict],
+        use_cache: bool = True,
+    ) -> List[dict | Exception]:
+        """
+        Grades several answers to the same question in a single LLM request.
+
+        `answers` items carry: student_answer, similarity_band, signals.
+        Returns one result per answer, in order, with the same schema and
+        guardrails as evaluate_balanced(). If the packed request itself
+        fails, every slot holds that exception (no per-answer retry storm
+        against a provider that is already failing). If it succeeds, any
+        answer whose array element is missing or malformed is re-graded with
+        a single-answer call, one at a time so the batch keeps to its one
+        concurrency slot; if that also fails, its slot holds the exception.
+        """
+        if len(answers) == 1:
+            single = answers[0]
+            try:
+                return [await self.evaluate_balanced(
+                    question, single["student_answer"], reference_answer, total_marks,
+                    single["similarity_band"], single["signals"], use_cache=use_cache,
+                )]
+            except Exception as e:
+                return [e]
+
+        # Short positional ids are easier for the model to echo than caller ids.
+        labelled = {f"A{i + 1}": answer for i, answer in enumerate(answers)}
+        prompt = self._build_packed_prompt(question, reference_answer, total_marks, labelled)
+        max_tokens = self.PACKED_TOKENS_OVERHEAD + self.PACKED_TOKENS_PER_ANSWER * len(answers)
+
+        graded: Dict[str, dict] = {}
+        try:
+            parsed = await self.client.send_prompt(
+                prompt, use_cache=use_cache, max_tokens=max_tokens,
+                template="BALANCED_TEACHER_PACKED_PROMPT",
+            )
+        except Exception as e:
+            logger.warning(f"Packed LLM call for {len(answers)} answers failed: {e}")
+            return [e] * len(answers)
+
+        if not isinstance(parsed, list):
+            logger.warning(f"Packed LLM response is not a JSON array ({type(parsed).__name__})")
+            parsed = []
+
+        for element in parsed:
+            validated = self._validate_packed_element(element)
+            if validated is None:
+                continue
+            answer_id, scores = validated
+            if answer_id in labelled and answer_id not in graded:
+                answer = labelled[answer_id]
+                graded[answer_id] = self._apply_balanced_guardrails(
+                    scores, answer["student_answer"], answer["similarity_band"], answer["signals"]
+                )
+
+        # ── Fallback: single-answer calls for anything missing or malformed ──
+        fallback_ids = [answer_id for answer_id in labelled if answer_id not in graded]
+        if fallback_ids:
+            logger.warning(
+                f"Packed response covered {len(graded)}/{len(answers)} answers; "
+                f"re-grading {len(fallback_ids)} individually"
+            )
+            for answer_id in fallback_ids:
+                answer = labelled[answer_id]
+                try:
+                    graded[answer_id] = await self.evaluate_balanced(
+                        question, answer["student_answer"], reference_answer, total_marks,
+                        answer["similarity_band"], answer["signals"], use_cache=use_cache,
+                    )
+                except Exception as e:
+                    graded[answer_id] = e
+
+        return [graded[answer_id] for answer_id in labelled]
@@ -77,24 +77,9 @@ Return ONLY valid JSON:
 }}
 """
 
-BALANCED_TEACHER_PROMPT = """
-You are the "Balanced Teacher" evaluator for the Quizora academic platform.
-Total Marks: {total_marks}
-Similarity Band: {similarity_band}  (Noise | Partial | Full)
-
-═══════════════════════════════════════════════════
-CONTEXT
-═══════════════════════════════════════════════════
-Question:        {question}
-Reference Answer (if any): {reference_answer}
-Student Answer:  {student_answer}
-
-═══════════════════════════════════════════════════
-SCORING PHILOSOPHY — READ CAREFULLY BEFORE SCORING
-═══════════════════════════════════════════════════
-
-
-
+# Grading rules shared by the single-answer and packed Balanced Teacher prompts.
+# Kept verbatim so BALANCED_TEACHER_PROMPT renders exactly as before.
+BALANCED_TEACHER_RULES = """
 RULE 0 — MEANINGFUL TEXT GATE (Non-Negotiable):
   • If the student answer contains NO recognizable words (e.g. "123@#$", "???"),
     return concept: 0.0 and clarity: 0.0. Do not proceed further.
@@ -147,6 +132,27 @@ RULE 8 — COMPLETENESS (Non-punitive):
     - 3-5 marks → minor deductions only for missing key sub-points.
     - 6-10 marks → structured explanation expected; proportional deduction.
   • Minimum completeness for a correct short answer: 0.4
+"""
+
+BALANCED_TEACHER_PROMPT = """
+You are the "Balanced Teacher" evaluator for the Quizora academic platform.
+Total Marks: {total_marks}
+Similarity Band: {similarity_band}  (Noise | Partial | Full)
+
+═══════════════════════════════════════════════════
+CONTEXT
+═══════════════════════════════════════════════════
+Question:        {question}
+Reference Answer (if any): {reference_answer}
+Student Answer:  {student_answer}
+
+═══════════════════════════════════════════════════
+SCORING PHILOSOPHY — READ CAREFULLY BEFORE SCORING
+═══════════════════════════════════════════════════
+
+
+
+""" + BALANCED_TEACHER_RULES.strip("\n") + """
 
 
 
@@ -169,3 +175,54 @@ Return ONLY valid JSON — no markdown, no extra text:
   "reasoning":    "<one-line explanation of why you assigned these scores>"
 }}
 """
+
+# Packed variant: grades N answers to the SAME question in one request, so the
+# fixed rules above are sent once instead of once per student.
+BALANCED_TEACHER_PACKED_PROMPT = """
+You are the "Balanced Teacher" evaluator for the Quizora academic platform.
+You are grading {answer_count} answers from DIFFERENT students to the SAME question.
+Grade EACH answer independently, exactly as if it were the only one — never
+compare answers with each other or let one answer influence another's score.
+Total Marks: {total_marks}
+
+═══════════════════════════════════════════════════
+CONTEXT
+═══════════════════════════════════════════════════
+Question:        {question}
+Reference Answer (if any): {reference_answer}
+
+═══════════════════════════════════════════════════
+STUDENT ANSWERS
+═══════════════════════════════════════════════════
+Each answer lists its Similarity Band (Noise | Partial | Full) and signals.
+Signals are for context only — do not override the rules below.
+
+{answers}
+
+═══════════════════════════════════════════════════
+SCORING PHILOSOPHY — READ CAREFULLY BEFORE SCORING
+═══════════════════════════════════════════════════
+
+""" + BALANCED_TEACHER_RULES.strip("\n") + """
+
+═══════════════════════════════════════════════════
+OUTPUT FORMAT
+═══════════════════════════════════════════════════
+Return ONLY a valid JSON array — no markdown, no extra text — with exactly
+one object per student answer, using the answer_id given above:
+[
+  {{
+    "answer_id":    "<answer_id exactly as given>",
+    "concept":      <float 0.0-1.0>,
+    "completeness": <float 0.0-1.0>,
+    "clarity":      <float 0.0-1.0>,
+    "feedback":     "<concise, teacher-style feedback — cite specific correct or missing points>",
+    "reasoning":    "<one-line explanation of why you assigned these scores>"
+  }}
+]
+"""
+
+BALANCED_TEACHER_PACKED_ANSWER = """[answer_id: {answer_id}]
+Similarity Band: {similarity_band} | Similarity: {sim_score:.2f} | NLI: {nli_score:.2f} | Depth: {depth_score:.2f}
+Student Answer: {student_answer}
+"""
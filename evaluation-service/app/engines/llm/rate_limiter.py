@@ -0,0 +1,261 @@
+import os
+import time
+import random
+import asyncio
+import logging
+from collections import deque
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from typing import AsyncIterator, Deque, Optional
+
+from app.utils.metrics import counter, gauge, histogram
+from app.utils.timing import record_stage
+
+logger = logging.getLogger(__name__)
+
+
+# --- Limiter Configuration ---
+# Token bucket: sustained request rate and burst towards the provider.
+RATE_LIMIT_RPS      = float(os.getenv("LLM_RATE_LIMIT_RPS", "10"))      # 0 disables the bucket
+RATE_LIMIT_BURST    = float(os.getenv("LLM_RATE_LIMIT_BURST", "10"))
+# AIMD concurrency: additive increase per successful round, multiplicative
+# decrease on a throttling signal (429 / 503 / timeout).
+CONCURRENCY_INITIAL = float(os.getenv("LLM_CONCURRENCY_INITIAL", "8"))
+CONCURRENCY_MIN     = float(os.getenv("LLM_CONCURRENCY_MIN", "1"))
+CONCURRENCY_MAX     = float(os.getenv("LLM_CONCURRENCY_MAX", "20"))    # ≤ LLM_HTTP_MAX_CONNECTIONS
+AIMD_DECREASE       = float(os.getenv("LLM_AIMD_DECREASE", "0.5"))
+# Retry backoff (full jitter): sleep uniform(0, min(MAX, BASE · 2^attempt)).
+BACKOFF_BASE        = float(os.getenv("LLM_BACKOFF_BASE", "0.5"))      # seconds
+BACKOFF_MAX         = float(os.getenv("LLM_BACKOFF_MAX", "30"))        # seconds
+
+# Responses that mean "slow down" rather than "this request is broken"
+THROTTLE_STATUS = {429, 503}
+
+LLM_THROTTLED = counter(
+    "llm_throttled_total",
+    "Throttling signals from the LLM provider by reason (429 / 503 / timeout)",
+    ["reason"],
+)
+LLM_BACKOFF_SECONDS = counter(
+    "llm_backoff_seconds_total",
+    "Seconds spent sleeping before LLM retries",
+)
+LLM_LIMITER_WAIT = histogram(
+    "llm_limiter_wait_seconds",
+    "Time LLM calls waited for a rate-limit token and a concurrency slot",
+)
+LLM_CONCURRENCY_LIMIT = gauge(
+    "llm_concurrency_limit",
+    "Current adaptive (AIMD) limit on concurrent LLM requests",
+)
+LLM_IN_FLIGHT = gauge(
+    "llm_in_flight",
+    "LLM HTTP requests currently in flight",
+)
+
+
+def backoff_delay(attempt: int, retry_after: Optional[float] = None) -> float:
+    """
+    Seconds to wait before retry number `attempt` (0-based). A provider's
+    Retry-After wins, plus a little jitter so waiting callers don't all
+    return in the same instant.
+    """
+    if retry_after is not None:
+        return min(BACKOFF_MAX, retry_after) + random.uniform(0, BACKOFF_BASE)
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Retry-After as seconds; the header is either a number or an HTTP date.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class _Slot:
+    """
+    One permitted LLM request. The caller reports how it went: a success
+    grows the window, a throttling response shrinks it, anything else
+    (errors, unusable responses) leaves it alone.
+    """
+
+    def __init__(self, generation: int):
+        self.generation = generation
+        self.ok = False
+        self.throttle_reason: Optional[str] = None
+        self.retry_after: Optional[float] = None
+
+    def succeeded(self) -> None:
+        self.ok = True
+
+    def throttled(self, reason: str, retry_after: Optional[float] = None) -> None:
+        self.throttle_reason = reason
+        self.retry_after = retry_after
+
+
+class AdaptiveRateLimiter:
+    """
+    Process-wide gate in front of every OpenRouter request.
+
+    Two limits apply together:
+      - a token bucket caps the request *rate* (RATE_LIMIT_RPS, bursts of
+        RATE_LIMIT_BURST);
+      - an AIMD window caps *concurrency*. Each success grows the window by
+        1/limit (≈ +1 per full round of requests); a throttling signal
+        multiplies it by AIMD_DECREASE, at most once per round — the other
+        429s from the same burst were sent under the old limit and are
+        ignored. A Retry-After also pauses the bucket for everyone.
+
+    Under sustained load the window settles just below the provider's limit
+    instead of every caller hammering it and retrying in lockstep.
+    Single event loop only (like the rest of the service); waiters are plain
+    futures so the limiter is not tied to the loop it was created on.
+    """
+
+    def __init__(
+        self,
+        rate: float = RATE_LIMIT_RPS,
+        burst: float = RATE_LIMIT_BURST,
+        initial: float = CONCURRENCY_INITIAL,
+        minimum: float = CONCURRENCY_MIN,
+        maximum: float = CONCURRENCY_MAX,
+        decrease: float = AIMD_DECREASE,
+    ):
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.minimum = max(1.0, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.decrease = decrease
+        self.limit = min(self.maximum, max(self.minimum, initial))
+
+        self._tokens = self.burst
+        self._refilled_at = time.monotonic()
+        self._paused_until = 0.0
+        self._in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        # Bumped on every decrease; slots from an older generation can't
+        # trigger another one.
+        self._generation = 0
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def congested(self) -> bool:
+        """
+        True while requests are queued for a slot or held back by a
+        Retry-After pause, i.e. while the provider is being throttled.
+        """
+        return bool(self._waiters) or time.monotonic() < self._paused_until
+
+    # ── Token bucket ────────────────────────────────────────────────────────
+    async def _take_token(self) -> None:
+        while True:
+            now = time.monotonic()
+            if now < self._paused_until:
+                await asyncio.sleep(self._paused_until - now)
+                continue
+            if self.rate <= 0:
+                return
+            self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.rate)
+            self._refilled_at = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def pause(self, seconds: float) -> None:
+        """
+        Holds back every new request for `seconds` (provider Retry-After).
+        """
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    # ── AIMD concurrency window ─────────────────────────────────────────────
+    async def _take_slot(self) -> None:
+        if self._in_flight < int(self.limit) and not self._waiters:
+            self._in_flight += 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self._release_slot()  # granted just as we were cancelled
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            raise
+
+    def _release_slot(self) -> None:
+        self._in_flight -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        while self._waiters and self._in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self._in_flight += 1
+                waiter.set_result(None)
+
+    def _on_success(self) -> None:
+        self.limit = min(self.maximum, self.limit + 1 / self.limit)
+        self._wake()
+
+    def _on_throttle(self, slot: _Slot) -> None:
+        LLM_THROTTLED.inc(reason=slot.throttle_reason)
+        if slot.retry_after:
+            self.pause(slot.retry_after)
+        if slot.generation != self._generation:
+            return
+        self._generation += 1
+        previous = self.limit
+        self.limit = max(self.minimum, self.limit * self.decrease)
+        logger.warning(
+            f"LLM provider throttling ({slot.throttle_reason}) — concurrency limit "
+            f"{previous:.1f} → {self.limit:.1f}"
+        )
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[_Slot]:
+        """
+        Waits for a token and a concurrency slot, then yields a _Slot for
+        one HTTP request. Call slot.succeeded() on a 200, or
+        slot.throttled(...) on a 429 / 503 / timeout.
+        """
+        started = time.perf_counter()
+        await self._take_slot()
+        try:
+            await self._take_token()
+        except BaseException:
+            self._release_slot()
+            raise
+        waited = time.perf_counter() - started
+        LLM_LIMITER_WAIT.observe(waited)
+        record_stage("llm_wait", waited)
+
+        slot = _Slot(self._generation)
+        try:
+            yield slot
+        finally:
+            if slot.throttle_reason:
+                self._on_throttle(slot)
+            elif slot.ok:
+                self._on_success()
+            self._release_slot()
+
+
+# One limiter per process, shared by every LLMClient instance.
+llm_limiter = AdaptiveRateLimiter()
+
+LLM_CONCURRENCY_LIMIT.set_function(lambda: llm_limiter.limit)
+LLM_IN_FLIGHT.set_function(lambda: llm_limiter.in_flight)
@@ -0,0 +1,199 @@
+import os
+import time
+import logging
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Optional
+
+from app.utils.metrics import counter, gauge
+
+logger = logging.getLogger(__name__)
+
+
+# --- Hedging Configuration ---
+# A second, identical request is sent when the first has been outstanding
+# longer than HEDGE_PERCENTILE of recent OpenRouter latencies; the first
+# successful answer wins and the other is cancelled.
+HEDGE_ENABLED     = os.getenv("LLM_HEDGE_ENABLED", "true").lower() in ("1", "true", "yes")
+HEDGE_PERCENTILE  = float(os.getenv("LLM_HEDGE_PERCENTILE", "0.95"))
+HEDGE_MIN_DELAY   = float(os.getenv("LLM_HEDGE_MIN_DELAY", "1.0"))     # seconds
+HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))     # no hedging until seen
+LATENCY_WINDOW    = int(os.getenv("LLM_LATENCY_WINDOW", "200"))       # recent latencies kept
+
+# --- Circuit Breaker Configuration ---
+# Trips when at least BREAKER_FAILURE_RATIO of the last BREAKER_WINDOW
+# attempts (and no fewer than BREAKER_MIN_CALLS) failed with 5xx / timeout /
+# network errors; while open, calls fail immediately. After
+# BREAKER_COOLDOWN seconds one probe is let through to test recovery.
+BREAKER_ENABLED       = os.getenv("LLM_BREAKER_ENABLED", "true").lower() in ("1", "true", "yes")
+BREAKER_WINDOW        = int(os.getenv("LLM_BREAKER_WINDOW", "20"))
+BREAKER_MIN_CALLS     = int(os.getenv("LLM_BREAKER_MIN_CALLS", "10"))
+BREAKER_FAILURE_RATIO = float(os.getenv("LLM_BREAKER_FAILURE_RATIO", "0.5"))
+BREAKER_COOLDOWN      = float(os.getenv("LLM_BREAKER_COOLDOWN", "30"))   # seconds
+
+LLM_HEDGES = counter(
+    "llm_hedges_total",
+    "Hedged LLM requests by outcome (won = the hedge answered first, lost = the original did)",
+    ["outcome"],
+)
+LLM_CIRCUIT_STATE = gauge(
+    "llm_circuit_state",
+    "OpenRouter circuit breaker state (0 = closed, 1 = half-open, 2 = open)",
+)
+LLM_CIRCUIT_TRANSITIONS = counter(
+    "llm_circuit_transitions_total",
+    "Circuit breaker state changes by new state",
+    ["state"],
+)
+LLM_CIRCUIT_REJECTIONS = counter(
+    "llm_circuit_rejections_total",
+    "LLM calls failed fast because the circuit breaker was open",
+)
+
+
+class CircuitOpenError(RuntimeError):
+    """
+    Raised instead of calling OpenRouter while the circuit breaker is open.
+    """
+
+
+@dataclass(frozen=True)
+class BreakerTicket:
+    """
+    Admission to call the provider, returned by CircuitBreaker.allow().
+    `epoch` is the breaker state it was issued in; `probe` marks the single
+    half-open trial call.
+    """
+    epoch: int
+    probe: bool = False
+
+
+class LatencyTracker:
+    """
+    Rolling window of recent successful OpenRouter latencies, used to pick
+    the hedging delay.
+    """
+
+    def __init__(self, size: int = LATENCY_WINDOW):
+        self._samples: Deque[float] = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        with self._lock:
+            if not self._samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def hedge_delay(self) -> Optional[float]:
+        """
+        Seconds after which to hedge, or None while hedging is off or too
+        few latencies have been seen to know what "slow" means.
+        """
+        with self._lock:
+            enough = len(self._samples) >= HEDGE_MIN_SAMPLES
+        if not HEDGE_ENABLED or not enough:
+            return None
+        return max(HEDGE_MIN_DELAY, self.percentile(HEDGE_PERCENTILE))
+
+
+class CircuitBreaker:
+    """
+    closed → open when the recent failure ratio crosses the threshold;
+    open → half-open after the cooldown, letting a single probe through;
+    half-open → closed if the probe succeeds, back to open if it fails.
+
+    allow() hands out a BreakerTicket that the caller passes back to
+    record(). Outcomes of tickets issued before the last state change are
+    stale and ignored, so only the probe decides how half-open ends.
+    """
+
+    CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+    _STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+    def __init__(
+        self,
+        enabled: bool = BREAKER_ENABLED,
+        window: int = BREAKER_WINDOW,
+        min_calls: int = BREAKER_MIN_CALLS,
+        failure_ratio: float = BREAKER_FAILURE_RATIO,
+        cooldown: float = BREAKER_COOLDOWN,
+    ):
+        self.enabled = enabled
+        self.min_calls = min_calls
+        self.failure_ratio = failure_ratio
+        self.cooldown = cooldown
+        self.state = self.CLOSED
+        self._outcomes: Deque[bool] = deque(maxlen=window)  # True = failure
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._epoch = 0  # bumped on every state change
+        self._lock = threading.Lock()
+
+    def _transition(self, state: str) -> None:
+        if state == self.state:
+            return
+        logger.warning(f"LLM circuit breaker {self.state} → {state}")
+        self.state = state
+        self._epoch += 1
+        self._probe_in_flight = False
+        LLM_CIRCUIT_TRANSITIONS.inc(state=state)
+        if state == self.OPEN:
+            self._opened_at = time.monotonic()
+        elif state == self.CLOSED:
+            self._outcomes.clear()
+
+    def allow(self) -> Optional[BreakerTicket]:
+        """
+        A ticket if a new LLM call may proceed, else None. In half-open
+        state only one probe is admitted at a time.
+        """
+        if not self.enabled:
+            return BreakerTicket(self._epoch)
+        with self._lock:
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.cooldown:
+                self._transition(self.HALF_OPEN)
+            if self.state == self.CLOSED:
+                return BreakerTicket(self._epoch)
+            if self.state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return BreakerTicket(self._epoch, probe=True)
+        LLM_CIRCUIT_REJECTIONS.inc()
+        return None
+
+    def record(self, ticket: BreakerTicket, failed: Optional[bool]) -> None:
+        """
+        Records one attempt made under `ticket`: True = provider failure,
+        False = the provider answered, None = no verdict (cancelled hedge,
+        client-side error).
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            if ticket.epoch != self._epoch:
+                return  # admitted before the last state change
+            if self.state == self.HALF_OPEN:
+                if ticket.probe:
+                    # A probe without a verdict frees the way for the next one
+                    self._probe_in_flight = False
+                    if failed is not None:
+                        self._transition(self.OPEN if failed else self.CLOSED)
+                return
+            if failed is None or self.state == self.OPEN:
+                return
+            self._outcomes.append(failed)
+            failures = sum(self._outcomes)
+            if len(self._outcomes) >= self.min_calls and failures / len(self._outcomes) >= self.failure_ratio:
+                self._transition(self.OPEN)
+
+
+# One tracker and one breaker per process, shared by every LLMClient.
+llm_latency = LatencyTracker()
+llm_breaker = CircuitBreaker()
+
+LLM_CIRCUIT_STATE.set_function(lambda: CircuitBreaker._STATE_VALUES[llm_breaker.state])
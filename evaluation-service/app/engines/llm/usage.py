@@ -0,0 +1,80 @@
+import os
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+from app.utils.metrics import counter
+
+
+# --- Pricing (USD per 1M tokens) ---
+# Used only when OpenRouter does not report the call's cost itself.
+# Defaults are openai/gpt-4o-mini list prices.
+LLM_PRICE_PROMPT_PER_MTOK     = float(os.getenv("LLM_PRICE_PROMPT_PER_MTOK", "0.15"))
+LLM_PRICE_COMPLETION_PER_MTOK = float(os.getenv("LLM_PRICE_COMPLETION_PER_MTOK", "0.60"))
+
+LLM_CALLS = counter(
+    "llm_calls_total",
+    "LLM judgments by prompt template, model and source (api / cache)",
+    ["template", "model", "source"],
+)
+LLM_TOKENS = counter(
+    "llm_tokens_total",
+    "Tokens billed by OpenRouter, by prompt template, model and kind (prompt / completion)",
+    ["template", "model", "kind"],
+)
+LLM_COST = counter(
+    "llm_cost_usd_total",
+    "LLM spend in USD (reported by OpenRouter, else estimated from token prices)",
+    ["template", "model"],
+)
+
+# Calls made in the current context, when a caller asked for them (debug).
+_usage_log: ContextVar[Optional[List[Dict[str, Any]]]] = ContextVar("llm_usage_log", default=None)
+
+
+def begin_usage_log():
+    """
+    Starts recording LLM calls made in the current context.
+    Returns the token to pass to end_usage_log().
+    """
+    return _usage_log.set([])
+
+
+def end_usage_log(token) -> List[Dict[str, Any]]:
+    calls = _usage_log.get() or []
+    _usage_log.reset(token)
+    return calls
+
+
+def record_usage(template: str, model: str, usage: Optional[Dict[str, Any]], cached: bool = False) -> None:
+    """
+    Accounts one LLM judgment. `usage` is OpenRouter's response `usage`
+    block (None for cache hits, which cost nothing).
+    """
+    usage = usage or {}
+    prompt_tokens     = int(usage.get("prompt_tokens") or 0)
+    completion_tokens = int(usage.get("completion_tokens") or 0)
+
+    cost = usage.get("cost")
+    if cost is None:
+        cost = (
+            prompt_tokens * LLM_PRICE_PROMPT_PER_MTOK
+            + completion_tokens * LLM_PRICE_COMPLETION_PER_MTOK
+        ) / 1_000_000
+    cost = float(cost)
+
+    LLM_CALLS.inc(template=template, model=model, source="cache" if cached else "api")
+    if not cached:
+        LLM_TOKENS.inc(prompt_tokens, template=template, model=model, kind="prompt")
+        LLM_TOKENS.inc(completion_tokens, template=template, model=model, kind="completion")
+        LLM_COST.inc(cost, template=template, model=model)
+
+    calls = _usage_log.get()
+    if calls is not None:
+        calls.append({
+            "template":          template,
+            "model":             model,
+            "cached":            cached,
+            "prompt_tokens":     prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "cost_usd":          round(cost, 8),
+        })
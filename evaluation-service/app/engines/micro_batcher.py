@@ -0,0 +1,210 @@
+import asyncio
+import logging
+import time
+from typing import Callable, Generic, List, Optional, Tuple, TypeVar
+
+from app.engines.inference_executor import run_inference
+from app.utils.metrics import counter, gauge, histogram
+
+logger = logging.getLogger(__name__)
+
+I = TypeVar("I")
+O = TypeVar("O")
+
+
+# ── Batcher metrics (labelled by batcher name, e.g. "nli") ───────────────────
+BATCH_SIZE = histogram(
+    "inference_batch_size",
+    "Items per micro-batch forward pass",
+    ["batcher"],
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128),
+)
+BATCH_WAIT_SECONDS = histogram(
+    "inference_batch_wait_seconds",
+    "Time the first item of a micro-batch waited before dispatch",
+    ["batcher"],
+)
+BATCH_RUN_SECONDS = histogram(
+    "inference_batch_run_seconds",
+    "Wall-clock time of one micro-batch forward pass",
+    ["batcher"],
+)
+BATCH_ITEMS_TOTAL = counter(
+    "inference_batch_items_total",
+    "Items processed through micro-batchers",
+    ["batcher"],
+)
+BATCH_QUEUE_DEPTH = gauge(
+    "inference_batch_queue_depth",
+    "Items waiting to join a micro-batch",
+    ["batcher"],
+)
+BATCH_MAX_SIZE = gauge(
+    "inference_batch_max_size",
+    "Configured maximum micro-batch size",
+    ["batcher"],
+)
+BATCH_WINDOW_SECONDS = gauge(
+    "inference_batch_window_seconds",
+    "Configured micro-batch collection window",
+    ["batcher"],
+)
+
+
+class MicroBatcher(Generic[I, O]):
+    """
+    Dynamic micro-batching queue in front of a batch inference function.
+
+    Concurrent callers `await submit(item)`. A single worker task collects
+    items until either `max_batch_size` is reached or `max_wait_ms` has passed
+    since the first item arrived, runs `batch_fn(items)` once on the inference
+    executor, and resolves each caller's future with its own result.
+
+    While a batch is running, new items keep queueing, so under load batches
+    fill up naturally; under light load a lone item waits at most max_wait_ms.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        batch_fn: Callable[[List[I]], List[O]],
+        max_batch_size: int = 16,
+        max_wait_ms: float = 5.0,
+        max_queue_size: int = 256,
+    ):
+        self.name           = name
+        self.batch_fn       = batch_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait       = max(0.0, max_wait_ms) / 1000.0
+        self.max_queue_size = max_queue_size
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # Entries taken off the queue by the worker and not yet resolved:
+        # the batch being collected or run. close() fails these too.
+        self._inflight: List[Tuple[I, asyncio.Future, float]] = []
+
+        BATCH_MAX_SIZE.set(self.max_batch_size, batcher=name)
+        BATCH_WINDOW_SECONDS.set(self.max_wait, batcher=name)
+        BATCH_QUEUE_DEPTH.set_function(self.queue_depth, batcher=name)
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def _ensure_worker(self) -> asyncio.Queue:
+        # The queue and worker are bound to the running loop; recreate them if
+        # the batcher is reused from a different loop (scripts, tests).
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop   = loop
+            self._queue  = asyncio.Queue(maxsize=self.max_queue_size)
+            self._worker = loop.create_task(self._run(self._queue), name=f"micro-batcher-{self.name}")
+        return self._queue
+
+    async def submit(self, item: I) -> O:
+        queue  = self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        # Blocks (back-pressure) once max_queue_size items are waiting.
+        await queue.put((item, future, time.perf_counter()))
+        if queue is not self._queue:
+            # close() ran while this caller was blocked on a full queue; the
+            # item landed in a queue nothing reads any more.
+            future.cancel()
+            raise RuntimeError(f"Micro-batcher '{self.name}' is closed")
+        return await future
+
+    async def _collect(self, queue: asyncio.Queue, batch: List[Tuple[I, asyncio.Future, float]]) -> None:
+        batch.append(await queue.get())
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                # Window closed — still sweep anything already queued.
+                while len(batch) < self.max_batch_size and not queue.empty():
+                    batch.append(queue.get_nowait())
+                break
+            if not queue.empty():
+                batch.append(queue.get_nowait())
+                continue
+            # asyncio.wait (not wait_for) so a get() that completes right at
+            # the deadline is never dropped: a finished task keeps its item.
+            getter = asyncio.ensure_future(queue.get())
+            try:
+                done, _ = await asyncio.wait({getter}, timeout=remaining)
+            except asyncio.CancelledError:
+                # close(): keep an item the getter already took so it is failed too.
+                if getter.done() and not getter.cancelled():
+                    batch.append(getter.result())
+                else:
+                    getter.cancel()
+                raise
+            if getter in done:
+                batch.append(getter.result())
+            else:
+                getter.cancel()
+                break
+
+    async def _run(self, queue: asyncio.Queue) -> None:
+        while True:
+            self._inflight = []
+            await self._collect(queue, self._inflight)
+            # Callers that gave up (cancelled) are dropped before inference.
+            batch = self._inflight = [entry for entry in self._inflight if not entry[1].cancelled()]
+            if not batch:
+                continue
+
+            items = [entry[0] for entry in batch]
+            started = time.perf_counter()
+            BATCH_SIZE.observe(len(items), batcher=self.name)
+            BATCH_WAIT_SECONDS.observe(started - batch[0][2], batcher=self.name)
+
+            try:
+                results = await run_inference(self.batch_fn, items)
+                if len(results) != len(items):
+                    raise RuntimeError(
+                        f"{self.name} batch returned {len(results)} results for {len(items)} items"
+                    )
+            except Exception as e:
+                logger.error(f"Micro-batch '{self.name}' of {len(items)} failed: {e}")
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            finally:
+                BATCH_RUN_SECONDS.observe(time.perf_counter() - started, batcher=self.name)
+
+            BATCH_ITEMS_TOTAL.inc(len(items), batcher=self.name)
+            for (_, future, _), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+    async def close(self) -> None:
+        if self._worker is not None and not self._worker.done():
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+
+        queue, pending = self._queue, self._inflight
+        self._inflight = []
+        self._worker   = None
+        self._queue    = None
+        self._loop     = None
+
+        # Fail everything the worker will never resolve: the batch it was
+        # collecting or running, and whatever is still queued. Each item taken
+        # off a full queue lets one caller blocked in put() through, and that
+        # caller fails itself in submit(), so keep draining until none is left.
+        error = RuntimeError(f"Micro-batcher '{self.name}' is closed")
+        while True:
+            while queue is not None and not queue.empty():
+                pending.append(queue.get_nowait())
+            for _, future, _ in pending:
+                if not future.done():
+                    future.set_exception(error)
+            pending = []
+            await asyncio.sleep(0)
+            if queue is None or queue.empty():
+                break
@@ -0,0 +1,110 @@
+import logging
+import threading
+import time
+from typing import Any, Callable, Optional
+
+from app.utils.metrics import gauge
+
+logger = logging.getLogger(__name__)
+
+
+# ── Load states ──────────────────────────────────────────────────────────────
+NOT_LOADED = "not_loaded"
+LOADING    = "loading"
+WARMING_UP = "warming_up"
+READY      = "ready"
+FAILED     = "failed"
+
+MODEL_READY = gauge(
+    "model_ready",
+    "1 once the engine's model is loaded and warmed up, else 0",
+    ["engine"],
+)
+MODEL_LOAD_SECONDS = gauge(
+    "model_load_seconds",
+    "Time spent loading the engine's model",
+    ["engine"],
+)
+
+
+class ModelLoader:
+    """
+    Lazy, thread-safe loader for one engine's model.
+
+    `load_fn()` builds and returns the model state (heavy imports belong
+    inside it, not at module level); `warmup_fn(state)` runs one throwaway
+    inference so the first real request doesn't pay for lazy kernel / graph
+    initialisation.
+
+    `ensure_loaded()` is called on every inference path: the first caller
+    loads the model, concurrent callers block until it is there, everyone
+    after that gets the cached state. A failed load is re-attempted on the
+    next call, so a transient error (e.g. hub download) is not sticky.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        load_fn: Callable[[], Any],
+        warmup_fn: Optional[Callable[[Any], None]] = None,
+    ):
+        self.name      = name
+        self.load_fn   = load_fn
+        self.warmup_fn = warmup_fn
+
+        self.state: str = NOT_LOADED
+        self.error: Optional[str] = None
+        self.load_seconds:   Optional[float] = None
+        self.warmup_seconds: Optional[float] = None
+
+        self._value: Any = None
+        self._lock = threading.Lock()
+
+        MODEL_READY.set(0, engine=name)
+
+    @property
+    def ready(self) -> bool:
+        return self.state == READY
+
+    def ensure_loaded(self) -> Any:
+        if self.state == READY:
+            return self._value
+        with self._lock:
+            if self.state != READY:
+                self._load()
+            return self._value
+
+    def _load(self) -> None:
+        # Caller holds self._lock.
+        self.state, self.error = LOADING, None
+        logger.info(f"Loading '{self.name}' model...")
+        try:
+            started = time.perf_counter()
+            value = self.load_fn()
+            self.load_seconds = round(time.perf_counter() - started, 3)
+            MODEL_LOAD_SECONDS.set(self.load_seconds, engine=self.name)
+
+            if self.warmup_fn is not None:
+                self.state = WARMING_UP
+                started = time.perf_counter()
+                self.warmup_fn(value)
+                self.warmup_seconds = round(time.perf_counter() - started, 3)
+        except Exception as e:
+            self.state, self.error = FAILED, str(e)
+            logger.error(f"Loading '{self.name}' model failed: {e}")
+            raise
+
+        self._value = value
+        self.state  = READY
+        MODEL_READY.set(1, engine=self.name)
+        logger.info(
+            f"'{self.name}' model ready (load {self.load_seconds}s, warm-up {self.warmup_seconds}s)"
+        )
+
+    def status(self) -> dict:
+        return {
+            "state":          self.state,
+            "load_seconds":   self.load_seconds,
+            "warmup_seconds": self.warmup_seconds,
+            "error":          self.error,
+        }
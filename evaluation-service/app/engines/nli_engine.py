@@ -1,28 +1,243 @@
-from typing import Optional
-import torch
-import torch.nn.functional as F
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
+import os
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+import threading
+
+import numpy as np
+
+from app.engines.micro_batcher import MicroBatcher
+from app.engines.model_loader import ModelLoader
+
+
+# --- Micro-batching Configuration ---
+NLI_BATCH_MAX_SIZE   = int(os.getenv("NLI_BATCH_MAX_SIZE", "16"))
+NLI_BATCH_WAIT_MS    = float(os.getenv("NLI_BATCH_WAIT_MS", "5"))
+NLI_BATCH_QUEUE_SIZE = int(os.getenv("NLI_BATCH_QUEUE_SIZE", "256"))
+
+# --- Inference Backend ---
+# "torch" → eager PyTorch; "onnx" → exported graph on ONNX Runtime
+# (needs `onnx` + `onnxruntime`), dynamically int8-quantized unless disabled.
+NLI_BACKEND       = os.getenv("NLI_BACKEND", "torch").lower()
+NLI_ONNX_QUANTIZE = os.getenv("NLI_ONNX_QUANTIZE", "true").lower() in ("1", "true", "yes")
+NLI_BACKENDS      = ("torch", "onnx")
+
+# Model label mapping (cross-encoder/nli-distilroberta-base):
+#   index 0 = contradiction
+#   index 1 = entailment   ← correct index to use
+#   index 2 = neutral
+ENTAILMENT_INDEX = 1
+
+
+@dataclass(frozen=True)
+class _PairTemplate:
+    """
+    How the tokenizer joins a (premise, hypothesis) pair around the two
+    sequences' own token ids: [prefix] premise [middle] hypothesis [suffix].
+    Each part is a list of (token id, token type id).
+    """
+    prefix:          List[Tuple[int, int]]
+    middle:          List[Tuple[int, int]]
+    suffix:          List[Tuple[int, int]]
+    premise_type:    int
+    hypothesis_type: int
+    max_length:      int
+    pad_id:          int
+    with_types:      bool
+
+    def join(self, premise: List[int], hypothesis: List[int]) -> Tuple[List[int], List[int]]:
+        ids   = [t for t, _ in self.prefix] + premise + [t for t, _ in self.middle] + hypothesis + [t for t, _ in self.suffix]
+        types = (
+            [k for _, k in self.prefix] + [self.premise_type] * len(premise)
+            + [k for _, k in self.middle] + [self.hypothesis_type] * len(hypothesis)
+            + [k for _, k in self.suffix]
+        )
+        return ids, types
 
 
 class NLIEngine:
     """
     Transformer-based NLI using a lightweight cross-encoder model.
     Returns entailment score between 0.0 and 1.0.
+
+    Concurrent requests should use evaluate_async(), which routes pairs
+    through a micro-batcher so one padded forward pass serves many callers.
+
+    The model (and torch / transformers themselves) is loaded on first use
+    or by the startup warm-up, never at construction time.
+
+    With the "onnx" backend the model is exported once to ONNX_CACHE_DIR
+    (optionally int8-quantized) and run on ONNX Runtime; tokenisation,
+    the entailment index and rounding are identical to the torch path.
+
+    Reference answers of registered questions keep their premise token ids
+    (register_premise); pairs citing them only tokenise the student answer
+    and are joined with the tokenizer's own special tokens.
     """
 
-    def __init__(self):
-        model_name = "cross-encoder/nli-distilroberta-base"
-        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
-        self.model = AutoModelForSequenceClassification.from_pretrained(model_name)
-        self.model.eval()
+    MODEL_NAME = "cross-encoder/nli-distilroberta-base"
 
-    def evaluate(
-        self,
-        question: str,
-        student_answer: str,
-        reference_answer: Optional[str] = None
-    ) -> float:
+    def __init__(self, backend: Optional[str] = None, quantize: Optional[bool] = None):
+        self.backend  = (backend or NLI_BACKEND).lower()
+        self.quantize = NLI_ONNX_QUANTIZE if quantize is None else quantize
+        if self.backend not in NLI_BACKENDS:
+            raise ValueError(f"Unknown NLI backend '{self.backend}' (expected one of {NLI_BACKENDS})")
+
+        self.loader = ModelLoader("nli", self._load_model, self._warm_up)
+        # The fast tokenizer is not re-entrant ("Already borrowed") and the
+        # model is shared, so inference is serialised per engine instance.
+        self._lock = threading.Lock()
+
+        self.premises: Dict[str, List[int]] = {}
+        self._template: Optional[_PairTemplate] = None
+        self._template_probed = False
+
+        self.batcher: MicroBatcher[Tuple[str, str], float] = MicroBatcher(
+            "nli",
+            self.evaluate_pairs,
+            max_batch_size=NLI_BATCH_MAX_SIZE,
+            max_wait_ms=NLI_BATCH_WAIT_MS,
+            max_queue_size=NLI_BATCH_QUEUE_SIZE,
+        )
+
+    def _load_model(self):
+        from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+        tokenizer = AutoTokenizer.from_pretrained(self.MODEL_NAME)
+        if self.backend == "onnx":
+            return tokenizer, self._load_onnx_session(tokenizer)
+
+        model = AutoModelForSequenceClassification.from_pretrained(self.MODEL_NAME)
+        model.eval()
+        return tokenizer, model
+
+    def _load_onnx_session(self, tokenizer):
+        from app.engines.onnx_backend import create_session, ensure_onnx_model, export_to_onnx
+
+        def export(path):
+            from transformers import AutoModelForSequenceClassification
+
+            model = AutoModelForSequenceClassification.from_pretrained(self.MODEL_NAME)
+            sample = tokenizer(["The sky is blue."], ["The sky is blue."], return_tensors="pt")
+            export_to_onnx(
+                model,
+                dict(sample),
+                select_output=lambda outputs, _: outputs.logits,
+                output_names=["logits"],
+                dynamic_output_axes={"logits": {0: "batch"}},
+                path=path,
+            )
+
+        path = ensure_onnx_model(self.MODEL_NAME, self.quantize, export)
+        return create_session(path)
+
+    def _warm_up(self, loaded) -> None:
+        self._forward(loaded, ["The sky is blue."], ["The sky is blue."])
+
+    # ── Pre-tokenised premises ──────────────────────────────────────────────
+    @property
+    def artifact_version(self) -> str:
+        # Premise token ids depend on the tokenizer only (same for both backends)
+        return self.MODEL_NAME
+
+    def tokenize_premises(self, references: List[str]) -> List[List[int]]:
+        """
+        Token ids (without special tokens) of each reference answer.
+        """
+        tokenizer, _ = self.loader.ensure_loaded()
+        with self._lock:
+            return [list(ids) for ids in tokenizer(references, add_special_tokens=False)["input_ids"]]
+
+    def register_premise(self, reference: str, token_ids: List[int]) -> None:
+        self.premises[reference] = list(token_ids)
+
+    def unregister_premise(self, reference: str) -> None:
+        self.premises.pop(reference, None)
+
+    def _pair_template(self, tokenizer) -> Optional[_PairTemplate]:
+        """
+        Learns the pair layout from one probe pair. None if the tokenizer's
+        output does not decompose that way; pairs are then always tokenised
+        together. Called under self._lock.
+        """
+        if self._template_probed:
+            return self._template
+        self._template_probed = True
+
+        first  = tokenizer("a", add_special_tokens=False)["input_ids"]
+        second = tokenizer("b", add_special_tokens=False)["input_ids"]
+        pair   = tokenizer("a", "b")
+        ids    = list(pair["input_ids"])
+        types  = list(pair.get("token_type_ids") or [0] * len(ids))
 
+        def find(part: List[int], start: int) -> int:
+            for i in range(start, len(ids) - len(part) + 1):
+                if ids[i:i + len(part)] == part:
+                    return i
+            return -1
+
+        i = find(first, 0)
+        j = find(second, i + len(first)) if i >= 0 else -1
+        if i < 0 or j < 0 or tokenizer.pad_token_id is None or tokenizer.padding_side != "right":
+            return None
+
+        tagged = list(zip(ids, types))
+        self._template = _PairTemplate(
+            prefix=tagged[:i],
+            middle=tagged[i + len(first):j],
+            suffix=tagged[j + len(second):],
+            premise_type=types[i],
+            hypothesis_type=types[j],
+            max_length=tokenizer.model_max_length,
+            pad_id=tokenizer.pad_token_id,
+            with_types="token_type_ids" in tokenizer.model_input_names,
+        )
+        return self._template
+
+    def _tokenize(self, tokenizer, premises: List[str], hypotheses: List[str], tensors: str) -> dict:
+        """
+        Padded model inputs for the pairs. Registered premises are reused
+        instead of being tokenised again for every pair. Called under self._lock.
+        """
+        template = self._pair_template(tokenizer) if any(p in self.premises for p in premises) else None
+        if template is not None:
+            missing = [p for p in dict.fromkeys(premises) if p not in self.premises]
+            fresh = dict(zip(missing, tokenizer(missing, add_special_tokens=False)["input_ids"])) if missing else {}
+            hypothesis_ids = tokenizer(hypotheses, add_special_tokens=False)["input_ids"]
+            rows = [
+                template.join(self.premises[p] if p in self.premises else list(fresh[p]), list(h))
+                for p, h in zip(premises, hypothesis_ids)
+            ]
+            width = max(len(ids) for ids, _ in rows)
+            # Over-long pairs need the tokenizer's own truncation
+            if width <= template.max_length:
+                input_ids      = np.full((len(rows), width), template.pad_id, dtype=np.int64)
+                attention_mask = np.zeros((len(rows), width), dtype=np.int64)
+                token_type_ids = np.zeros((len(rows), width), dtype=np.int64)
+                for row, (ids, types) in enumerate(rows):
+                    input_ids[row, :len(ids)]      = ids
+                    attention_mask[row, :len(ids)] = 1
+                    token_type_ids[row, :len(ids)] = types
+                inputs = {"input_ids": input_ids, "attention_mask": attention_mask}
+                if template.with_types:
+                    inputs["token_type_ids"] = token_type_ids
+                if tensors == "pt":
+                    import torch
+
+                    return {name: torch.from_numpy(value) for name, value in inputs.items()}
+                return inputs
+
+        return tokenizer(
+            premises,
+            hypotheses,
+            return_tensors=tensors,
+            truncation=True,
+            padding=True
+        )
+
+    def _shortcut(self, student_answer: str, reference_answer: Optional[str]) -> Optional[float]:
+        """
+        Scores that need no model call; None means run inference.
+        """
         if not student_answer or student_answer.strip() == "":
             return 0.0
 
@@ -30,27 +245,83 @@ class NLIEngine:
         if not reference_answer:
             return 0.5
 
+        return None
+
+    def evaluate(
+        self,
+        question: str,
+        student_answer: str,
+        reference_answer: Optional[str] = None
+    ) -> float:
+
+        shortcut = self._shortcut(student_answer, reference_answer)
+        if shortcut is not None:
+            return shortcut
+
         premise = reference_answer
         hypothesis = student_answer
 
-        inputs = self.tokenizer(
-            premise,
-            hypothesis,
-            return_tensors="pt",
-            truncation=True,
-            padding=True
-        )
+        return self.evaluate_pairs([(premise, hypothesis)])[0]
+
+    async def evaluate_async(
+        self,
+        question: str,
+        student_answer: str,
+        reference_answer: Optional[str] = None
+    ) -> float:
+        """
+        Same contract as evaluate(), but the forward pass is shared with
+        other in-flight requests via the micro-batcher.
+        """
+        shortcut = self._shortcut(student_answer, reference_answer)
+        if shortcut is not None:
+            return shortcut
+
+        return await self.batcher.submit((reference_answer, student_answer))
+
+    def evaluate_pairs(self, pairs: List[Tuple[str, str]]) -> List[float]:
+        """
+        Scores a batch of (premise, hypothesis) pairs in one padded forward
+        pass. Returns entailment probabilities rounded to 3 decimals, in order.
+        """
+        premises   = [p for p, _ in pairs]
+        hypotheses = [h for _, h in pairs]
 
-        with torch.no_grad():
-            outputs = self.model(**inputs)
+        return self._forward(self.loader.ensure_loaded(), premises, hypotheses)
+
+    def _forward(self, loaded, premises: List[str], hypotheses: List[str]) -> List[float]:
+        if self.backend == "onnx":
+            return self._forward_onnx(loaded, premises, hypotheses)
+
+        import torch
+        import torch.nn.functional as F
+
+        tokenizer, model = loaded
+        with self._lock:
+            inputs = self._tokenize(tokenizer, premises, hypotheses, "pt")
+
+            with torch.no_grad():
+                outputs = model(**inputs)
 
         logits = outputs.logits
         probs = F.softmax(logits, dim=1)
 
-        # Model label mapping (cross-encoder/nli-distilroberta-base):
-        #   index 0 = contradiction
-        #   index 1 = entailment   ← correct index to use
-        #   index 2 = neutral
-        entailment_score = probs[0][1].item()
+        entailment_scores = probs[:, ENTAILMENT_INDEX].tolist()
+
+        return [round(score, 3) for score in entailment_scores]
+
+    def _forward_onnx(self, loaded, premises: List[str], hypotheses: List[str]) -> List[float]:
+        from app.engines.onnx_backend import session_feed
+
+        tokenizer, session = loaded
+        with self._lock:
+            inputs = self._tokenize(tokenizer, premises, hypotheses, "np")
+            logits = session.run(["logits"], session_feed(session, inputs))[0]
+
+        # Same softmax as the torch path, in NumPy
+        shifted = np.exp(logits - logits.max(axis=1, keepdims=True))
+        probs = shifted / shifted.sum(axis=1, keepdims=True)
+
+        entailment_scores = probs[:, ENTAILMENT_INDEX].tolist()
 
-        return round(entailment_score, 3)
+        return [round(score, 3) for score in entailment_scores]
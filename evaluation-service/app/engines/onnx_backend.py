@@ -0,0 +1,151 @@
+import os
+import logging
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from app.utils.storage import cache_path
+
+logger = logging.getLogger(__name__)
+
+
+# --- ONNX Runtime Configuration ---
+ONNX_CACHE_DIR = os.getenv("ONNX_CACHE_DIR", cache_path("onnx"))
+ONNX_OPSET     = int(os.getenv("ONNX_OPSET", "17"))
+
+# Threads per ONNX Runtime session. Each inference executor worker runs one
+# session call at a time, so workers × intra-op threads should not exceed the
+# cores available to the process. Unset → 0 = let ONNX Runtime decide.
+ONNX_INTRA_OP_THREADS = int(os.getenv("ONNX_INTRA_OP_THREADS", "0"))
+ONNX_INTER_OP_THREADS = int(os.getenv("ONNX_INTER_OP_THREADS", "1"))
+
+
+def onnx_model_path(model_name: str, quantize: bool) -> Path:
+    """
+    Where the exported (and optionally int8-quantized) graph is cached. The
+    opset is part of the name, so changing ONNX_OPSET re-exports.
+    """
+    directory = Path(ONNX_CACHE_DIR) / model_name.replace("/", "__")
+    stem = f"model.opset{ONNX_OPSET}"
+    return directory / (f"{stem}.int8.onnx" if quantize else f"{stem}.onnx")
+
+
+def _write_atomically(path: Path, write: Callable[[Path], None]) -> None:
+    """
+    Runs `write(tmp)` on a temporary file next to `path` and renames it into
+    place, so an interrupted export or a concurrent worker never leaves (or
+    loads) a truncated graph at the final path.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    os.close(fd)
+    tmp = Path(tmp_name)
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+        logger.info(f"Cached ONNX graph at {path}")
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+def export_to_onnx(
+    model,
+    sample_inputs: Dict[str, Any],
+    select_output: Callable[[Any, Dict[str, Any]], Any],
+    output_names: List[str],
+    dynamic_output_axes: Dict[str, Dict[int, str]],
+    path: Path,
+) -> None:
+    """
+    Exports a Hugging Face model called with the tokenizer's tensors as
+    keyword inputs. `select_output(outputs, inputs)` picks (or post-processes)
+    what the graph returns, e.g. the logits. Batch and sequence dimensions of
+    every input are exported as dynamic.
+    """
+    import torch
+
+    input_names  = list(sample_inputs.keys())
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes.update(dynamic_output_axes)
+
+    class _KeywordInputs(torch.nn.Module):
+        def __init__(self):
+            super().__init__()
+            self.model = model
+
+        def forward(self, *tensors):
+            inputs = dict(zip(input_names, tensors))
+            return select_output(self.model(**inputs), inputs)
+
+    # The exporter restores the wrapper's train/eval mode afterwards (and
+    # with it the model's); eval keeps dropout off for the caller too.
+    module = _KeywordInputs().eval()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with torch.no_grad():
+        torch.onnx.export(
+            module,
+            tuple(sample_inputs[name] for name in input_names),
+            str(path),
+            input_names=input_names,
+            output_names=output_names,
+            dynamic_axes=dynamic_axes,
+            opset_version=ONNX_OPSET,
+            dynamo=False,
+        )
+    logger.info(f"Exported ONNX graph (opset {ONNX_OPSET})")
+
+
+def quantize_int8(source: Path, target: Path) -> None:
+    """
+    Dynamic int8 quantization: weights stored as int8, activations quantized
+    on the fly. No calibration data needed.
+    """
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    quantize_dynamic(str(source), str(target), weight_type=QuantType.QInt8)
+    logger.info(f"Quantized {source.name} (int8)")
+
+
+def ensure_onnx_model(
+    model_name: str,
+    quantize: bool,
+    export_fn: Callable[[Path], None],
+) -> Path:
+    """
+    Returns the cached ONNX graph for `model_name`, exporting it with
+    `export_fn(path)` (and quantizing) the first time. Both steps write to a
+    temporary file that is only renamed to the cached path once complete.
+    """
+    fp32_path = onnx_model_path(model_name, quantize=False)
+    if not fp32_path.exists():
+        _write_atomically(fp32_path, export_fn)
+    if not quantize:
+        return fp32_path
+
+    int8_path = onnx_model_path(model_name, quantize=True)
+    if not int8_path.exists():
+        _write_atomically(int8_path, lambda tmp: quantize_int8(fp32_path, tmp))
+    return int8_path
+
+
+def create_session(path: Path, intra_op_threads: Optional[int] = None):
+    """
+    CPU inference session with full graph optimisation and tuned threading.
+    """
+    import onnxruntime as ort
+
+    options = ort.SessionOptions()
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+    options.intra_op_num_threads = ONNX_INTRA_OP_THREADS if intra_op_threads is None else intra_op_threads
+    options.inter_op_num_threads = ONNX_INTER_OP_THREADS
+
+    return ort.InferenceSession(str(path), sess_options=options, providers=["CPUExecutionProvider"])
+
+
+def session_feed(session, encoded: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Tokenizer output (NumPy) restricted to the graph's inputs, as int64.
+    """
+    names = {i.name for i in session.get_inputs()}
+    return {name: value.astype("int64") for name, value in encoded.items() if name in names}
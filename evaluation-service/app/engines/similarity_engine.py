@@ -1,13 +1,54 @@
-from typing import Optional, Tuple
-from sentence_transformers import SentenceTransformer
+import os
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+import threading
 import numpy as np
 from numpy.linalg import norm
 
+from app.engines.micro_batcher import MicroBatcher
+from app.engines.embedding_cache import EmbeddingCache
+from app.engines.model_loader import ModelLoader
+
 
 # --- Threshold Constants ---
 NOISE_THRESHOLD = 0.3   # Below this → treat as irrelevant noise
 FULL_THRESHOLD  = 0.7   # Above this → high-confidence semantic match
 
+# --- Micro-batching Configuration ---
+SIMILARITY_BATCH_MAX_SIZE   = int(os.getenv("SIMILARITY_BATCH_MAX_SIZE", "32"))
+SIMILARITY_BATCH_WAIT_MS    = float(os.getenv("SIMILARITY_BATCH_WAIT_MS", "5"))
+SIMILARITY_BATCH_QUEUE_SIZE = int(os.getenv("SIMILARITY_BATCH_QUEUE_SIZE", "256"))
+
+# --- Reference Embedding Cache ---
+REFERENCE_CACHE_SIZE = int(os.getenv("REFERENCE_EMBEDDING_CACHE_SIZE", "10000"))
+REFERENCE_CACHE_MB   = float(os.getenv("REFERENCE_EMBEDDING_CACHE_MB", "64"))
+
+# --- Inference Backend ---
+# "torch" → sentence-transformers; "onnx" → exported transformer + mean
+# pooling on ONNX Runtime (needs `onnx` + `onnxruntime`), int8 unless disabled.
+SIMILARITY_BACKEND        = os.getenv("SIMILARITY_BACKEND", "torch").lower()
+SIMILARITY_ONNX_QUANTIZE  = os.getenv("SIMILARITY_ONNX_QUANTIZE", "true").lower() in ("1", "true", "yes")
+SIMILARITY_MAX_SEQ_LENGTH = int(os.getenv("SIMILARITY_MAX_SEQ_LENGTH", "256"))  # MiniLM's own limit
+SIMILARITY_BACKENDS       = ("torch", "onnx")
+
+# Precision of stored (cached) reference embeddings: float32 | float16 | int8.
+# Cosine is scale-invariant, so int8 vectors are stored as round(v / max|v| × 127)
+# and compared directly, no per-vector scale needed.
+EMBEDDING_STORAGE_DTYPE  = os.getenv("EMBEDDING_STORAGE_DTYPE", "float32").lower()
+EMBEDDING_STORAGE_DTYPES = ("float32", "float16", "int8")
+
+
+@dataclass(frozen=True)
+class RegisteredReference:
+    """
+    Reference-side work for a registered question, done once: the
+    normalised text and token set of the exact-match / containment rule and
+    the embedding (in storage precision).
+    """
+    clean:     str
+    tokens:    FrozenSet[str]
+    embedding: np.ndarray
+
 
 class SimilarityEngine:
     """
@@ -18,11 +59,169 @@ class SimilarityEngine:
         < 0.30  → Noise   (0 marks signal)
         0.30-0.70 → Partial (partial credit possible)
         > 0.70  → Full    (full conceptual credit)
+
+    Concurrent requests should use evaluate_with_band_async(): pairs from
+    many evaluations are pooled into a single encode() call and scored with
+    vectorised NumPy.
+
+    Reference answers repeat for every student answering the same question,
+    so their embeddings are kept in an LRU cache; once a question has been
+    seen only the student answer is encoded.
+
+    References of registered questions (register_reference) are held
+    outside that cache, together with their exact-match token sets, so
+    answers citing them only cost the student-side work. They are only
+    dropped (unregister_reference) once no registered question uses them.
+
+    The model (and sentence-transformers / torch) is loaded on first use or
+    by the startup warm-up, never at construction time.
+
+    With the "onnx" backend the transformer and mean pooling (plus the L2
+    normalisation sentence-transformers applies) are exported once to
+    ONNX_CACHE_DIR, optionally int8-quantized, and run on ONNX Runtime.
     """
 
-    def __init__(self):
-        # Lightweight, fast, production-friendly
-        self.model = SentenceTransformer("sentence-transformers/all-MiniLM-L6-v2")
+    # Lightweight, fast, production-friendly
+    MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+
+    def __init__(
+        self,
+        backend: Optional[str] = None,
+        quantize: Optional[bool] = None,
+        storage_dtype: Optional[str] = None,
+    ):
+        self.backend       = (backend or SIMILARITY_BACKEND).lower()
+        self.quantize      = SIMILARITY_ONNX_QUANTIZE if quantize is None else quantize
+        self.storage_dtype = (storage_dtype or EMBEDDING_STORAGE_DTYPE).lower()
+        if self.backend not in SIMILARITY_BACKENDS:
+            raise ValueError(f"Unknown similarity backend '{self.backend}' (expected one of {SIMILARITY_BACKENDS})")
+        if self.storage_dtype not in EMBEDDING_STORAGE_DTYPES:
+            raise ValueError(
+                f"Unknown embedding storage dtype '{self.storage_dtype}' (expected one of {EMBEDDING_STORAGE_DTYPES})"
+            )
+
+        self.loader = ModelLoader("similarity", self._load_model, self._warm_up)
+        # encode() may be called from several executor threads; the shared
+        # model/tokenizer is not re-entrant, so calls are serialised.
+        self._lock = threading.Lock()
+
+        self.reference_cache = EmbeddingCache(
+            "reference",
+            max_entries=REFERENCE_CACHE_SIZE,
+            max_bytes=int(REFERENCE_CACHE_MB * 1024 * 1024),
+        )
+        self.registered: Dict[str, RegisteredReference] = {}
+
+        self.batcher: MicroBatcher[Tuple[str, str], Tuple[float, str]] = MicroBatcher(
+            "similarity",
+            self.evaluate_pairs,
+            max_batch_size=SIMILARITY_BATCH_MAX_SIZE,
+            max_wait_ms=SIMILARITY_BATCH_WAIT_MS,
+            max_queue_size=SIMILARITY_BATCH_QUEUE_SIZE,
+        )
+
+    def _load_model(self):
+        if self.backend == "onnx":
+            return self._load_onnx_session()
+
+        from sentence_transformers import SentenceTransformer
+
+        return SentenceTransformer(self.MODEL_NAME)
+
+    def _load_onnx_session(self):
+        from transformers import AutoTokenizer
+        from app.engines.onnx_backend import create_session, ensure_onnx_model, export_to_onnx
+
+        tokenizer = AutoTokenizer.from_pretrained(self.MODEL_NAME)
+
+        def mean_pool_normalize(outputs, inputs):
+            # sentence-transformers' Pooling(mean) + Normalize, inside the graph
+            import torch
+
+            mask   = inputs["attention_mask"].unsqueeze(-1).to(outputs.last_hidden_state.dtype)
+            summed = (outputs.last_hidden_state * mask).sum(dim=1)
+            pooled = summed / mask.sum(dim=1).clamp(min=1e-9)
+            return torch.nn.functional.normalize(pooled, p=2, dim=1)
+
+        def export(path):
+            from transformers import AutoModel
+
+            model  = AutoModel.from_pretrained(self.MODEL_NAME)
+            sample = tokenizer(["warm-up"], return_tensors="pt")
+            export_to_onnx(
+                model,
+                dict(sample),
+                select_output=mean_pool_normalize,
+                output_names=["sentence_embedding"],
+                dynamic_output_axes={"sentence_embedding": {0: "batch"}},
+                path=path,
+            )
+
+        path = ensure_onnx_model(self.MODEL_NAME, self.quantize, export)
+        return tokenizer, create_session(path)
+
+    def _warm_up(self, model) -> None:
+        self._encode_with(model, ["warm-up"])
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        return self._encode_with(self.loader.ensure_loaded(), texts)
+
+    def _encode_with(self, model, texts: List[str]) -> np.ndarray:
+        if self.backend == "onnx":
+            from app.engines.onnx_backend import session_feed
+
+            tokenizer, session = model
+            with self._lock:
+                inputs = tokenizer(
+                    texts,
+                    return_tensors="np",
+                    truncation=True,
+                    max_length=SIMILARITY_MAX_SEQ_LENGTH,
+                    padding=True,
+                )
+                return session.run(["sentence_embedding"], session_feed(session, inputs))[0]
+
+        with self._lock:
+            return model.encode(texts, convert_to_numpy=True)
+
+    def to_storage(self, vector: np.ndarray) -> np.ndarray:
+        """
+        Converts a float32 embedding to the configured storage precision.
+        Always returns a new array (never a view into a batch).
+        """
+        if self.storage_dtype == "float16":
+            return vector.astype(np.float16)
+        if self.storage_dtype == "int8":
+            scale = float(np.abs(vector).max())
+            if scale == 0.0:
+                return np.zeros(vector.shape, dtype=np.int8)
+            return np.round(vector / scale * 127).astype(np.int8)
+        return vector.astype(np.float32, copy=True)
+
+    @property
+    def artifact_version(self) -> str:
+        # Stored reference embeddings are only valid for the same model and precision
+        return f"{self.MODEL_NAME}|{self.backend}|{self.quantize}|{self.storage_dtype}"
+
+    @staticmethod
+    def reference_tokens(reference: str) -> FrozenSet[str]:
+        return frozenset(reference.strip().lower().split())
+
+    def embed_references(self, references: List[str]) -> List[np.ndarray]:
+        """
+        Reference embeddings in storage precision, one encode() call.
+        """
+        return [self.to_storage(vector) for vector in self._encode(references)]
+
+    def register_reference(self, reference: str, embedding: np.ndarray, tokens: Optional[FrozenSet[str]] = None) -> None:
+        self.registered[reference] = RegisteredReference(
+            clean=reference.strip().lower(),
+            tokens=self.reference_tokens(reference) if tokens is None else frozenset(tokens),
+            embedding=embedding,
+        )
+
+    def unregister_reference(self, reference: str) -> None:
+        self.registered.pop(reference, None)
 
     def _cosine_similarity(self, vec1, vec2) -> float:
         if norm(vec1) == 0 or norm(vec2) == 0:
@@ -52,22 +251,14 @@ class SimilarityEngine:
         score, _ = self.evaluate_with_band(student_answer, reference_answer)
         return score
 
-    def evaluate_with_band(
+    def _shortcut(
         self,
         student_answer: str,
         reference_answer: Optional[str]
-    ) -> Tuple[float, str]:
+    ) -> Optional[Tuple[float, str]]:
         """
-        Returns (score: float, band: str) — the primary method for the
-        Balanced Teacher pipeline.
-
-        Rules (in priority order):
-        1. Empty student answer  → (0.0, "Noise")
-        2. No reference provided → (0.5, "Partial") fallback
-        3. Exact-match override  → (1.0, "Full") — bypasses all vector checks.
-           Prevents legitimate single-word answers ("Islamabad") from being
-           downgraded due to embedding space quirks.
-        4. Vector cosine + banding
+        Rules 1-3 of evaluate_with_band(), which need no embeddings.
+        Returns None when the pair has to go through the model.
         """
         if not student_answer or student_answer.strip() == "":
             return 0.0, "Noise"
@@ -75,8 +266,9 @@ class SimilarityEngine:
         if not reference_answer:
             return 0.5, "Partial"  # backward-compatible neutral fallback
 
+        registered      = self.registered.get(reference_answer)
         student_clean   = student_answer.strip().lower()
-        reference_clean = reference_answer.strip().lower()
+        reference_clean = registered.clean if registered else reference_answer.strip().lower()
 
         # ── Rule 3: Exact-match override ──────────────────────────────────────
         # Case-insensitive exact equality OR the student answer is a clean
@@ -88,26 +280,121 @@ class SimilarityEngine:
         # Token-level containment: every word in the student answer appears
         # verbatim in the reference (handles "The city of Islamabad" → "Full")
         student_tokens    = set(student_clean.split())
-        reference_tokens  = set(reference_clean.split())
+        reference_tokens  = registered.tokens if registered else set(reference_clean.split())
         # All student tokens found in reference AND student is ≤ 4 words
         if student_tokens and student_tokens.issubset(reference_tokens) and len(student_tokens) <= 4:
             return 1.0, "Full"
 
+        return None
+
+    def evaluate_with_band(
+        self,
+        student_answer: str,
+        reference_answer: Optional[str]
+    ) -> Tuple[float, str]:
+        """
+        Returns (score: float, band: str) — the primary method for the
+        Balanced Teacher pipeline.
+
+        Rules (in priority order):
+        1. Empty student answer  → (0.0, "Noise")
+        2. No reference provided → (0.5, "Partial") fallback
+        3. Exact-match override  → (1.0, "Full") — bypasses all vector checks.
+           Prevents legitimate single-word answers ("Islamabad") from being
+           downgraded due to embedding space quirks.
+        4. Vector cosine + banding
+        """
+        shortcut = self._shortcut(student_answer, reference_answer)
+        if shortcut is not None:
+            return shortcut
+
         # ── Rule 4: Vector cosine similarity ─────────────────────────────────
-        embeddings = self.model.encode(
-            [student_answer, reference_answer],
-            convert_to_numpy=True
-        )
-        similarity_score = self._cosine_similarity(embeddings[0], embeddings[1])
+        return self.evaluate_pairs([(student_answer, reference_answer)])[0]
+
+    async def evaluate_with_band_async(
+        self,
+        student_answer: str,
+        reference_answer: Optional[str]
+    ) -> Tuple[float, str]:
+        """
+        Same contract as evaluate_with_band(); Rule 4 is micro-batched with
+        other in-flight requests.
+        """
+        shortcut = self._shortcut(student_answer, reference_answer)
+        if shortcut is not None:
+            return shortcut
+
+        return await self.batcher.submit((student_answer, reference_answer))
+
+    def evaluate_pairs(self, pairs: List[Tuple[str, str]]) -> List[Tuple[float, str]]:
+        """
+        Rule 4 for a batch of (student_answer, reference_answer) pairs:
+        one encode() call for the distinct student answers and any references
+        not in the cache, then cosine, [-1,1] → [0,1] normalisation, banding
+        and the Noise floor vectorised over the batch.
+        """
+        reference_vectors = self._reference_embeddings(pairs)
+
+        # Student answers (plus any uncached references) go through one encode().
+        texts = list(dict.fromkeys(
+            [s for s, _ in pairs] + [r for _, r in pairs if r not in reference_vectors]
+        ))
+        embeddings = self._encode(texts)
+        row = {text: i for i, text in enumerate(texts)}
+
+        for _, r in pairs:
+            if r not in reference_vectors:
+                # to_storage() copies, so the cache does not pin the whole
+                # batch array. Fresh and cached references are scored from the
+                # same stored form, so a score never depends on cache state.
+                reference_vectors[r] = self.to_storage(embeddings[row[r]])
+                self.reference_cache.put(r, reference_vectors[r])
+
+        students   = embeddings[[row[s] for s, _ in pairs]].astype(np.float32)
+        references = np.stack([reference_vectors[r] for _, r in pairs]).astype(np.float32)
+
+        norms = norm(students, axis=1) * norm(references, axis=1)
+        dots  = np.einsum("ij,ij->i", students, references)
+        cosine = np.divide(dots, norms, out=np.zeros_like(dots), where=norms != 0)
 
         # Normalize from [-1,1] to [0,1]
-        similarity_score = (similarity_score + 1) / 2
-        similarity_score = round(float(similarity_score), 3)
+        scores = np.array([round(float(s), 3) for s in (cosine + 1) / 2])
 
-        band = self.classify(similarity_score)
+        bands = np.where(
+            scores >= FULL_THRESHOLD, "Full",
+            np.where(scores >= NOISE_THRESHOLD, "Partial", "Noise")
+        )
 
         # Apply Noise floor — suppress scores below threshold
-        if band == "Noise":
-            similarity_score = 0.0
+        scores = np.where(bands == "Noise", 0.0, scores)
 
-        return similarity_score, band
+        return [(float(score), str(band)) for score, band in zip(scores, bands)]
+
+    def _reference_embeddings(self, pairs: List[Tuple[str, str]]) -> Dict[str, np.ndarray]:
+        """
+        Registered or cached embeddings for the batch's distinct reference
+        answers. References found in neither are left out (to be encoded).
+        """
+        found: Dict[str, np.ndarray] = {}
+        for reference in dict.fromkeys(r for _, r in pairs):
+            registered = self.registered.get(reference)
+            if registered is not None:
+                found[reference] = registered.embedding
+                continue
+            vector = self.reference_cache.get(reference)
+            if vector is not None:
+                found[reference] = vector
+        return found
+
+    def preload_references(self, references: Iterable[str]) -> int:
+        """
+        Pre-seeds the reference cache (e.g. with an exam's reference answers
+        before grading starts). Returns how many embeddings were computed.
+        """
+        missing = [r for r in self.reference_cache.missing(references) if r and r.strip()]
+        if not missing:
+            return 0
+        embeddings = self._encode(missing)
+        for reference, vector in zip(missing, embeddings):
+            self.reference_cache.put(reference, self.to_storage(vector))
+        return len(missing)
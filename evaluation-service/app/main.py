@@ -19,11 +19,79 @@ load_dotenv(env_path, override=True)
 
 print("Loaded .env from:", env_path)
 
+import asyncio
+import contextlib
+import time
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.evaluation_routes import router as evaluate_router
+from fastapi.responses import JSONResponse, PlainTextResponse
+from starlette.datastructures import MutableHeaders
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.api.evaluation_routes import router as evaluate_router, evaluation_service, job_runner
+from app.engines.llm.client import LLMClient
+from app.engines.llm.http_pool import open_http_client, close_http_client
+from app.engines.llm.cache import llm_cache
+from app.engines.inference_executor import shutdown_inference_executor
+from app.services.result_store import result_store
+from app.services.question_bank import question_bank
+from app.utils.metrics import gauge, histogram, render_prometheus, PROMETHEUS_CONTENT_TYPE
+from app.utils.timing import (
+    begin_request_timings,
+    current_request_timings,
+    end_request_timings,
+    server_timing_header,
+)
+
+# Load and warm the ML models in the background as soon as the app starts.
+# Off → each model loads on the first request that needs it.
+MODEL_PRELOAD = os.getenv("MODEL_PRELOAD", "true").lower() in ("1", "true", "yes")
+
+
+REQUESTS_IN_FLIGHT = gauge(
+    "http_requests_in_flight",
+    "HTTP requests currently being handled",
+    ["path"],
+)
+REQUEST_SECONDS = histogram(
+    "http_request_duration_seconds",
+    "End-to-end HTTP request latency",
+    ["path", "method", "status"],
+)
+
 
-app = FastAPI(title="Evaluation Service")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One pooled HTTP client for every OpenRouter call, warmed before traffic
+    await open_http_client(warmup_url=LLMClient.OPENROUTER_API_URL)
+
+    # Registered questions and their stored reference artifacts (no model needed)
+    await evaluation_service.load_questions()
+
+    # Models load off the startup path: the app binds (and /health answers)
+    # immediately, /ready turns 200 once every engine is warmed up.
+    warm_up_task = asyncio.create_task(evaluation_service.warm_up()) if MODEL_PRELOAD else None
+
+    # Write-behind flusher for graded results
+    await result_store.start()
+    # Workers for POST /evaluate/jobs; resumes jobs a previous process left unfinished
+    await job_runner.start()
+    yield
+    await job_runner.stop()
+    await result_store.close()
+    question_bank.close()
+    if warm_up_task is not None and not warm_up_task.done():
+        warm_up_task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await warm_up_task
+    await evaluation_service.aclose()
+    await close_http_client()
+    llm_cache.close()
+    shutdown_inference_executor()
+
+
+app = FastAPI(title="Evaluation Service", lifespan=lifespan)
 
 # Add CORS middleware
 app.add_middleware(
@@ -36,6 +104,76 @@ app.add_middleware(
 # FastAPI app ka entry point
 app.include_router(evaluate_router, prefix="/evaluate")
 
+
+def _route_template(scope: Scope) -> str:
+    # Route template (e.g. "/evaluate/jobs/{job_id}") keeps label cardinality bounded
+    for route in app.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+    return "other"
+
+
+class StageTimingMiddleware:
+    """
+    Per-request stage timings → Server-Timing header; latency histogram and
+    in-flight gauge per path. Unmatched paths share one label value.
+
+    Plain ASGI rather than @app.middleware("http"): the wrapped app only
+    returns once the last body chunk is sent, so a streamed response (the
+    NDJSON batch stream) stays in flight and is timed until it ends. Its
+    headers leave before any stage has run, so only responses with a
+    Content-Length carry Server-Timing.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        path = _route_template(scope)
+        token = begin_request_timings()
+        started = time.perf_counter()
+        status = "500"
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+                headers = MutableHeaders(scope=message)
+                if "content-length" in headers:
+                    headers["Server-Timing"] = server_timing_header(
+                        current_request_timings(), total=time.perf_counter() - started
+                    )
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc(path=path)
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            REQUESTS_IN_FLIGHT.dec(path=path)
+            REQUEST_SECONDS.observe(time.perf_counter() - started, path=path, method=scope["method"], status=status)
+            end_request_timings(token)
+
+
+app.add_middleware(StageTimingMiddleware)
+
+
 @app.get("/health")
 def health_check():
+    # Liveness only — the process is up. Model state is reported by /ready.
     return {"status": "ok"}
+
+@app.get("/ready")
+def readiness_check():
+    # 503 until every model-backed engine is loaded and warmed up
+    readiness = evaluation_service.readiness()
+    return JSONResponse(readiness, status_code=200 if readiness["ready"] else 503)
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    # Prometheus text exposition of every registered metric
+    return PlainTextResponse(render_prometheus(), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -1,5 +1,7 @@
-from pydantic import BaseModel
-from typing import Dict, List, Optional
+from pydantic import BaseModel, field_validator
+from typing import Any, Dict, List, Optional
+
+from app.utils.webhooks import check_webhook_url
 
 class RubricWeight(BaseModel):
     # Support for legacy 6-key schema (mappings will be handled in service)
@@ -16,13 +18,23 @@ class RubricWeight(BaseModel):
     clarity: Optional[float] = None
 
 class EvaluationRequest(BaseModel):
-    question: str
+    # question / rubric (and reference_answer, total_marks) may be omitted
+    # when question_id names a registered question (see POST /evaluate/exams)
+    question: Optional[str] = None
     student_answer: str
-    rubric: RubricWeight
+    rubric: Optional[RubricWeight] = None
     max_score: float = 10.0
     total_marks: Optional[float] = None # Overrides max_score if present
     evaluation_style: str = "balanced" # balanced | concept-focused | strict
     reference_answer: Optional[str] = None
+    bypass_llm_cache: bool = False # Force a fresh LLM judgment (re-grading)
+    debug: bool = False # Return LLM token usage / cost in the response
+    # Identifiers for the result store: a repeated submission returns the
+    # stored result instead of being graded again (see GET /evaluate/results)
+    student_id: Optional[str] = None
+    question_id: Optional[str] = None
+    exam_id: Optional[str] = None
+    idempotency_key: Optional[str] = None # Client retry key (or the Idempotency-Key header)
 
 class RubricBreakdown(BaseModel):
     conceptual_understanding: float
@@ -42,3 +54,96 @@ class EvaluationResponse(BaseModel):
     rubric_breakdown: RubricBreakdown
     metrics: Metrics
     confidence: float
+    # Which path produced the score: llm | validation | zero_rubric |
+    # nli_kill_switch | noise_short_answer | llm_error
+    decision_path: str = "llm"
+    # Only when the request set debug=true: LLM calls with token counts / cost
+    debug: Optional[Dict[str, Any]] = None
+
+# ── Batch evaluation ─────────────────────────────────────────────────────────
+
+class BatchEvaluationItem(EvaluationRequest):
+    item_id: str # Caller-supplied id, echoed back on the matching result
+
+class BatchEvaluationRequest(BaseModel):
+    evaluations: List[BatchEvaluationItem]
+
+class BatchItemResult(BaseModel):
+    item_id: str
+    status: str # ok | error
+    result: Optional[EvaluationResponse] = None
+    error: Optional[str] = None
+
+class BatchEvaluationResponse(BaseModel):
+    results: List[BatchItemResult] # Same order as the request's evaluations
+    succeeded: int
+    failed: int
+
+class BatchStreamResult(BatchItemResult):
+    index: int # Position of the item in the request's evaluations
+
+class BatchStreamSummary(BaseModel):
+    done: bool = True # Marks the last message of a stream
+    succeeded: int
+    failed: int
+    error: Optional[str] = None # Set if grading stopped before every item finished
+
+class EvaluationJobRequest(BaseModel):
+    evaluations: List[BatchEvaluationItem]
+    webhook_url: Optional[str] = None # POSTed the job summary once every item is graded
+
+    @field_validator("webhook_url")
+    @classmethod
+    def _webhook_target(cls, url: Optional[str]) -> Optional[str]:
+        # The server calls this URL: no internal / private targets (SSRF)
+        return check_webhook_url(url) if url is not None else None
+
+class EvaluationJob(BaseModel):
+    job_id: str
+    status: str # queued | running | completed
+    total: int
+    completed: int # Items graded so far (ok or error)
+    succeeded: int
+    failed: int
+    created_at: float # Unix timestamps
+    updated_at: float
+    finished_at: Optional[float] = None
+    webhook_url: Optional[str] = None
+    webhook_status: Optional[str] = None # pending | delivered | failed
+    results: Optional[List[BatchItemResult]] = None # Graded items so far, in input order
+
+class StoredEvaluation(BaseModel):
+    student_id: Optional[str] = None
+    question_id: Optional[str] = None
+    exam_id: Optional[str] = None
+    idempotency_key: Optional[str] = None
+    pipeline_version: str
+    created_at: float # Unix timestamp
+    result: EvaluationResponse
+
+class StoredEvaluationList(BaseModel):
+    results: List[StoredEvaluation] # Newest first
+    count: int
+
+# ── Exam registration ────────────────────────────────────────────────────────
+
+class QuestionRegistration(BaseModel):
+    question_id: str
+    question: str
+    reference_answer: Optional[str] = None
+    total_marks: Optional[float] = None # Used by requests that cite question_id and omit it
+    rubric: Optional[RubricWeight] = None # Ditto
+
+class ExamRegistrationRequest(BaseModel):
+    exam_id: str
+    questions: List[QuestionRegistration]
+
+class RegisteredQuestion(QuestionRegistration):
+    exam_id: str
+    precomputed: bool # Reference artifacts are loaded for the current models
+    updated_at: float # Unix timestamp
+
+class ExamRegistration(BaseModel):
+    exam_id: str
+    questions: List[RegisteredQuestion]
+    count: int
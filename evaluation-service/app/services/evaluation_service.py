@@ -3,7 +3,11 @@ from app.schemas.evaluation_schemas import (
     EvaluationResponse,
     RubricBreakdown,
     RubricWeight,
-    Metrics
+    Metrics,
+    BatchEvaluationItem,
+    BatchItemResult,
+    QuestionRegistration,
+    RegisteredQuestion,
 )
 from app.engines.validator import Validator
 from app.engines.llm.judge import LLMJudge
@@ -13,10 +17,76 @@ from app.engines.nli_engine import NLIEngine
 from app.engines.similarity_engine import SimilarityEngine
 from app.engines.descriptive_engine import DescriptiveEngine
 from app.engines.depth_estimator import DepthEstimator
+from app.engines.llm.usage import begin_usage_log, end_usage_log
+from app.engines.llm import prompts
+from app.engines.inference_executor import run_inference
+from app.services.result_store import result_store
+from app.services.question_bank import question_bank, ReferenceArtifacts, StoredQuestion
+from app.utils.metrics import counter
+from app.utils.timing import stage, timed
+from dataclasses import dataclass
+from functools import cached_property
+from typing import AsyncIterator, Dict, List, Optional, Tuple, Union
+import asyncio
+import hashlib
+import json
 import logging
+import os
 
 logger = logging.getLogger(__name__)
 
+# Skip the LLM when deterministic signals already fix the final score.
+SHORT_CIRCUIT_ENABLED = os.getenv("SHORT_CIRCUIT_ENABLED", "true").lower() in ("1", "true", "yes")
+
+# Pins the pipeline version stored with each result; unset → derived from
+# the models, prompts and scoring constants (see EvaluationService.pipeline_version).
+PIPELINE_VERSION = os.getenv("EVALUATION_PIPELINE_VERSION")
+
+LLM_CALLS_SAVED = counter(
+    "llm_calls_saved_total",
+    "LLM calls skipped because the score was already determined",
+    ["path"],
+)
+
+EARLY_EXITS = counter(
+    "evaluation_early_exits_total",
+    "Evaluations answered before the LLM stage, by reason",
+    ["reason"],
+)
+
+
+@dataclass
+class _PreparedAnswer:
+    """
+    Layer 1-2 output for an answer that still needs the LLM judgment.
+    """
+    request:           EvaluationRequest
+    total_marks:       float
+    normalized_rubric: dict
+    reference:         Optional[str]
+    similarity_score:  float
+    similarity_band:   str
+    nli_score:         float
+    depth_signals:     dict
+
+    @property
+    def signals(self) -> dict:
+        return {
+            "similarity": self.similarity_score,
+            "nli":        self.nli_score,
+            "depth":      self.depth_signals,
+        }
+
+    @property
+    def pack_key(self) -> tuple:
+        # Only answers sharing the whole prompt context can share a request.
+        return (
+            self.request.question,
+            self.reference,
+            self.total_marks,
+            self.request.bypass_llm_cache,
+        )
+
 
 class EvaluationService:
     """
@@ -42,6 +112,31 @@ class EvaluationService:
     CONCEPT_WEIGHT = 0.8
     CLARITY_WEIGHT = 0.2
 
+    # NLI entailment below this is a hard contradiction (Kill-Switch, Zone A)
+    NLI_KILL_SWITCH = 0.1
+
+    # Templated feedback for paths that never reach the LLM
+    SHORT_CIRCUIT_FEEDBACK = {
+        "nli_kill_switch": (
+            "[SYSTEM BLOCK: Factual Contradiction Detected] "
+            "The answer contradicts the reference answer, so no marks can be awarded."
+        ),
+        "noise_short_answer": (
+            "The answer does not match the expected answer, so no marks can be awarded."
+        ),
+    }
+
+    # ── Batch grading ────────────────────────────────────────────────────────
+    # Upper bound on evaluations in flight at once for a single batch. Each
+    # one usually waits on its own LLM call, so this mostly bounds the number
+    # of concurrent OpenRouter requests a batch can open.
+    BATCH_CONCURRENCY = int(os.getenv("EVALUATION_BATCH_CONCURRENCY", "8"))
+
+    # Answers to the same question in a batch are graded together in one
+    # packed LLM request (the ~2 KB of rules is sent once, not N times).
+    LLM_PACKING_ENABLED = os.getenv("LLM_PACKING_ENABLED", "true").lower() in ("1", "true", "yes")
+    LLM_PACK_SIZE       = int(os.getenv("LLM_PACK_SIZE", "8"))
+
     def __init__(self):
         self.validator         = Validator()
         self.llm_judge         = LLMJudge()
@@ -52,9 +147,206 @@ class EvaluationService:
         self.descriptive_engine = DescriptiveEngine()
         self.depth_estimator   = DepthEstimator()
 
+    async def warm_up(self) -> None:
+        """
+        Loads and warms every model-backed engine on the inference executor.
+        Started in the background at startup; failures are logged and left
+        to the next request (which retries the load) rather than raised.
+        """
+        loaders = [self.similarity_engine.loader, self.nli_engine.loader]
+        results = await asyncio.gather(
+            *(run_inference(loader.ensure_loaded) for loader in loaders),
+            return_exceptions=True,
+        )
+        for loader, result in zip(loaders, results):
+            if isinstance(result, Exception):
+                logger.error(f"Warm-up of '{loader.name}' failed: {result}")
+        if any(isinstance(result, Exception) for result in results):
+            return
+
+        # Registered references whose stored artifacts were missing or made
+        # by other models are recomputed now that the models are loaded
+        stale = [r for r in question_bank.references() if not self._is_precomputed(r)]
+        if stale:
+            try:
+                await self.precompute_references(stale)
+            except Exception as e:
+                logger.error(f"Precomputing {len(stale)} registered reference(s) failed: {e}")
+
+    def readiness(self) -> dict:
+        """
+        Per-engine model state and load / warm-up timings for /ready.
+        """
+        engines = {
+            loader.name: loader.status()
+            for loader in (self.similarity_engine.loader, self.nli_engine.loader)
+        }
+        return {
+            "ready":   all(engine["state"] == "ready" for engine in engines.values()),
+            "engines": engines,
+        }
+
+    async def aclose(self) -> None:
+        """
+        Stops background workers (micro-batchers) owned by the engines.
+        """
+        await self.similarity_engine.batcher.close()
+        await self.nli_engine.batcher.close()
+
+    # ── Registered questions ─────────────────────────────────────────────────
+    async def load_questions(self) -> None:
+        """
+        Loads the question bank and pins every stored reference artifact
+        still valid for the current models. Needs no model, so it runs at
+        startup before the warm-up (which recomputes the rest).
+        """
+        artifacts = await asyncio.to_thread(question_bank.load)
+        self._pin(artifacts)
+
+    async def register_exam(self, exam_id: str, questions: List[QuestionRegistration]) -> List[RegisteredQuestion]:
+        """
+        Stores an exam's questions and precomputes their reference-side
+        artifacts, so answers citing a question_id only cost student-side work.
+        """
+        # References no longer used by any question (re-registered with a
+        # changed answer) are dropped, so the pinned entries stay bounded
+        orphaned = await asyncio.to_thread(question_bank.save_questions, exam_id, questions)
+        self._unpin(orphaned)
+        references = list(dict.fromkeys(
+            q.reference_answer for q in questions if q.reference_answer and q.reference_answer.strip()
+        ))
+        try:
+            await self.precompute_references(references)
+        except Exception as e:
+            # Questions stay registered; the next warm-up retries the artifacts
+            logger.error(f"Precomputing artifacts for exam {exam_id} failed: {e}")
+        return [self.registered_question(question_bank.get(q.question_id)) for q in questions]
+
+    async def precompute_references(self, references: List[str]) -> None:
+        """
+        Reference embeddings, exact-match token sets and NLI premise token
+        ids for `references`, pinned in the engines and saved to the bank.
+        """
+        if not references:
+            return
+        embeddings, premise_ids = await asyncio.gather(
+            run_inference(self.similarity_engine.embed_references, references),
+            run_inference(self.nli_engine.tokenize_premises, references),
+        )
+        artifacts = [
+            ReferenceArtifacts(
+                reference=reference,
+                similarity_version=self.similarity_engine.artifact_version,
+                embedding=embedding,
+                tokens=self.similarity_engine.reference_tokens(reference),
+                nli_version=self.nli_engine.artifact_version,
+                premise_ids=ids,
+            )
+            for reference, embedding, ids in zip(references, embeddings, premise_ids)
+        ]
+        self._pin(artifacts)
+        await asyncio.to_thread(question_bank.save_artifacts, artifacts)
+        logger.info(f"Precomputed artifacts for {len(artifacts)} reference answer(s)")
+
+    def _pin(self, artifacts: List[ReferenceArtifacts]) -> None:
+        for a in artifacts:
+            if a.similarity_version == self.similarity_engine.artifact_version:
+                self.similarity_engine.register_reference(a.reference, a.embedding, a.tokens)
+            if a.nli_version == self.nli_engine.artifact_version:
+                self.nli_engine.register_premise(a.reference, a.premise_ids)
+
+    def _unpin(self, references: List[str]) -> None:
+        for reference in references:
+            self.similarity_engine.unregister_reference(reference)
+            self.nli_engine.unregister_premise(reference)
+
+    def _is_precomputed(self, reference: Optional[str]) -> bool:
+        if not reference or not reference.strip():
+            return True
+        return reference in self.similarity_engine.registered and reference in self.nli_engine.premises
+
+    def registered_question(self, stored: StoredQuestion) -> RegisteredQuestion:
+        return RegisteredQuestion(
+            **stored.registration.model_dump(),
+            exam_id=stored.exam_id,
+            precomputed=self._is_precomputed(stored.registration.reference_answer),
+            updated_at=stored.updated_at,
+        )
+
+    @cached_property
+    def pipeline_version(self) -> str:
+        """
+        Short hash of everything that changes a grade for the same input:
+        scoring constants, LLM model, grading prompts and the NLI /
+        similarity models. Stored results from another version are not reused.
+        """
+        if PIPELINE_VERSION:
+            return PIPELINE_VERSION
+        material = json.dumps(
+            {
+                "scoring":    [self.CONCEPT_WEIGHT, self.CLARITY_WEIGHT, self.NLI_KILL_SWITCH,
+                               SHORT_CIRCUIT_ENABLED, self.SHORT_CIRCUIT_FEEDBACK],
+                "llm":        self.llm_judge.model,
+                "prompts":    [prompts.BALANCED_TEACHER_PROMPT, prompts.BALANCED_TEACHER_PACKED_PROMPT,
+                               prompts.BALANCED_TEACHER_PACKED_ANSWER],
+                "nli":        [self.nli_engine.MODEL_NAME, self.nli_engine.backend, self.nli_engine.quantize],
+                "similarity": [self.similarity_engine.MODEL_NAME, self.similarity_engine.backend,
+                               self.similarity_engine.quantize, self.similarity_engine.storage_dtype],
+            },
+            sort_keys=True,
+        )
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()[:16]
+
     async def evaluate_student_answer(self, request: EvaluationRequest) -> EvaluationResponse:
         """
-        Main orchestration method.
+        Main orchestration method. A submission already graded by this
+        pipeline version is answered from the result store.
+        """
+        request = question_bank.resolve(request)
+        stored = await result_store.lookup(request, self.pipeline_version)
+        if stored is not None:
+            return stored
+
+        if not request.debug:
+            response = await self._evaluate(request)
+        else:
+            token = begin_usage_log()
+            try:
+                response = await self._evaluate(request)
+            finally:
+                calls = end_usage_log(token)
+            response.debug = self._usage_debug(calls)
+
+        await result_store.save(request, response, self.pipeline_version)
+        return response
+
+    async def _evaluate(self, request: EvaluationRequest) -> EvaluationResponse:
+        prepared = await self._prepare(request)
+        if isinstance(prepared, EvaluationResponse):
+            return prepared
+
+        # ── 3. Layer 3: LLM Reasoning (Balanced Teacher) ────────────────────
+        try:
+            llm_result = await timed("llm", self.llm_judge.evaluate_balanced(
+                question=request.question,
+                student_answer=request.student_answer,
+                reference_answer=prepared.reference,
+                total_marks=prepared.total_marks,
+                similarity_band=prepared.similarity_band,
+                signals=prepared.signals,
+                use_cache=not request.bypass_llm_cache,
+            ))
+        except Exception as e:
+            return self._llm_error_response(e, prepared)
+
+        with stage("scoring"):
+            return self._finalize(prepared, llm_result)
+
+    async def _prepare(self, request: EvaluationRequest) -> Union[EvaluationResponse, _PreparedAnswer]:
+        """
+        Layers 1-2 (validation, depth, signals) plus every early exit.
+        Returns the final response when no LLM call is needed, otherwise the
+        signals the LLM stage and the scoring formula need.
         """
         # ── 0. Context normalisation ─────────────────────────────────────────
         total_marks      = request.total_marks if request.total_marks is not None else request.max_score
@@ -63,30 +355,45 @@ class EvaluationService:
         # ── 1. Layer 1a: Structural validation ───────────────────────────────
         # The enhanced Validator now catches symbolic gibberish (e.g. "123@#$")
         # BEFORE any LLM call, saving tokens and guaranteeing 0 score.
-        is_valid, validation_msg = self.validator.validate_adaptive(
-            request.student_answer, total_marks
-        )
+        with stage("validation"):
+            is_valid, validation_msg = self.validator.validate_adaptive(
+                request.student_answer, total_marks
+            )
         if not is_valid:
             logger.info(f"Validation failed: {validation_msg}")
-            return self._create_zero_response(validation_msg, normalized_rubric)
+            EARLY_EXITS.inc(reason="validation")
+            return self._create_zero_response(validation_msg, normalized_rubric, decision_path="validation")
 
         # ── 1. Layer 1b: Depth heuristic (signal only) ──────────────────────
-        depth_signals = self.depth_estimator.estimate(request.student_answer, total_marks)
+        with stage("depth"):
+            depth_signals = self.depth_estimator.estimate(request.student_answer, total_marks)
 
         # ── Zero-weight early exit ───────────────────────────────────────────
         if sum(normalized_rubric.values()) == 0:
             logger.info("All rubric weights are 0. Skipping Engines & LLM.")
-            return self._create_zero_response("No active rubric weights.", normalized_rubric)
+            EARLY_EXITS.inc(reason="zero_rubric")
+            return self._create_zero_response(
+                "No active rubric weights.", normalized_rubric, decision_path="zero_rubric"
+            )
 
         # ── 2. Layer 2: Signal generation ───────────────────────────────────
         reference = request.reference_answer if request.reference_answer else None
 
         # NEW: evaluate_with_band returns both the raw score AND the band label.
         # The band label is passed into the LLM prompt and used for guardrails.
-        similarity_score, similarity_band = self.similarity_engine.evaluate_with_band(
-            request.student_answer, reference
-        )
-        nli_score = self.nli_engine.evaluate(request.question, request.student_answer, request.reference_answer)
+        # Both engines are CPU-bound torch calls: they are micro-batched with
+        # other in-flight requests and run on the inference executor instead
+        # of blocking the event loop (and every other request).
+        # The two signals are independent, so they run concurrently: the
+        # layer takes as long as the slower engine, not the sum of both.
+        (similarity_score, similarity_band), nli_score = await timed("signals", asyncio.gather(
+            timed("similarity", self.similarity_engine.evaluate_with_band_async(
+                request.student_answer, reference
+            )),
+            timed("nli", self.nli_engine.evaluate_async(
+                request.question, request.student_answer, request.reference_answer
+            )),
+        ))
 
         logger.debug(
             f"Signals — similarity: {similarity_score:.3f} [{similarity_band}], "
@@ -98,23 +405,43 @@ class EvaluationService:
         if total_weight > 0:
             normalized_rubric = {k: v / total_weight for k, v in normalized_rubric.items()}
 
-        # ── 3. Layer 3: LLM Reasoning (Balanced Teacher) ────────────────────
-        try:
-            llm_result = await self.llm_judge.evaluate_balanced(
-                question=request.question,
-                student_answer=request.student_answer,
-                reference_answer=reference,
-                total_marks=total_marks,
-                similarity_band=similarity_band,
-                signals={
-                    "similarity": similarity_score,
-                    "nli":        nli_score,
-                    "depth":      depth_signals,
-                }
+        # ── 2b. Short-circuit: score already decided by the signals ─────────
+        # The kill-switch and the Noise/short-answer guardrail both force
+        # concept = 0.0, which the hard rule turns into a final score of 0 —
+        # whatever the LLM says. Don't pay for (or wait on) that call.
+        determined_path = self._determined_path(request.student_answer, similarity_band, nli_score)
+        if determined_path is not None:
+            LLM_CALLS_SAVED.inc(path=determined_path)
+            EARLY_EXITS.inc(reason=determined_path)
+            logger.info(f"Short-circuit '{determined_path}' fired — LLM call skipped")
+            return self._create_zero_response(
+                self.SHORT_CIRCUIT_FEEDBACK[determined_path],
+                normalized_rubric,
+                decision_path=determined_path,
+                metrics=Metrics(llm=0.0, nli=nli_score, similarity=similarity_score),
             )
-        except Exception as e:
-            logger.error(f"LLM Evaluation failed: {e}")
-            return self._create_zero_response(f"Evaluation Error: {str(e)}", normalized_rubric)
+
+        return _PreparedAnswer(
+            request=request,
+            total_marks=total_marks,
+            normalized_rubric=normalized_rubric,
+            reference=reference,
+            similarity_score=similarity_score,
+            similarity_band=similarity_band,
+            nli_score=nli_score,
+            depth_signals=depth_signals,
+        )
+
+    def _finalize(self, prepared: _PreparedAnswer, llm_result: dict) -> EvaluationResponse:
+        """
+        Applies the NLI zones, guardrails and the Balanced Teacher formula to
+        an LLM judgment and builds the response.
+        """
+        request          = prepared.request
+        total_marks      = prepared.total_marks
+        similarity_score = prepared.similarity_score
+        similarity_band  = prepared.similarity_band
+        nli_score        = prepared.nli_score
 
         # ── 4. Score extraction ──────────────────────────────────────────────
         llm_concept      = llm_result.get("concept",      0.0)
@@ -136,7 +463,7 @@ class EvaluationService:
         #  Zone C — Entailment          (nli ≥ 0.40):
         #    Normal flow; short-answer boost may apply.
         #
-        nli_kill_switch_fired = nli_score < 0.1
+        nli_kill_switch_fired = nli_score < self.NLI_KILL_SWITCH
         if nli_kill_switch_fired:
             llm_concept = 0.0
             logger.debug(f"NLI Kill Switch triggered (nli={nli_score:.3f} < 0.10): concept forced to 0.0")
@@ -207,9 +534,160 @@ class EvaluationService:
                 nli=nli_score,
                 similarity=similarity_score,
             ),
-            confidence=llm_result.get("confidence", 1.0)
+            confidence=llm_result.get("confidence", 1.0),
+            decision_path="llm",
         )
 
+    def _llm_error_response(self, error: Exception, prepared: _PreparedAnswer) -> EvaluationResponse:
+        logger.error(f"LLM Evaluation failed: {error}")
+        return self._create_zero_response(
+            f"Evaluation Error: {str(error)}", prepared.normalized_rubric, decision_path="llm_error"
+        )
+
+    async def evaluate_batch(self, items: List[BatchEvaluationItem]) -> List[BatchItemResult]:
+        """
+        Grades many answers concurrently (see evaluate_batch_stream).
+        Results are returned in the same order as `items`, one per item.
+        """
+        results: List[Optional[BatchItemResult]] = [None] * len(items)
+        async for index, result in self.evaluate_batch_stream(items):
+            results[index] = result
+        # Never drop a slot: callers pair results with items by position
+        return [
+            result if result is not None
+            else BatchItemResult(item_id=item.item_id, status="error", error="Item was not graded")
+            for item, result in zip(items, results)
+        ]
+
+    async def evaluate_batch_stream(
+        self, items: List[BatchEvaluationItem]
+    ) -> AsyncIterator[Tuple[int, BatchItemResult]]:
+        """
+        Grades many answers concurrently, yielding (index in `items`, result)
+        as each one finishes.
+
+        Layers 1-2 run for every item at once (the engines micro-batch them);
+        answers decided there (validation, short-circuit) are yielded right
+        away. Answers that still need the LLM are grouped by question; with
+        packing enabled each group is graded LLM_PACK_SIZE answers per
+        request, otherwise one request per answer. At most BATCH_CONCURRENCY
+        LLM requests are in flight.
+
+        Items already in the result store are yielded from it first.
+        A failing item is yielded as an "error" result and never aborts the
+        rest of the batch. Closing the generator early cancels the grading.
+        """
+        semaphore = asyncio.Semaphore(max(1, self.BATCH_CONCURRENCY))
+        finished: asyncio.Queue = asyncio.Queue()
+
+        async def _ok(index: int, response: EvaluationResponse) -> None:
+            await result_store.save(items[index], response, self.pipeline_version)
+            finished.put_nowait((index, BatchItemResult(item_id=items[index].item_id, status="ok", result=response)))
+
+        def _error(index: int, error: BaseException) -> None:
+            logger.error(f"Batch item {items[index].item_id} failed: {error}", exc_info=error)
+            finished.put_nowait((index, BatchItemResult(item_id=items[index].item_id, status="error", error=str(error))))
+
+        # ── Layers 1-2 per item; early exits are reported immediately ────────
+        async def _prepare_one(index: int) -> Optional[_PreparedAnswer]:
+            try:
+                outcome = await self._prepare(items[index])
+            except Exception as e:
+                _error(index, e)
+                return None
+            if isinstance(outcome, EvaluationResponse):
+                if items[index].debug:
+                    outcome.debug = self._usage_debug([])
+                await _ok(index, outcome)
+                return None
+            return outcome
+
+        # ── Layer 3 per chunk (one LLM request each), then scoring ───────────
+        async def _grade(prepared: List[Optional[_PreparedAnswer]], chunk: List[int]) -> None:
+            answers = [prepared[index] for index in chunk]
+            first   = answers[0]
+            # Each chunk runs in its own task, so the log only sees its calls
+            debug = any(answer.request.debug for answer in answers)
+            token = begin_usage_log() if debug else None
+            async with semaphore:
+                llm_results = await timed("llm", self.llm_judge.evaluate_balanced_packed(
+                    question=first.request.question,
+                    reference_answer=first.reference,
+                    total_marks=first.total_marks,
+                    answers=[
+                        {
+                            "student_answer":  answer.request.student_answer,
+                            "similarity_band": answer.similarity_band,
+                            "signals":         answer.signals,
+                        }
+                        for answer in answers
+                    ],
+                    use_cache=not first.request.bypass_llm_cache,
+                ))
+            calls = end_usage_log(token) if debug else []
+            for index, answer, llm_result in zip(chunk, answers, llm_results):
+                try:
+                    if isinstance(llm_result, Exception):
+                        response = self._llm_error_response(llm_result, answer)
+                    else:
+                        with stage("scoring"):
+                            response = self._finalize(answer, llm_result)
+                    if answer.request.debug:
+                        response.debug = self._usage_debug(calls, answers_per_call=len(chunk))
+                    await _ok(index, response)
+                except Exception as e:
+                    _error(index, e)
+
+        # ── Submissions already graded are answered from the result store ────
+        # (after filling in registered questions for items citing a question_id)
+        items = list(items)
+        resolved: List[int] = []
+        for index, item in enumerate(items):
+            try:
+                items[index] = question_bank.resolve(item)
+                resolved.append(index)
+            except Exception as e:
+                _error(index, e)
+
+        pending: List[int] = []
+        found = await result_store.lookup_many([items[index] for index in resolved], self.pipeline_version)
+        for index, stored in zip(resolved, found):
+            if isinstance(stored, Exception):
+                _error(index, stored)
+            elif stored is None:
+                pending.append(index)
+            else:
+                finished.put_nowait((index, BatchItemResult(item_id=items[index].item_id, status="ok", result=stored)))
+
+        async def _run() -> None:
+            outcomes = await asyncio.gather(*(_prepare_one(index) for index in pending))
+            prepared: List[Optional[_PreparedAnswer]] = [None] * len(items)
+            for index, outcome in zip(pending, outcomes):
+                prepared[index] = outcome
+
+            groups: Dict[tuple, List[int]] = {}
+            for index, outcome in enumerate(prepared):
+                if outcome is not None:
+                    groups.setdefault(outcome.pack_key, []).append(index)
+
+            pack_size = self.LLM_PACK_SIZE if self.LLM_PACKING_ENABLED else 1
+            chunks = [
+                indices[start:start + pack_size]
+                for indices in groups.values()
+                for start in range(0, len(indices), max(1, pack_size))
+            ]
+            await asyncio.gather(*(_grade(prepared, chunk) for chunk in chunks))
+
+        runner = asyncio.create_task(_run())
+        runner.add_done_callback(lambda _: finished.put_nowait(None))
+        try:
+            while (entry := await finished.get()) is not None:
+                yield entry
+            runner.result()  # surface a failure of the batch machinery itself
+        finally:
+            if not runner.done():
+                runner.cancel()
+
     # ─────────────────────────────────────────────────────────────────────────
     # Private helpers
     # ─────────────────────────────────────────────────────────────────────────
@@ -237,6 +715,41 @@ class EvaluationService:
             "clarity":      clarity,
         }
 
+    def _determined_path(
+        self,
+        student_answer: str,
+        similarity_band: str,
+        nli_score: float,
+    ) -> Optional[str]:
+        """
+        Returns the name of the rule that already fixes the final score at 0,
+        or None when the LLM is needed.
+
+          • nli_kill_switch    — NLI < NLI_KILL_SWITCH (hard contradiction)
+          • noise_short_answer — Noise band and ≤ 3 words (LLMJudge guardrail)
+        """
+        if not SHORT_CIRCUIT_ENABLED:
+            return None
+        if nli_score < self.NLI_KILL_SWITCH:
+            return "nli_kill_switch"
+        if similarity_band == "Noise" and len(student_answer.strip().split()) <= 3:
+            return "noise_short_answer"
+        return None
+
+    def _usage_debug(self, calls: List[dict], answers_per_call: int = 1) -> dict:
+        """
+        Debug payload: the LLM calls behind a response and their totals.
+        In a packed batch the calls (and totals) are shared by
+        `answers_per_call` answers.
+        """
+        return {
+            "llm_calls":         calls,
+            "answers_per_call":  answers_per_call,
+            "prompt_tokens":     sum(call["prompt_tokens"] for call in calls),
+            "completion_tokens": sum(call["completion_tokens"] for call in calls),
+            "cost_usd":          round(sum(call["cost_usd"] for call in calls), 8),
+        }
+
     def _assign_grade(self, percentage: float) -> str:
         if percentage >= 90: return "A"
         if percentage >= 80: return "B"
@@ -244,9 +757,16 @@ class EvaluationService:
         if percentage >= 60: return "D"
         return "F"
 
-    def _create_zero_response(self, reason: str, rubric: dict) -> EvaluationResponse:
+    def _create_zero_response(
+        self,
+        reason: str,
+        rubric: dict,
+        decision_path: str = "validation",
+        metrics: Optional[Metrics] = None,
+    ) -> EvaluationResponse:
         """
-        Returns a clean 0-score response for failed validation or errors.
+        Returns a clean 0-score response for failed validation, errors or
+        short-circuited evaluations.
         """
         zero_breakdown = RubricBreakdown(
             conceptual_understanding=0.0,
@@ -262,6 +782,7 @@ class EvaluationService:
             grade="F",
             feedback=reason,
             rubric_breakdown=zero_breakdown,
-            metrics=Metrics(llm=0.0, nli=0.0, similarity=0.0),
-            confidence=1.0
+            metrics=metrics or Metrics(llm=0.0, nli=0.0, similarity=0.0),
+            confidence=1.0,
+            decision_path=decision_path,
         )
@@ -0,0 +1,380 @@
+import os
+import time
+import uuid
+import random
+import asyncio
+import logging
+from typing import List, Optional, Set, Tuple
+
+import httpx
+
+from app.schemas.evaluation_schemas import BatchEvaluationItem, BatchItemResult, EvaluationJob
+from app.utils.metrics import counter, gauge
+from app.utils.webhooks import unsafe_webhook_addresses, webhook_transport
+from app.utils.storage import SQLiteDatabase, cache_path
+
+logger = logging.getLogger(__name__)
+
+
+# --- Job Queue Configuration ---
+JOBS_PATH         = os.getenv("EVALUATION_JOBS_PATH", cache_path("jobs.sqlite3"))
+JOB_WORKERS       = int(os.getenv("EVALUATION_JOB_WORKERS", "4"))
+JOB_CHUNK_SIZE    = int(os.getenv("EVALUATION_JOB_CHUNK_SIZE", "16"))       # items graded per worker pass
+JOB_TTL_SECONDS   = float(os.getenv("EVALUATION_JOB_TTL_SECONDS", str(7 * 24 * 3600)))
+WEBHOOK_TIMEOUT   = float(os.getenv("EVALUATION_WEBHOOK_TIMEOUT", "10"))    # seconds
+WEBHOOK_RETRIES   = int(os.getenv("EVALUATION_WEBHOOK_RETRIES", "3"))
+
+JOBS_TOTAL = counter(
+    "evaluation_jobs_total",
+    "Evaluation jobs by lifecycle event (submitted / completed)",
+    ["event"],
+)
+JOB_ITEMS = counter(
+    "evaluation_job_items_total",
+    "Job items graded by outcome (ok / error)",
+    ["status"],
+)
+JOB_QUEUE_DEPTH = gauge(
+    "evaluation_job_queue_depth",
+    "Job items waiting for a worker",
+)
+JOB_WEBHOOKS = counter(
+    "evaluation_job_webhooks_total",
+    "Job completion webhooks by outcome (delivered / failed)",
+    ["outcome"],
+)
+
+
+JOBS_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS jobs ("
+    " job_id TEXT PRIMARY KEY,"
+    " status TEXT NOT NULL,"
+    " total INTEGER NOT NULL,"
+    " succeeded INTEGER NOT NULL DEFAULT 0,"
+    " failed INTEGER NOT NULL DEFAULT 0,"
+    " created_at REAL NOT NULL,"
+    " updated_at REAL NOT NULL,"
+    " finished_at REAL,"
+    " webhook_url TEXT,"
+    " webhook_status TEXT)",
+    "CREATE TABLE IF NOT EXISTS job_items ("
+    " job_id TEXT NOT NULL,"
+    " position INTEGER NOT NULL,"
+    " status TEXT NOT NULL,"
+    " request TEXT NOT NULL,"
+    " result TEXT,"
+    " PRIMARY KEY (job_id, position))",
+    "CREATE INDEX IF NOT EXISTS idx_job_items_status ON job_items(status)",
+)
+
+
+class JobStore:
+    """
+    SQLite-backed job queue. A job is one row in `jobs`; each of its answers
+    is a row in `job_items` holding the request and, once graded, the
+    BatchItemResult. Items move pending → running → ok | error; because the
+    queue lives on disk, items left running by a crash or restart are put
+    back to pending when the store is reopened.
+    """
+
+    def __init__(self, path: str = JOBS_PATH, ttl_seconds: float = JOB_TTL_SECONDS):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._db = SQLiteDatabase(path, JOBS_SCHEMA, "Evaluation job store")
+
+    def create(self, items: List[BatchEvaluationItem], webhook_url: Optional[str]) -> str:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._db.lock:
+            conn = self._db.connection()
+            with conn:
+                conn.execute("BEGIN")
+                conn.execute(
+                    "INSERT INTO jobs (job_id, status, total, created_at, updated_at, webhook_url, webhook_status)"
+                    " VALUES (?, 'queued', ?, ?, ?, ?, ?)",
+                    (job_id, len(items), now, now, webhook_url, "pending" if webhook_url else None),
+                )
+                conn.executemany(
+                    "INSERT INTO job_items (job_id, position, status, request) VALUES (?, ?, 'pending', ?)",
+                    [(job_id, position, item.model_dump_json()) for position, item in enumerate(items)],
+                )
+        return job_id
+
+    def recover(self) -> int:
+        """
+        Re-queues items left running by a previous process and purges
+        finished jobs older than the TTL. Returns the number re-queued.
+        """
+        with self._db.lock:
+            conn = self._db.connection()
+            requeued = conn.execute("UPDATE job_items SET status = 'pending' WHERE status = 'running'").rowcount
+            expired = [row[0] for row in conn.execute(
+                "SELECT job_id FROM jobs WHERE finished_at IS NOT NULL AND finished_at < ?",
+                (time.time() - self.ttl_seconds,),
+            )]
+            for job_id in expired:
+                conn.execute("DELETE FROM job_items WHERE job_id = ?", (job_id,))
+                conn.execute("DELETE FROM jobs WHERE job_id = ?", (job_id,))
+        if requeued or expired:
+            logger.info(f"Job store: re-queued {requeued} interrupted item(s), purged {len(expired)} expired job(s)")
+        return requeued
+
+    def claim(self, limit: int) -> List[Tuple[str, int, BatchEvaluationItem]]:
+        """
+        Marks up to `limit` pending items running, oldest job first.
+        """
+        with self._db.lock:
+            conn = self._db.connection()
+            rows = conn.execute(
+                "SELECT job_id, position, request FROM job_items WHERE status = 'pending'"
+                " ORDER BY rowid LIMIT ?",
+                (limit,),
+            ).fetchall()
+            if not rows:
+                return []
+            now = time.time()
+            with conn:
+                conn.execute("BEGIN")
+                conn.executemany(
+                    "UPDATE job_items SET status = 'running' WHERE job_id = ? AND position = ?",
+                    [(job_id, position) for job_id, position, _ in rows],
+                )
+                conn.executemany(
+                    "UPDATE jobs SET status = 'running', updated_at = ? WHERE job_id = ? AND status = 'queued'",
+                    [(now, job_id) for job_id in {row[0] for row in rows}],
+                )
+        return [
+            (job_id, position, BatchEvaluationItem.model_validate_json(request))
+            for job_id, position, request in rows
+        ]
+
+    def complete(self, outcomes: List[Tuple[str, int, BatchItemResult]]) -> List[str]:
+        """
+        Stores graded items and returns the ids of jobs they finished.
+        """
+        now = time.time()
+        finished = []
+        with self._db.lock:
+            conn = self._db.connection()
+            with conn:
+                conn.execute("BEGIN")
+                for job_id, position, result in outcomes:
+                    conn.execute(
+                        "UPDATE job_items SET status = ?, result = ? WHERE job_id = ? AND position = ?",
+                        (result.status, result.model_dump_json(), job_id, position),
+                    )
+                    column = "succeeded" if result.status == "ok" else "failed"
+                    conn.execute(
+                        f"UPDATE jobs SET {column} = {column} + 1, updated_at = ? WHERE job_id = ?",
+                        (now, job_id),
+                    )
+                for job_id in {outcome[0] for outcome in outcomes}:
+                    (open_items,) = conn.execute(
+                        "SELECT COUNT(*) FROM job_items WHERE job_id = ? AND status IN ('pending', 'running')",
+                        (job_id,),
+                    ).fetchone()
+                    if open_items == 0:
+                        conn.execute(
+                            "UPDATE jobs SET status = 'completed', finished_at = ? WHERE job_id = ?",
+                            (now, job_id),
+                        )
+                        finished.append(job_id)
+        return finished
+
+    def get(self, job_id: str, include_results: bool = True) -> Optional[EvaluationJob]:
+        with self._db.lock:
+            conn = self._db.connection()
+            row = conn.execute(
+                "SELECT job_id, status, total, succeeded, failed, created_at, updated_at,"
+                " finished_at, webhook_url, webhook_status FROM jobs WHERE job_id = ?",
+                (job_id,),
+            ).fetchone()
+            if row is None:
+                return None
+            results = None
+            if include_results:
+                results = [
+                    BatchItemResult.model_validate_json(result)
+                    for (result,) in conn.execute(
+                        "SELECT result FROM job_items WHERE job_id = ? AND result IS NOT NULL ORDER BY position",
+                        (job_id,),
+                    )
+                ]
+        (job_id, status, total, succeeded, failed, created_at, updated_at,
+         finished_at, webhook_url, webhook_status) = row
+        return EvaluationJob(
+            job_id=job_id,
+            status=status,
+            total=total,
+            completed=succeeded + failed,
+            succeeded=succeeded,
+            failed=failed,
+            created_at=created_at,
+            updated_at=updated_at,
+            finished_at=finished_at,
+            webhook_url=webhook_url,
+            webhook_status=webhook_status,
+            results=results,
+        )
+
+    def undelivered_webhooks(self) -> List[str]:
+        with self._db.lock:
+            conn = self._db.connection()
+            return [row[0] for row in conn.execute(
+                "SELECT job_id FROM jobs WHERE status = 'completed' AND webhook_status = 'pending'"
+            )]
+
+    def set_webhook_status(self, job_id: str, status: str) -> None:
+        with self._db.lock:
+            self._db.connection().execute(
+                "UPDATE jobs SET webhook_status = ? WHERE job_id = ?", (status, job_id)
+            )
+
+    def pending_count(self) -> int:
+        with self._db.lock:
+            (count,) = self._db.connection().execute(
+                "SELECT COUNT(*) FROM job_items WHERE status = 'pending'"
+            ).fetchone()
+        return count
+
+    def close(self) -> None:
+        self._db.close()
+
+
+class JobRunner:
+    """
+    In-process worker pool draining the JobStore.
+
+    Each worker claims up to JOB_CHUNK_SIZE pending items — across jobs,
+    oldest first — and grades them with EvaluationService.evaluate_batch_stream,
+    so answers to the same question are still packed into one LLM request.
+    Workers sleep until a job is submitted; a finished job's webhook is
+    sent in the background.
+    """
+
+    def __init__(self, service, store: Optional[JobStore] = None,
+                 workers: int = JOB_WORKERS, chunk_size: int = JOB_CHUNK_SIZE):
+        self.service = service
+        self.store = store or JobStore()
+        self.workers = max(1, workers)
+        self.chunk_size = max(1, chunk_size)
+        self._wakeup: Optional[asyncio.Event] = None
+        self._tasks: List[asyncio.Task] = []
+        self._webhooks: Set[asyncio.Task] = set()
+
+    # Store calls run on worker threads: a 10k-item insert or a results
+    # poll must not stall the event loop.
+    async def submit(self, items: List[BatchEvaluationItem], webhook_url: Optional[str] = None) -> str:
+        job_id = await asyncio.to_thread(self.store.create, items, webhook_url)
+        JOBS_TOTAL.inc(event="submitted")
+        logger.info(f"Job {job_id} queued with {len(items)} item(s)")
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return job_id
+
+    async def get(self, job_id: str, include_results: bool = True) -> Optional[EvaluationJob]:
+        return await asyncio.to_thread(self.store.get, job_id, include_results)
+
+    async def start(self) -> None:
+        await asyncio.to_thread(self.store.recover)
+        self._wakeup = asyncio.Event()
+        self._wakeup.set()  # drain whatever the previous process left behind
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        for job_id in await asyncio.to_thread(self.store.undelivered_webhooks):
+            self._send_webhook(job_id)
+        JOB_QUEUE_DEPTH.set_function(self.store.pending_count)
+        logger.info(f"Job runner started with {self.workers} worker(s)")
+
+    async def stop(self) -> None:
+        # Items being graded stay "running" on disk and are re-queued on the next start
+        for task in [*self._tasks, *self._webhooks]:
+            task.cancel()
+        await asyncio.gather(*self._tasks, *self._webhooks, return_exceptions=True)
+        self._tasks = []
+        self.store.close()
+
+    async def _worker(self, index: int) -> None:
+        while True:
+            claimed = await asyncio.to_thread(self.store.claim, self.chunk_size)
+            if not claimed:
+                self._wakeup.clear()
+                # Re-check after clearing so a submit in between isn't missed
+                claimed = await asyncio.to_thread(self.store.claim, self.chunk_size)
+                if not claimed:
+                    await self._wakeup.wait()
+                    continue
+            # Let the other workers pick up the rest of the queue too
+            self._wakeup.set()
+            try:
+                await self._grade(claimed)
+            except Exception as e:
+                logger.error(f"Job worker {index} failed a chunk: {e}", exc_info=True)
+
+    async def _grade(self, claimed: List[Tuple[str, int, BatchEvaluationItem]]) -> None:
+        items = [item for _, _, item in claimed]
+        # Results are matched to items by the index the stream reports
+        results: List[Optional[BatchItemResult]] = [None] * len(items)
+        failure = "Item was not graded"
+        try:
+            async for index, result in self.service.evaluate_batch_stream(items):
+                results[index] = result
+        except Exception as e:
+            # evaluate_batch_stream reports per-item errors itself; this is a last resort
+            logger.error(f"Job chunk grading failed: {e}", exc_info=True)
+            failure = str(e)
+
+        outcomes = [
+            (job_id, position, result or BatchItemResult(item_id=item.item_id, status="error", error=failure))
+            for (job_id, position, item), result in zip(claimed, results)
+        ]
+        for _, _, result in outcomes:
+            JOB_ITEMS.inc(status=result.status)
+        for job_id in await asyncio.to_thread(self.store.complete, outcomes):
+            JOBS_TOTAL.inc(event="completed")
+            logger.info(f"Job {job_id} completed")
+            self._send_webhook(job_id)
+
+    def _send_webhook(self, job_id: str) -> None:
+        task = asyncio.create_task(self._deliver_webhook(job_id))
+        self._webhooks.add(task)
+        task.add_done_callback(self._webhooks.discard)
+
+    async def _deliver_webhook(self, job_id: str) -> None:
+        """
+        POSTs the job summary (without results — fetch them from
+        GET /evaluate/jobs/{job_id}) to the job's webhook_url, retrying with
+        jittered backoff. Any 2xx counts as delivered.
+        """
+        job = await asyncio.to_thread(self.store.get, job_id, False)
+        if job is None or not job.webhook_url:
+            return
+        body = job.model_dump(exclude={"results", "webhook_status"})
+
+        try:
+            unsafe = await unsafe_webhook_addresses(job.webhook_url)
+        except OSError:
+            unsafe = []  # unresolvable right now; the POST attempts below report it
+        if unsafe:
+            logger.warning(f"Webhook for job {job_id} not sent: host resolves to non-public {unsafe}")
+            await asyncio.to_thread(self.store.set_webhook_status, job_id, "failed")
+            JOB_WEBHOOKS.inc(outcome="failed")
+            return
+
+        # No env proxies: the POST must go through webhook_transport's address check
+        async with httpx.AsyncClient(timeout=WEBHOOK_TIMEOUT, transport=webhook_transport(), trust_env=False) as client:
+            for attempt in range(WEBHOOK_RETRIES + 1):
+                try:
+                    response = await client.post(job.webhook_url, json=body)
+                    if response.is_success:
+                        await asyncio.to_thread(self.store.set_webhook_status, job_id, "delivered")
+                        JOB_WEBHOOKS.inc(outcome="delivered")
+                        return
+                    error = f"HTTP {response.status_code}"
+                except httpx.HTTPError as e:
+                    error = f"{type(e).__name__}: {e}"
+                logger.warning(f"Webhook for job {job_id} failed (attempt {attempt + 1}): {error}")
+                if attempt < WEBHOOK_RETRIES:
+                    await asyncio.sleep(random.uniform(0.5, 1.5) * 2 ** attempt)
+
+        await asyncio.to_thread(self.store.set_webhook_status, job_id, "failed")
+        JOB_WEBHOOKS.inc(outcome="failed")
@@ -0,0 +1,295 @@
+import os
+import json
+import time
+import hashlib
+import logging
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, List, Optional
+
+import numpy as np
+
+from app.schemas.evaluation_schemas import EvaluationRequest, QuestionRegistration, RubricWeight
+from app.utils.metrics import gauge
+from app.utils.storage import SQLiteDatabase, cache_path
+
+logger = logging.getLogger(__name__)
+
+
+# --- Question Bank Configuration ---
+QUESTION_BANK_PATH = os.getenv("QUESTION_BANK_PATH", cache_path("questions.sqlite3"))
+
+REGISTERED_QUESTIONS = gauge(
+    "evaluation_registered_questions",
+    "Questions registered through POST /evaluate/exams",
+)
+
+
+class UnknownQuestionError(ValueError):
+    """
+    A request omitted the question or rubric and its question_id is not
+    registered.
+    """
+
+
+class QuestionConflictError(ValueError):
+    """
+    An exam tried to register a question_id that belongs to another exam.
+    """
+
+
+@dataclass
+class StoredQuestion:
+    exam_id:      str
+    registration: QuestionRegistration
+    updated_at:   float
+
+
+@dataclass
+class ReferenceArtifacts:
+    """
+    Everything derived from one reference answer, computed once at
+    registration. Each engine's part is tagged with the engine's
+    artifact_version and only reused while that still matches.
+    """
+    reference:          str
+    similarity_version: str
+    embedding:          np.ndarray      # storage precision
+    tokens:             FrozenSet[str]  # exact-match / containment token set
+    nli_version:        str
+    premise_ids:        List[int]       # NLI premise token ids, no special tokens
+
+
+def reference_key(reference: str) -> str:
+    return hashlib.sha256(reference.encode("utf-8")).hexdigest()
+
+
+def _references(questions: Dict[str, StoredQuestion]) -> List[str]:
+    # Distinct non-empty reference answers, in registration order
+    return list(dict.fromkeys(
+        stored.registration.reference_answer
+        for stored in questions.values()
+        if stored.registration.reference_answer and stored.registration.reference_answer.strip()
+    ))
+
+
+QUESTION_BANK_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS questions ("
+    " question_id TEXT PRIMARY KEY,"
+    " exam_id TEXT NOT NULL,"
+    " question TEXT NOT NULL,"
+    " reference_answer TEXT,"
+    " total_marks REAL,"
+    " rubric TEXT,"
+    " updated_at REAL NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS idx_questions_exam ON questions(exam_id)",
+    "CREATE TABLE IF NOT EXISTS reference_artifacts ("
+    " key TEXT PRIMARY KEY,"
+    " reference TEXT NOT NULL,"
+    " similarity_version TEXT NOT NULL,"
+    " embedding BLOB NOT NULL,"
+    " embedding_dtype TEXT NOT NULL,"
+    " tokens TEXT NOT NULL,"
+    " nli_version TEXT NOT NULL,"
+    " premise_ids TEXT NOT NULL)",
+)
+
+
+class QuestionBank:
+    """
+    Registered exam questions and their reference-side artifacts.
+
+    Questions are held in memory (requests citing a question_id never touch
+    the disk) and persisted to SQLite together with the artifacts, which are
+    stored once per distinct reference answer, keyed by its SHA-256.
+    """
+
+    def __init__(self, path: str = QUESTION_BANK_PATH):
+        self.path = path
+
+        self._db = SQLiteDatabase(path, QUESTION_BANK_SCHEMA, "Question bank")
+        self._questions: Dict[str, StoredQuestion] = {}
+
+        REGISTERED_QUESTIONS.set_function(lambda: len(self._questions))
+
+    # ── In-memory lookups (hot path) ────────────────────────────────────────
+    def get(self, question_id: str) -> Optional[StoredQuestion]:
+        return self._questions.get(question_id)
+
+    def exam(self, exam_id: str) -> List[StoredQuestion]:
+        return [stored for stored in self._questions.values() if stored.exam_id == exam_id]
+
+    def references(self) -> List[str]:
+        """
+        Distinct non-empty reference answers of every registered question.
+        """
+        return _references(self._questions)
+
+    def resolve(self, request: EvaluationRequest) -> EvaluationRequest:
+        """
+        Fills the fields a request left out from its registered question;
+        fields the request does carry win. Raises UnknownQuestionError if
+        the question or rubric is still missing.
+        """
+        stored = self._questions.get(request.question_id) if request.question_id else None
+        if stored is not None:
+            registration = stored.registration
+            defaults = {
+                "question":         registration.question,
+                "reference_answer": registration.reference_answer,
+                "total_marks":      registration.total_marks,
+                "rubric":           registration.rubric,
+                "exam_id":          stored.exam_id,
+            }
+            updates = {
+                field: value for field, value in defaults.items()
+                if value is not None and getattr(request, field) is None
+            }
+            if updates:
+                request = request.model_copy(update=updates)
+
+        if request.question is None or request.rubric is None:
+            if request.question_id and stored is None:
+                raise UnknownQuestionError(f"Question '{request.question_id}' is not registered")
+            missing = "question" if request.question is None else "rubric"
+            raise UnknownQuestionError(f"Request has no {missing} (send it or cite a registered question_id)")
+        return request
+
+    # ── Persistence ─────────────────────────────────────────────────────────
+    def save_questions(self, exam_id: str, questions: List[QuestionRegistration]) -> List[str]:
+        """
+        Stores (or replaces) the exam's questions; questions the exam had
+        before but `questions` leaves out are deleted. Returns the reference
+        answers this left unused by any question; their stored artifacts are
+        deleted and the caller unpins them from the engines. Raises
+        QuestionConflictError, saving nothing, if a question_id belongs to
+        another exam.
+        """
+        now = time.time()
+        rows = [
+            (
+                q.question_id,
+                exam_id,
+                q.question,
+                q.reference_answer,
+                q.total_marks,
+                q.rubric.model_dump_json() if q.rubric is not None else None,
+                now,
+            )
+            for q in questions
+        ]
+        with self._db.lock:
+            # Checked under the lock that guards every save, so two exams
+            # registering the same question_id at once cannot both succeed
+            taken = [
+                q.question_id for q in questions
+                if (stored := self._questions.get(q.question_id)) is not None and stored.exam_id != exam_id
+            ]
+            if taken:
+                raise QuestionConflictError(f"question_id already registered to another exam: {taken[:5]}")
+
+            new_ids = {q.question_id for q in questions}
+            dropped = [stored.registration.question_id for stored in self.exam(exam_id)
+                       if stored.registration.question_id not in new_ids]
+            # Replaced and dropped questions may have been the last users of their reference
+            replaced = {
+                self._questions[question_id].registration.reference_answer
+                for question_id in [*new_ids, *dropped]
+                if question_id in self._questions
+            }
+            updated = {
+                question_id: stored for question_id, stored in self._questions.items()
+                if question_id not in dropped
+            }
+            for q in questions:
+                updated[q.question_id] = StoredQuestion(exam_id=exam_id, registration=q, updated_at=now)
+            in_use = set(_references(updated))
+            orphaned = [r for r in replaced if r and r.strip() and r not in in_use]
+
+            conn = self._db.connection()
+            with conn:
+                conn.execute("BEGIN")
+                conn.executemany("INSERT OR REPLACE INTO questions VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+                conn.executemany("DELETE FROM questions WHERE question_id = ?", [(q,) for q in dropped])
+                conn.executemany(
+                    "DELETE FROM reference_artifacts WHERE key = ?", [(reference_key(r),) for r in orphaned]
+                )
+            # Swapped in whole, so lookups on the event loop never see half an exam
+            self._questions = updated
+        if dropped:
+            logger.info(f"Exam {exam_id}: {len(dropped)} question(s) no longer registered")
+        return orphaned
+
+    def save_artifacts(self, artifacts: List[ReferenceArtifacts]) -> None:
+        rows = [
+            (
+                reference_key(a.reference),
+                a.reference,
+                a.similarity_version,
+                a.embedding.tobytes(),
+                str(a.embedding.dtype),
+                json.dumps(sorted(a.tokens), ensure_ascii=False),
+                a.nli_version,
+                json.dumps(a.premise_ids),
+            )
+            for a in artifacts
+        ]
+        with self._db.lock:
+            conn = self._db.connection()
+            with conn:
+                conn.execute("BEGIN")
+                conn.executemany(
+                    "INSERT OR REPLACE INTO reference_artifacts VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows
+                )
+
+    def load(self) -> List[ReferenceArtifacts]:
+        """
+        Reads every registered question into memory and returns the stored
+        artifacts of their reference answers (for the engines to pin).
+        """
+        with self._db.lock:
+            conn = self._db.connection()
+            question_rows = conn.execute(
+                "SELECT question_id, exam_id, question, reference_answer, total_marks, rubric, updated_at"
+                " FROM questions"
+            ).fetchall()
+            artifact_rows = conn.execute(
+                "SELECT reference, similarity_version, embedding, embedding_dtype, tokens, nli_version, premise_ids"
+                " FROM reference_artifacts"
+            ).fetchall()
+
+        for question_id, exam_id, question, reference, total_marks, rubric, updated_at in question_rows:
+            self._questions[question_id] = StoredQuestion(
+                exam_id=exam_id,
+                registration=QuestionRegistration(
+                    question_id=question_id,
+                    question=question,
+                    reference_answer=reference,
+                    total_marks=total_marks,
+                    rubric=RubricWeight.model_validate_json(rubric) if rubric else None,
+                ),
+                updated_at=updated_at,
+            )
+
+        wanted = set(self.references())
+        artifacts = [
+            ReferenceArtifacts(
+                reference=reference,
+                similarity_version=similarity_version,
+                embedding=np.frombuffer(embedding, dtype=embedding_dtype).copy(),
+                tokens=frozenset(json.loads(tokens)),
+                nli_version=nli_version,
+                premise_ids=json.loads(premise_ids),
+            )
+            for reference, similarity_version, embedding, embedding_dtype, tokens, nli_version, premise_ids
+            in artifact_rows
+            if reference in wanted
+        ]
+        logger.info(f"Question bank: {len(self._questions)} question(s), {len(artifacts)} reference artifact(s) loaded")
+        return artifacts
+
+    def close(self) -> None:
+        self._db.close()
+
+
+# Process-wide bank used by EvaluationService and the exam routes.
+question_bank = QuestionBank()
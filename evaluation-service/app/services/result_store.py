@@ -0,0 +1,368 @@
+import os
+import json
+import time
+import asyncio
+import sqlite3
+import hashlib
+import logging
+from typing import Dict, List, Optional, Union
+
+from app.schemas.evaluation_schemas import EvaluationRequest, EvaluationResponse, StoredEvaluation
+from app.utils.metrics import counter, gauge
+from app.utils.storage import SQLiteDatabase, cache_path
+
+logger = logging.getLogger(__name__)
+
+
+# --- Result Store Configuration ---
+RESULT_STORE_ENABLED  = os.getenv("RESULT_STORE_ENABLED", "true").lower() in ("1", "true", "yes")
+RESULT_STORE_PATH     = os.getenv("RESULT_STORE_PATH", cache_path("results.sqlite3"))
+FLUSH_INTERVAL        = float(os.getenv("RESULT_STORE_FLUSH_INTERVAL", "0.5"))   # seconds
+FLUSH_BATCH           = int(os.getenv("RESULT_STORE_FLUSH_BATCH", "200"))       # flush early at this backlog
+
+# Results that depend on a transient failure are not worth replaying.
+NOT_STORED_DECISIONS = {"llm_error"}
+
+RESULT_LOOKUPS = counter(
+    "evaluation_result_lookups_total",
+    "Result store lookups by outcome (hit / miss / conflict)",
+    ["outcome"],
+)
+RESULT_WRITES = counter(
+    "evaluation_result_writes_total",
+    "Results written to the result store",
+)
+RESULT_WRITE_BACKLOG = gauge(
+    "evaluation_result_write_backlog",
+    "Results accepted but not yet written to disk",
+)
+
+
+class IdempotencyConflictError(ValueError):
+    """
+    An idempotency key was reused for a different submission.
+    """
+
+
+def submission_fingerprint(request: EvaluationRequest) -> str:
+    """
+    SHA-256 of every input that affects the grade (answer, question,
+    reference, marks, rubric, style) — not the ids or the debug flags.
+    """
+    material = json.dumps(
+        {
+            "question":         request.question,
+            "student_answer":   request.student_answer.strip(),
+            "reference_answer": request.reference_answer,
+            "total_marks":      request.total_marks if request.total_marks is not None else request.max_score,
+            "rubric":           request.rubric.model_dump(),
+            "evaluation_style": request.evaluation_style,
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def natural_key(request: EvaluationRequest, fingerprint: str, pipeline_version: str) -> Optional[str]:
+    # (student, question, answer, pipeline) — a new answer or a new pipeline grades afresh
+    if not (request.student_id and request.question_id):
+        return None
+    material = "\x1f".join((request.student_id, request.question_id, fingerprint, pipeline_version))
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+RESULT_STORE_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS results ("
+    " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+    " idempotency_key TEXT UNIQUE,"
+    " natural_key TEXT UNIQUE,"
+    " fingerprint TEXT NOT NULL,"
+    " student_id TEXT,"
+    " question_id TEXT,"
+    " exam_id TEXT,"
+    " pipeline_version TEXT NOT NULL,"
+    " response TEXT NOT NULL,"
+    " created_at REAL NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS idx_results_student ON results(student_id, created_at)",
+    "CREATE INDEX IF NOT EXISTS idx_results_exam ON results(exam_id, created_at)",
+    "CREATE INDEX IF NOT EXISTS idx_results_question ON results(question_id, created_at)",
+)
+
+INSERT_RESULT = (
+    "INSERT INTO results (idempotency_key, natural_key, fingerprint, student_id,"
+    " question_id, exam_id, pipeline_version, response, created_at)"
+    " VALUES (:idempotency_key, :natural_key, :fingerprint, :student_id,"
+    " :question_id, :exam_id, :pipeline_version, :response, :created_at)"
+)
+UPDATE_RESULT = (
+    "UPDATE results SET fingerprint = :fingerprint, student_id = :student_id, question_id = :question_id,"
+    " exam_id = :exam_id, pipeline_version = :pipeline_version, response = :response, created_at = :created_at"
+)
+
+
+class ResultStore:
+    """
+    Persistent store of graded submissions, so a retried or repeated
+    submission returns its stored EvaluationResponse instead of re-running
+    the models and the LLM.
+
+    A result is found by the client's idempotency key (same key, same
+    submission → same result; same key, different submission → conflict) or
+    by its natural key: student_id + question_id + submission fingerprint +
+    pipeline version. Requests with neither are not stored.
+
+    Writes are write-behind: save() queues the row in memory (where lookups
+    see it immediately) and a background task writes queued rows to SQLite
+    in one transaction every FLUSH_INTERVAL, off the event loop. Without the
+    background task (scripts, benchmarks) save() writes its row right away,
+    on a worker thread. Reads (lookup, lookup_many, query) run on a worker
+    thread as well.
+    """
+
+    def __init__(self, path: str = RESULT_STORE_PATH, enabled: bool = RESULT_STORE_ENABLED):
+        self.path = path
+        self.enabled = enabled
+
+        self._db = SQLiteDatabase(path, RESULT_STORE_SCHEMA, "Result store")
+        # Rows accepted but not yet on disk, and an index of them by key
+        self._backlog: List[dict] = []
+        self._backlog_by_key: Dict[str, dict] = {}
+        self._flusher: Optional[asyncio.Task] = None
+        self._flush_now: Optional[asyncio.Event] = None
+
+    # ── Lookup / save ───────────────────────────────────────────────────────
+    def _find(self, column: str, key: str) -> Optional[dict]:
+        pending = self._backlog_by_key.get(f"{column}:{key}")
+        if pending is not None:
+            return pending
+        with self._db.lock:
+            row = self._db.connection().execute(
+                f"SELECT fingerprint, response FROM results WHERE {column} = ?", (key,)
+            ).fetchone()
+        return {"fingerprint": row[0], "response": row[1]} if row else None
+
+    def _wants_lookup(self, request: EvaluationRequest) -> bool:
+        # Requests asking for a fresh grade (bypass_llm_cache) or usage data
+        # (debug), or carrying no key at all, never read the store.
+        if not self.enabled or request.bypass_llm_cache or request.debug:
+            return False
+        return bool(request.idempotency_key or (request.student_id and request.question_id))
+
+    async def lookup(self, request: EvaluationRequest, pipeline_version: str) -> Optional[EvaluationResponse]:
+        """
+        The stored response for this submission, or None. Raises
+        IdempotencyConflictError if the idempotency key belongs to a
+        different submission.
+        """
+        if not self._wants_lookup(request):
+            return None
+        return await asyncio.to_thread(self._lookup, request, pipeline_version)
+
+    async def lookup_many(
+        self, requests: List[EvaluationRequest], pipeline_version: str
+    ) -> List[Union[EvaluationResponse, IdempotencyConflictError, None]]:
+        """
+        lookup() for a whole batch in one worker-thread hop; a conflicting
+        request's slot holds its IdempotencyConflictError.
+        """
+        def lookup_all() -> List[Union[EvaluationResponse, IdempotencyConflictError, None]]:
+            found = []
+            for request in requests:
+                try:
+                    found.append(self._lookup(request, pipeline_version) if self._wants_lookup(request) else None)
+                except IdempotencyConflictError as e:
+                    found.append(e)
+            return found
+
+        if not any(self._wants_lookup(request) for request in requests):
+            return [None] * len(requests)
+        return await asyncio.to_thread(lookup_all)
+
+    def _lookup(self, request: EvaluationRequest, pipeline_version: str) -> Optional[EvaluationResponse]:
+        fingerprint = submission_fingerprint(request)
+        row = None
+        try:
+            if request.idempotency_key:
+                row = self._find("idempotency_key", request.idempotency_key)
+                if row is not None and row["fingerprint"] != fingerprint:
+                    RESULT_LOOKUPS.inc(outcome="conflict")
+                    raise IdempotencyConflictError(
+                        f"Idempotency key '{request.idempotency_key}' was already used for a different submission"
+                    )
+            key = natural_key(request, fingerprint, pipeline_version)
+            if row is None and key:
+                row = self._find("natural_key", key)
+        except sqlite3.Error as e:
+            # A broken store must never fail an evaluation.
+            logger.warning(f"Result store read failed: {e}")
+            return None
+
+        RESULT_LOOKUPS.inc(outcome="hit" if row else "miss")
+        return EvaluationResponse.model_validate_json(row["response"]) if row else None
+
+    async def save(self, request: EvaluationRequest, response: EvaluationResponse, pipeline_version: str) -> None:
+        if not self.enabled or response.decision_path in NOT_STORED_DECISIONS:
+            return
+        fingerprint = submission_fingerprint(request)
+        key = natural_key(request, fingerprint, pipeline_version)
+        if not (request.idempotency_key or key):
+            return
+        row = {
+            "idempotency_key":  request.idempotency_key,
+            "natural_key":      key,
+            "fingerprint":      fingerprint,
+            "student_id":       request.student_id,
+            "question_id":      request.question_id,
+            "exam_id":          request.exam_id,
+            "pipeline_version": pipeline_version,
+            "response":         response.model_copy(update={"debug": None}).model_dump_json(),
+            "created_at":       time.time(),
+        }
+        if self._flusher is None:
+            await asyncio.to_thread(self._write, [row])
+            return
+        self._backlog.append(row)
+        for column in ("idempotency_key", "natural_key"):
+            if row[column]:
+                self._backlog_by_key[f"{column}:{row[column]}"] = row
+        if len(self._backlog) >= FLUSH_BATCH:
+            self._flush_now.set()
+
+    def _write(self, rows: List[dict]) -> None:
+        try:
+            with self._db.lock:
+                conn = self._db.connection()
+                with conn:
+                    conn.execute("BEGIN")
+                    for row in rows:
+                        self._upsert(conn, row)
+        except sqlite3.Error as e:
+            logger.warning(f"Result store write failed ({len(rows)} row(s) dropped): {e}")
+            return
+        RESULT_WRITES.inc(len(rows))
+
+    def _upsert(self, conn: sqlite3.Connection, row: dict) -> None:
+        """
+        Stores one row; a re-grade (bypass_llm_cache) supersedes the stored
+        result. The row owning the idempotency key and the row owning the
+        natural key are each updated in place — never deleted, as INSERT OR
+        REPLACE would when the two keys belong to different rows — and a key
+        no row owns yet is attached to one or inserted.
+        """
+        key, natural = row["idempotency_key"], row["natural_key"]
+        by_key = key and conn.execute(
+            "SELECT id FROM results WHERE idempotency_key = ?", (key,)
+        ).fetchone()
+        by_natural = natural and conn.execute(
+            "SELECT id, idempotency_key FROM results WHERE natural_key = ?", (natural,)
+        ).fetchone()
+
+        if by_natural:
+            # Same submission: keep its own idempotency key, or adopt this one
+            conn.execute(
+                UPDATE_RESULT + ", idempotency_key = COALESCE(idempotency_key, :claim) WHERE id = :id",
+                {**row, "id": by_natural[0], "claim": None if by_key else key},
+            )
+        if by_key and not (by_natural and by_natural[0] == by_key[0]):
+            # Its old natural key described the submission it no longer holds
+            conn.execute(
+                UPDATE_RESULT + ", natural_key = :claim WHERE id = :id",
+                {**row, "id": by_key[0], "claim": None if by_natural else natural},
+            )
+
+        if not (by_key or by_natural):
+            conn.execute(INSERT_RESULT, row)
+        elif key and not by_key and by_natural[1] is not None:
+            # The submission's row already answers to another idempotency key
+            conn.execute(INSERT_RESULT, {**row, "natural_key": None})
+
+    # ── Write-behind ────────────────────────────────────────────────────────
+    async def flush(self) -> None:
+        """
+        Writes every queued row (on a worker thread) and drops it from the backlog.
+        """
+        rows, self._backlog = self._backlog, []
+        if not rows:
+            return
+        await asyncio.to_thread(self._write, rows)
+        for row in rows:
+            for column in ("idempotency_key", "natural_key"):
+                entry = f"{column}:{row[column]}"
+                if row[column] and self._backlog_by_key.get(entry) is row:
+                    del self._backlog_by_key[entry]
+
+    async def _flush_loop(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_now.wait(), timeout=FLUSH_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_now.clear()
+            await self.flush()
+
+    async def start(self) -> None:
+        if not self.enabled or self._flusher is not None:
+            return
+        self._flush_now = asyncio.Event()
+        self._flusher = asyncio.create_task(self._flush_loop())
+        RESULT_WRITE_BACKLOG.set_function(lambda: len(self._backlog))
+
+    async def close(self) -> None:
+        if self._flusher is not None:
+            self._flusher.cancel()
+            await asyncio.gather(self._flusher, return_exceptions=True)
+            self._flusher = None
+        await self.flush()
+        self._db.close()
+
+    # ── Queries ─────────────────────────────────────────────────────────────
+    async def query(self, **filters) -> List[StoredEvaluation]:
+        """
+        _query() on a worker thread.
+        """
+        return await asyncio.to_thread(self._query, **filters)
+
+    def _query(
+        self,
+        student_id: Optional[str] = None,
+        exam_id: Optional[str] = None,
+        question_id: Optional[str] = None,
+        pipeline_version: Optional[str] = None,
+        limit: int = 1000,
+        offset: int = 0,
+    ) -> List[StoredEvaluation]:
+        """
+        Stored results matching every given filter, newest first.
+        """
+        filters = {
+            "student_id":       student_id,
+            "exam_id":          exam_id,
+            "question_id":      question_id,
+            "pipeline_version": pipeline_version,
+        }
+        where = " AND ".join(f"{column} = :{column}" for column, value in filters.items() if value is not None)
+        params = {column: value for column, value in filters.items() if value is not None}
+        with self._db.lock:
+            rows = self._db.connection().execute(
+                "SELECT student_id, question_id, exam_id, idempotency_key, pipeline_version, created_at, response"
+                f" FROM results {'WHERE ' + where if where else ''}"
+                " ORDER BY created_at DESC, id DESC LIMIT :limit OFFSET :offset",
+                {**params, "limit": limit, "offset": offset},
+            ).fetchall()
+        return [
+            StoredEvaluation(
+                student_id=student_id,
+                question_id=question_id,
+                exam_id=exam_id,
+                idempotency_key=idempotency_key,
+                pipeline_version=version,
+                created_at=created_at,
+                result=EvaluationResponse.model_validate_json(response),
+            )
+            for student_id, question_id, exam_id, idempotency_key, version, created_at, response in rows
+        ]
+
+
+# Process-wide store used by EvaluationService and the results API.
+result_store = ResultStore()
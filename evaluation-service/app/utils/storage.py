@@ -0,0 +1,52 @@
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+from typing import Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+# Local state (SQLite stores, exported models) lives under <service>/.cache
+SERVICE_ROOT = Path(__file__).resolve().parents[2]
+CACHE_DIR    = SERVICE_ROOT / ".cache"
+
+
+def cache_path(name: str) -> str:
+    return str(CACHE_DIR / name)
+
+
+class SQLiteDatabase:
+    """
+    One lazily opened SQLite connection shared by a store's threads.
+
+    The file is created (with its schema) on first use, so importing a
+    store never touches the disk. WAL + synchronous=NORMAL; autocommit, so
+    multi-statement writes open their own transaction with BEGIN. Callers
+    hold `lock` around connection() and everything they do with it.
+    """
+
+    def __init__(self, path: str, schema: Iterable[str], label: str):
+        self.path   = path
+        self.schema = list(schema)
+        self.label  = label
+        self.lock   = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            for statement in self.schema:
+                conn.execute(statement)
+            self._conn = conn
+            logger.info(f"{self.label} opened at {self.path}")
+        return self._conn
+
+    def close(self) -> None:
+        with self.lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
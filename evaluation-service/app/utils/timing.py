@@ -0,0 +1,78 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Awaitable, Dict, Iterator, Optional, TypeVar
+
+from app.utils.metrics import histogram
+
+T = TypeVar("T")
+
+STAGE_SECONDS = histogram(
+    "evaluation_stage_seconds",
+    "Wall-clock time per pipeline stage",
+    ["stage"],
+)
+
+# Per-request stage durations (seconds), set by the HTTP middleware. Child
+# tasks (asyncio.gather) copy the context but share this dict, so stages
+# recorded anywhere in the request end up in its Server-Timing header.
+_request_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("request_timings", default=None)
+
+
+def begin_request_timings():
+    """
+    Starts collecting stage timings for the current request.
+    Returns the token to pass to end_request_timings().
+    """
+    return _request_timings.set({})
+
+
+def end_request_timings(token) -> Dict[str, float]:
+    timings = _request_timings.get() or {}
+    _request_timings.reset(token)
+    return timings
+
+
+def current_request_timings() -> Dict[str, float]:
+    """
+    Stage timings recorded so far in the current request.
+    """
+    return dict(_request_timings.get() or {})
+
+
+def record_stage(stage: str, seconds: float) -> None:
+    """
+    Observes the stage histogram and adds the duration to the current
+    request's timings (summed when a stage runs several times, e.g. batches).
+    """
+    STAGE_SECONDS.observe(seconds, stage=stage)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + seconds
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(name, time.perf_counter() - started)
+
+
+async def timed(name: str, awaitable: Awaitable[T]) -> T:
+    """
+    Awaits one pipeline stage and records its duration.
+    """
+    with stage(name):
+        return await awaitable
+
+
+def server_timing_header(timings: Dict[str, float], total: Optional[float] = None) -> str:
+    """
+    Formats timings as a Server-Timing header value (durations in ms).
+    """
+    entries = [f"{name};dur={seconds * 1000:.2f}" for name, seconds in timings.items()]
+    if total is not None:
+        entries.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(entries)
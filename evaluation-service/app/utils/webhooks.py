@@ -0,0 +1,139 @@
+import os
+import socket
+import asyncio
+import ipaddress
+from typing import Iterable, List, Optional
+from urllib.parse import urlsplit
+
+import httpcore
+import httpx
+
+
+# --- Webhook Target Policy ---
+# Job webhooks are POSTed by the server to a caller-supplied URL, so by
+# default only http(s) URLs whose host is public are accepted. A non-empty
+# allowlist replaces the public-address rule: only those hosts are allowed.
+WEBHOOK_ALLOWED_HOSTS = [
+    host.strip().lower()
+    for host in os.getenv("EVALUATION_WEBHOOK_ALLOWED_HOSTS", "").split(",")
+    if host.strip()
+]
+# Development only: let webhooks reach localhost / private networks
+WEBHOOK_ALLOW_PRIVATE = os.getenv("EVALUATION_WEBHOOK_ALLOW_PRIVATE", "false").lower() in ("1", "true", "yes")
+
+
+def _is_public(address: str) -> bool:
+    ip = ipaddress.ip_address(address)
+    if isinstance(ip, ipaddress.IPv6Address) and ip.ipv4_mapped is not None:
+        ip = ip.ipv4_mapped
+    return ip.is_global and not ip.is_multicast
+
+
+def check_webhook_url(url: str) -> str:
+    """
+    Validates a webhook URL without network access: http(s) only, and the
+    host must be allowlisted, or (without an allowlist) must not be
+    localhost or a private / loopback / link-local / reserved IP literal.
+    Raises ValueError; returns the URL unchanged.
+    """
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https"):
+        raise ValueError("webhook_url must be an http or https URL")
+    host = (parts.hostname or "").lower()
+    if not host:
+        raise ValueError("webhook_url has no host")
+    if parts.username or parts.password:
+        raise ValueError("webhook_url must not contain credentials")
+
+    if WEBHOOK_ALLOWED_HOSTS:
+        if host not in WEBHOOK_ALLOWED_HOSTS:
+            raise ValueError(f"webhook_url host '{host}' is not in EVALUATION_WEBHOOK_ALLOWED_HOSTS")
+        return url
+    if WEBHOOK_ALLOW_PRIVATE:
+        return url
+
+    if host == "localhost" or host.endswith(".localhost"):
+        raise ValueError("webhook_url must not point at localhost")
+    try:
+        public = _is_public(host)
+    except ValueError:
+        return url  # a DNS name; its addresses are checked before delivery
+    if not public:
+        raise ValueError("webhook_url must not point at a private or reserved address")
+    return url
+
+
+async def unsafe_webhook_addresses(url: str) -> List[str]:
+    """
+    Addresses the URL's host resolves to that the policy forbids (empty =
+    safe to deliver). Checked before delivery so a public-looking DNS name
+    that leads into the server's own network fails at once, without
+    retries; webhook_transport() enforces the same rule on the connection
+    itself.
+    """
+    if WEBHOOK_ALLOWED_HOSTS or WEBHOOK_ALLOW_PRIVATE:
+        return []
+    parts = urlsplit(url)
+    port = parts.port or (443 if parts.scheme == "https" else 80)
+    infos = await asyncio.to_thread(socket.getaddrinfo, parts.hostname, port, type=socket.SOCK_STREAM)
+    return sorted({info[4][0] for info in infos if not _is_public(info[4][0])})
+
+
+class PublicAddressBackend(httpcore.AsyncNetworkBackend):
+    """
+    Network backend for webhook deliveries. It resolves the host once,
+    refuses it if any address is not public, and connects to a checked
+    address itself. The check and the connection therefore use the same
+    lookup, so a DNS answer that changes in between (DNS rebinding) cannot
+    redirect the POST. TLS still uses the original host name for SNI and
+    certificate checks, and the Host header is unchanged.
+    """
+
+    def __init__(self, backend: Optional[httpcore.AsyncNetworkBackend] = None):
+        self._backend = backend or httpcore.AnyIOBackend()
+
+    async def connect_tcp(
+        self,
+        host: str,
+        port: int,
+        timeout: Optional[float] = None,
+        local_address: Optional[str] = None,
+        socket_options: Optional[Iterable] = None,
+    ) -> httpcore.AsyncNetworkStream:
+        try:
+            infos = await asyncio.to_thread(socket.getaddrinfo, host, port, type=socket.SOCK_STREAM)
+        except OSError as e:
+            raise httpcore.ConnectError(f"Cannot resolve webhook host '{host}': {e}") from e
+        addresses = list(dict.fromkeys(info[4][0] for info in infos))
+        unsafe = sorted(address for address in addresses if not _is_public(address))
+        if unsafe:
+            raise httpcore.ConnectError(f"Webhook host '{host}' resolves to non-public {unsafe}")
+
+        error: Optional[Exception] = None
+        for address in addresses:
+            try:
+                return await self._backend.connect_tcp(
+                    address, port, timeout=timeout, local_address=local_address, socket_options=socket_options
+                )
+            except httpcore.ConnectError as e:
+                error = e
+        raise error or httpcore.ConnectError(f"Webhook host '{host}' has no addresses")
+
+    async def sleep(self, seconds: float) -> None:
+        await self._backend.sleep(seconds)
+
+
+def webhook_transport() -> httpx.AsyncHTTPTransport:
+    """
+    Transport for webhook deliveries. It connects only to public addresses
+    (PublicAddressBackend) unless an allowlist or WEBHOOK_ALLOW_PRIVATE
+    replaces that rule.
+    """
+    transport = httpx.AsyncHTTPTransport()
+    if not (WEBHOOK_ALLOWED_HOSTS or WEBHOOK_ALLOW_PRIVATE):
+        # httpx takes no network backend, so the pool is rebuilt around one
+        transport._pool = httpcore.AsyncConnectionPool(
+            ssl_context=httpx.create_ssl_context(),
+            network_backend=PublicAddressBackend(),
+        )
+    return transport
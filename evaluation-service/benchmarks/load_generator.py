@@ -0,0 +1,251 @@
+"""
+Async load generator for a running evaluation service.
+
+Replays rows of a question/answer CSV (phase1_final_dataset.csv by default)
+against POST /evaluate/ in steps, and reports per step: achieved RPS,
+error rate, HTTP status counts and p50/p95/p99 latency.
+
+Modes:
+    concurrency  closed loop — N workers each send the next request as soon
+                 as the previous one returns; steps are worker counts.
+    rate         open loop — requests arrive on a schedule (uniform or
+                 --poisson) regardless of how fast the service answers;
+                 steps are target requests per second. Latency is measured
+                 from the scheduled arrival, so a backed-up service shows
+                 its queueing delay instead of hiding it.
+
+Usage (from evaluation-service/, with the service running):
+    python -m benchmarks.load_generator --mode concurrency --steps 1,2,4,8,16,32
+    python -m benchmarks.load_generator --mode rate --steps 1,2,5,10,20 --poisson --output load.json
+
+Cached LLM judgments make repeat rows almost free; pass --bypass-llm-cache
+(against benchmarks/mock_llm_server.py, not the paid API) to measure the
+uncached path.
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from itertools import cycle
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import httpx
+
+from benchmarks.stats import percentile
+from benchmarks.workloads import DATASET, load_dataset
+
+DEFAULT_URL = "http://127.0.0.1:8001/evaluate/"
+
+
+def build_payloads(path: Path, bypass_llm_cache: bool, seed: int) -> List[dict]:
+    """
+    One /evaluate/ request body per CSV row. The best human-scored answer
+    to each question serves as its reference answer.
+    """
+    payloads = []
+    for rows in load_dataset(path).values():
+        reference = max(rows, key=lambda r: float(r["human_score"]))["student_answer"]
+        for row in rows:
+            payloads.append({
+                "question":         row["question"],
+                "student_answer":   row["student_answer"],
+                "reference_answer": reference,
+                "total_marks":      float(row["max_score"]),
+                "rubric":           {"concept": 0.6, "completeness": 0.2, "clarity": 0.2},
+                "bypass_llm_cache": bypass_llm_cache,
+            })
+    random.Random(seed).shuffle(payloads)
+    return payloads
+
+
+class StepRecorder:
+    """
+    Outcomes of one load step.
+    """
+
+    def __init__(self):
+        self.latencies_ms: List[float] = []
+        self.statuses: Counter = Counter()
+        self.dropped = 0
+
+    def record(self, status: str, latency_ms: float) -> None:
+        self.statuses[status] += 1
+        if status == "200":
+            self.latencies_ms.append(latency_ms)
+
+    def summary(self, wall_seconds: float) -> dict:
+        completed = sum(self.statuses.values())
+        ok = self.statuses.get("200", 0)
+        errors = completed - ok + self.dropped
+        attempted = completed + self.dropped
+        ordered = sorted(self.latencies_ms)
+        latency = None
+        if ordered:
+            latency = {
+                "mean": round(sum(ordered) / len(ordered), 2),
+                "p50":  round(percentile(ordered, 0.50), 2),
+                "p95":  round(percentile(ordered, 0.95), 2),
+                "p99":  round(percentile(ordered, 0.99), 2),
+                "max":  round(ordered[-1], 2),
+            }
+        return {
+            "duration_s":   round(wall_seconds, 3),
+            "requests":     attempted,
+            "ok":           ok,
+            "errors":       errors,
+            "dropped":      self.dropped,
+            "error_rate":   round(errors / attempted, 4) if attempted else 0.0,
+            "achieved_rps": round(completed / wall_seconds, 3) if wall_seconds > 0 else 0.0,
+            "goodput_rps":  round(ok / wall_seconds, 3) if wall_seconds > 0 else 0.0,
+            "status":       dict(self.statuses),
+            "latency_ms":   latency,
+        }
+
+
+async def send(http: httpx.AsyncClient, url: str, payload: dict,
+               recorder: StepRecorder, started: Optional[float] = None) -> None:
+    started = time.perf_counter() if started is None else started
+    try:
+        response = await http.post(url, json=payload)
+        status = str(response.status_code)
+    except httpx.TimeoutException:
+        status = "timeout"
+    except httpx.HTTPError as e:
+        status = type(e).__name__
+    recorder.record(status, (time.perf_counter() - started) * 1000)
+
+
+async def run_concurrency_step(http: httpx.AsyncClient, url: str, payloads: Iterator[dict],
+                               workers: int, duration: float) -> dict:
+    recorder = StepRecorder()
+    deadline = time.perf_counter() + duration
+
+    async def worker() -> None:
+        while time.perf_counter() < deadline:
+            await send(http, url, next(payloads), recorder)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(workers)))
+    return {"concurrency": workers, **recorder.summary(time.perf_counter() - started)}
+
+
+async def run_rate_step(http: httpx.AsyncClient, url: str, payloads: Iterator[dict], rate: float,
+                        duration: float, poisson: bool, max_in_flight: int, rng: random.Random) -> dict:
+    recorder = StepRecorder()
+    in_flight: set = set()
+    started = time.perf_counter()
+    arrival = started
+
+    while arrival < started + duration:
+        delay = arrival - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if len(in_flight) >= max_in_flight:
+            recorder.dropped += 1  # client-side overload; counted as an error
+        else:
+            task = asyncio.create_task(send(http, url, next(payloads), recorder, started=arrival))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+        arrival += rng.expovariate(rate) if poisson else 1.0 / rate
+
+    if in_flight:
+        await asyncio.gather(*in_flight)
+    summary = recorder.summary(time.perf_counter() - started)
+    summary["saturated"] = summary["goodput_rps"] < 0.9 * rate
+    return {"target_rps": rate, **summary}
+
+
+async def run(args: argparse.Namespace, steps: List[float]) -> Dict[str, object]:
+    payloads = build_payloads(Path(args.csv), args.bypass_llm_cache, args.seed)
+    rows = cycle(payloads)
+    rng = random.Random(args.seed)
+    pool = int(max(steps)) if args.mode == "concurrency" else args.max_in_flight
+    limits = httpx.Limits(max_connections=pool, max_keepalive_connections=pool)
+
+    results = []
+    async with httpx.AsyncClient(timeout=args.timeout, limits=limits) as http:
+        warmup = StepRecorder()
+        for _ in range(args.warmup):
+            await send(http, args.url, next(rows), warmup)
+        if args.warmup and "200" not in warmup.statuses:
+            raise SystemExit(f"Warm-up failed against {args.url}: {dict(warmup.statuses)}")
+
+        for value in steps:
+            if args.mode == "concurrency":
+                result = await run_concurrency_step(http, args.url, rows, int(value), args.step_seconds)
+            else:
+                result = await run_rate_step(http, args.url, rows, value, args.step_seconds,
+                                             args.poisson, args.max_in_flight, rng)
+            results.append(result)
+            latency = result["latency_ms"] or {}
+            print(f"{args.mode}={value:<8g} rps={result['achieved_rps']:<8} "
+                  f"err={result['error_rate']:<7.2%} p50={latency.get('p50', '-')} "
+                  f"p95={latency.get('p95', '-')} p99={latency.get('p99', '-')} ms")
+            if args.cooldown:
+                await asyncio.sleep(args.cooldown)
+
+    # The step with the most successful requests per second — past it,
+    # more load only adds latency (closed loop) or errors (open loop).
+    peak = max(results, key=lambda r: r["goodput_rps"])
+    return {
+        "meta": {
+            "created_at":       datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "url":              args.url,
+            "mode":             args.mode,
+            "step_seconds":     args.step_seconds,
+            "poisson":          args.poisson if args.mode == "rate" else None,
+            "csv":              str(args.csv),
+            "rows":             len(payloads),
+            "bypass_llm_cache": args.bypass_llm_cache,
+            "seed":             args.seed,
+        },
+        "steps": results,
+        "peak": {
+            "step":        peak.get("concurrency", peak.get("target_rps")),
+            "goodput_rps": peak["goodput_rps"],
+            "p95_ms":      (peak["latency_ms"] or {}).get("p95"),
+        },
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=DEFAULT_URL)
+    parser.add_argument("--csv", default=str(DATASET), help="CSV with question, student_answer, human_score, max_score")
+    parser.add_argument("--mode", choices=("concurrency", "rate"), default="concurrency")
+    parser.add_argument("--steps", default="1,2,4,8,16", help="comma-separated worker counts or target RPS values")
+    parser.add_argument("--step-seconds", type=float, default=30.0, help="duration of each step")
+    parser.add_argument("--cooldown", type=float, default=2.0, help="pause between steps, in seconds")
+    parser.add_argument("--warmup", type=int, default=5, help="requests sent (and discarded) before the first step")
+    parser.add_argument("--poisson", action="store_true", help="exponential inter-arrival times in rate mode")
+    parser.add_argument("--max-in-flight", type=int, default=512, help="rate mode: arrivals beyond this are dropped")
+    parser.add_argument("--timeout", type=float, default=120.0, help="per-request timeout, in seconds")
+    parser.add_argument("--bypass-llm-cache", action="store_true", help="force a fresh LLM judgment per request")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the JSON report to this path (default: stdout)")
+    args = parser.parse_args()
+
+    try:
+        steps = [float(s) for s in args.steps.split(",")]
+    except ValueError:
+        parser.error(f"invalid --steps '{args.steps}'")
+    if not steps or min(steps) <= 0:
+        parser.error("--steps must be positive")
+
+    report = asyncio.run(run(args, steps))
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text)
+        print(f"\nReport written to {args.output}")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
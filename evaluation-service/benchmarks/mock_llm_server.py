@@ -0,0 +1,172 @@
+"""
+Local OpenRouter-compatible mock LLM server for load and latency testing.
+
+Speaks the chat-completions protocol and answers Balanced Teacher prompts
+with schema-valid JSON (an array for packed prompts), so the whole service
+can be load-tested offline, repeatably and without spending tokens.
+
+Fault injection (each request draws independently):
+    --rate-429        fraction answered 429 Too Many Requests (+ Retry-After)
+    --rate-5xx        fraction answered 500 / 502 / 503
+    --rate-malformed  fraction answered 200 with truncated, unparseable JSON
+
+Latency (--latency), in milliseconds:
+    fixed:800             always 800 ms
+    uniform:300,1500      uniform between 300 and 1500 ms
+    normal:800,200        mean 800, stddev 200 (clipped at 0)
+    lognormal:700,0.5     median 700, sigma 0.5 — long tail, like real APIs
+
+Usage (from evaluation-service/):
+    python -m benchmarks.mock_llm_server --port 8090 --latency lognormal:700,0.5 --rate-429 0.02
+
+    # then point the service at it (any non-empty key works):
+    OPENROUTER_BASE_URL=http://127.0.0.1:8090/api/v1 OPENROUTER_API_KEY=mock \\
+        uvicorn app.main:app --port 8001
+
+GET /stats returns request / fault counters; POST /stats/reset clears them.
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+import uuid
+from collections import Counter
+from typing import Callable
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from benchmarks.stub_llm import judgment_for_prompt
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """
+    Returns a sampler of latencies in seconds for a --latency spec.
+    """
+    kind, _, raw = spec.partition(":")
+    params = [float(p) for p in raw.split(",")] if raw else []
+    try:
+        if kind == "fixed":
+            (ms,) = params
+            return lambda rng: ms / 1000
+        if kind == "uniform":
+            low, high = params
+            return lambda rng: rng.uniform(low, high) / 1000
+        if kind == "normal":
+            mean, stddev = params
+            return lambda rng: max(0.0, rng.gauss(mean, stddev)) / 1000
+        if kind == "lognormal":
+            median, sigma = params
+            mu = math.log(median)
+            return lambda rng: rng.lognormvariate(mu, sigma) / 1000
+    except ValueError:
+        pass
+    raise argparse.ArgumentTypeError(f"invalid latency spec '{spec}'")
+
+
+def create_app(
+    latency: Callable[[random.Random], float],
+    rate_429: float = 0.0,
+    rate_5xx: float = 0.0,
+    rate_malformed: float = 0.0,
+    retry_after: float = 1.0,
+    seed: int = 0,
+) -> FastAPI:
+    app = FastAPI(title="Mock OpenRouter")
+    rng = random.Random(seed)
+    stats: Counter = Counter()
+
+    async def chat_completions(request: Request):
+        body = await request.json()
+        stats["requests"] += 1
+
+        await asyncio.sleep(latency(rng))
+
+        roll = rng.random()
+        if roll < rate_429:
+            stats["429"] += 1
+            return JSONResponse(
+                {"error": {"code": 429, "message": "Rate limit exceeded (mock)"}},
+                status_code=429,
+                headers={"Retry-After": f"{retry_after:g}"},
+            )
+        roll -= rate_429
+        if roll < rate_5xx:
+            status = rng.choice((500, 502, 503))
+            stats[str(status)] += 1
+            return JSONResponse({"error": {"code": status, "message": "Upstream error (mock)"}}, status_code=status)
+        roll -= rate_5xx
+
+        prompt = "".join(m.get("content", "") for m in body.get("messages", []))
+        content = json.dumps(judgment_for_prompt(prompt))
+        if roll < rate_malformed:
+            stats["malformed"] += 1
+            content = content[: max(1, len(content) // 2)]  # truncated mid-object
+        else:
+            stats["ok"] += 1
+
+        # Rough token counts (~4 characters per token), enough for cost metrics
+        prompt_tokens     = max(1, len(prompt) // 4)
+        completion_tokens = max(1, len(content) // 4)
+        return {
+            "id": f"gen-mock-{uuid.uuid4().hex[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "mock"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens":     prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens":      prompt_tokens + completion_tokens,
+            },
+        }
+
+    # OpenRouter's path and the plain OpenAI-style one
+    app.post("/api/v1/chat/completions")(chat_completions)
+    app.post("/v1/chat/completions")(chat_completions)
+
+    @app.get("/stats")
+    def get_stats():
+        return dict(stats)
+
+    @app.post("/stats/reset")
+    def reset_stats():
+        stats.clear()
+        return {"status": "ok"}
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency", type=parse_latency, default=parse_latency("fixed:0"))
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument("--rate-5xx", type=float, default=0.0)
+    parser.add_argument("--rate-malformed", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds sent with 429s")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    import uvicorn
+
+    app = create_app(
+        args.latency,
+        rate_429=args.rate_429,
+        rate_5xx=args.rate_5xx,
+        rate_malformed=args.rate_malformed,
+        retry_after=args.retry_after,
+        seed=args.seed,
+    )
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
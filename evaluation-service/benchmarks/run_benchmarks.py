@@ -0,0 +1,239 @@
+"""
+In-process benchmark suite for the evaluation engines and the full pipeline.
+
+Benchmarks (each over the same mixed-length workload, see workloads.py):
+    validator            Validator.validate_adaptive
+    depth                DepthEstimator.estimate
+    similarity           SimilarityEngine.evaluate_with_band
+    nli                  NLIEngine.evaluate
+    pipeline             EvaluationService.evaluate_student_answer, one at a time
+    pipeline_concurrent  the same, --concurrency requests in flight
+
+The LLM is replaced by StubLLMClient (no network, optional fixed latency),
+so the numbers measure this service, not OpenRouter.
+
+Usage (from evaluation-service/):
+    python -m benchmarks.run_benchmarks                         # run, compare to baseline
+    python -m benchmarks.run_benchmarks --save-baseline         # record a new baseline
+    python -m benchmarks.run_benchmarks --only validator,depth --size 500
+
+Exits with status 1 when a benchmark regresses beyond --threshold against
+the baseline (p50 / p95 latency up, or throughput down), and with status 2
+when there is no baseline to compare against: baselines are machine-specific
+and none is committed, so a gate without one must fail rather than pass.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from app.schemas.evaluation_schemas import EvaluationRequest, RubricWeight
+from app.services.evaluation_service import EvaluationService
+from benchmarks.stats import percentile
+from benchmarks.stub_llm import StubLLMClient
+from benchmarks.workloads import LENGTH_MIX, Sample, build_workload
+
+BASELINE_DIR = Path(__file__).resolve().parent / "baselines"
+BENCHMARKS   = ("validator", "depth", "similarity", "nli", "pipeline", "pipeline_concurrent")
+WARMUP       = 5
+
+
+def summarise(latencies_ms: List[float], lengths: List[str], wall_seconds: float) -> dict:
+    ordered = sorted(latencies_ms)
+    result = {
+        "count":       len(ordered),
+        "mean_ms":     round(statistics.mean(ordered), 4),
+        "p50_ms":      round(percentile(ordered, 0.50), 4),
+        "p95_ms":      round(percentile(ordered, 0.95), 4),
+        "p99_ms":      round(percentile(ordered, 0.99), 4),
+        "ops_per_sec": round(len(ordered) / wall_seconds, 2) if wall_seconds > 0 else None,
+        "by_length":   {},
+    }
+    for length in LENGTH_MIX:
+        group = sorted(ms for ms, name in zip(latencies_ms, lengths) if name == length)
+        if group:
+            result["by_length"][length] = {
+                "count":  len(group),
+                "p50_ms": round(percentile(group, 0.50), 4),
+                "p95_ms": round(percentile(group, 0.95), 4),
+            }
+    return result
+
+
+def bench_sync(fn: Callable[[Sample], object], samples: List[Sample]) -> dict:
+    for sample in samples[:WARMUP]:
+        fn(sample)
+    latencies = []
+    started = time.perf_counter()
+    for sample in samples:
+        t0 = time.perf_counter()
+        fn(sample)
+        latencies.append((time.perf_counter() - t0) * 1000)
+    wall = time.perf_counter() - started
+    return summarise(latencies, [s.length for s in samples], wall)
+
+
+def to_request(sample: Sample) -> EvaluationRequest:
+    return EvaluationRequest(
+        question=sample.question,
+        student_answer=sample.student_answer,
+        reference_answer=sample.reference_answer,
+        total_marks=sample.total_marks,
+        rubric=RubricWeight(concept=0.6, completeness=0.2, clarity=0.2),
+    )
+
+
+async def bench_pipeline(service: EvaluationService, samples: List[Sample], concurrency: int) -> dict:
+    requests = [to_request(sample) for sample in samples]
+    for request in requests[:WARMUP]:
+        await service.evaluate_student_answer(request)
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = [0.0] * len(requests)
+
+    async def one(index: int, request: EvaluationRequest) -> None:
+        async with semaphore:
+            t0 = time.perf_counter()
+            await service.evaluate_student_answer(request)
+            latencies[index] = (time.perf_counter() - t0) * 1000
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i, r) for i, r in enumerate(requests)))
+    wall = time.perf_counter() - started
+    return summarise(latencies, [s.length for s in samples], wall)
+
+
+async def run_async_benchmarks(service: EvaluationService, samples: List[Sample],
+                               selected: List[str], concurrency: int) -> Dict[str, dict]:
+    results = {}
+    try:
+        if "pipeline" in selected:
+            results["pipeline"] = await bench_pipeline(service, samples, concurrency=1)
+        if "pipeline_concurrent" in selected:
+            results["pipeline_concurrent"] = await bench_pipeline(service, samples, concurrency=concurrency)
+            results["pipeline_concurrent"]["concurrency"] = concurrency
+    finally:
+        await service.aclose()
+    return results
+
+
+def compare(current: Dict[str, dict], baseline: Dict[str, dict],
+            threshold: float, min_delta_ms: float) -> List[str]:
+    """
+    Regressions of `current` against `baseline`, as readable lines.
+    A latency counts only if it is both `threshold` (relative) and
+    `min_delta_ms` (absolute) slower, so microsecond stages don't flap.
+    """
+    regressions = []
+    for name, result in current.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        for metric in ("p50_ms", "p95_ms"):
+            now, before = result[metric], base[metric]
+            if now > before * (1 + threshold) and now - before > min_delta_ms:
+                regressions.append(f"{name}.{metric}: {before} → {now} ms (+{(now / before - 1) * 100:.0f}%)")
+        now, before = result.get("ops_per_sec"), base.get("ops_per_sec")
+        if name == "pipeline_concurrent" and now and before and now < before * (1 - threshold):
+            regressions.append(f"{name}.ops_per_sec: {before} → {now} (-{(1 - now / before) * 100:.0f}%)")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", help=f"comma-separated subset of: {', '.join(BENCHMARKS)}")
+    parser.add_argument("--size", type=int, default=200, help="samples per benchmark")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--concurrency", type=int, default=16, help="in-flight requests for pipeline_concurrent")
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0, help="simulated LLM latency per call")
+    parser.add_argument("--baseline", default=str(BASELINE_DIR / "local.json"))
+    parser.add_argument("--save-baseline", action="store_true", help="write this run as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed relative regression (0.25 = 25%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=0.05, help="ignore latency changes smaller than this")
+    parser.add_argument("--output", help="also write this run's results to this path")
+    args = parser.parse_args()
+
+    selected = args.only.split(",") if args.only else list(BENCHMARKS)
+    unknown = set(selected) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(sorted(unknown))}")
+
+    samples = build_workload(args.size, seed=args.seed)
+    service = EvaluationService()
+    service.llm_judge.client = StubLLMClient(latency_ms=args.llm_latency_ms)
+
+    if {"similarity", "nli", "pipeline", "pipeline_concurrent"} & set(selected):
+        print("Loading models...")
+        service.similarity_engine.loader.ensure_loaded()
+        service.nli_engine.loader.ensure_loaded()
+
+    sync_benchmarks = {
+        "validator":  lambda s: service.validator.validate_adaptive(s.student_answer, s.total_marks),
+        "depth":      lambda s: service.depth_estimator.estimate(s.student_answer, s.total_marks),
+        "similarity": lambda s: service.similarity_engine.evaluate_with_band(s.student_answer, s.reference_answer),
+        "nli":        lambda s: service.nli_engine.evaluate(s.question, s.student_answer, s.reference_answer),
+    }
+
+    results: Dict[str, dict] = {}
+    for name, fn in sync_benchmarks.items():
+        if name in selected:
+            results[name] = bench_sync(fn, samples)
+    results.update(asyncio.run(run_async_benchmarks(service, samples, selected, args.concurrency)))
+
+    print(f"\n{'benchmark':<20} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'ops/s':>10}")
+    for name in BENCHMARKS:
+        if name in results:
+            r = results[name]
+            print(f"{name:<20} {r['p50_ms']:>10} {r['p95_ms']:>10} {r['p99_ms']:>10} {r['ops_per_sec']:>10}")
+
+    report = {
+        "meta": {
+            "created_at":     datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python":         platform.python_version(),
+            "machine":        platform.machine(),
+            "size":           args.size,
+            "seed":           args.seed,
+            "llm_latency_ms": args.llm_latency_ms,
+        },
+        "benchmarks": results,
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+
+    baseline_path = Path(args.baseline)
+    if args.save_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps(report, indent=2))
+        print(f"\nBaseline saved to {baseline_path}")
+        return 0
+
+    if not baseline_path.exists():
+        print(f"\n❌ No baseline at {baseline_path} — run with --save-baseline on this machine first.")
+        return 2
+
+    baseline = json.loads(baseline_path.read_text())
+    recorded = baseline["meta"]
+    if (recorded.get("size"), recorded.get("seed"), recorded.get("llm_latency_ms")) != (
+        args.size, args.seed, args.llm_latency_ms
+    ):
+        print("\n⚠️  Baseline was recorded with a different --size/--seed/--llm-latency-ms; comparison may be skewed.")
+
+    regressions = compare(results, baseline["benchmarks"], args.threshold, args.min_delta_ms)
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) beyond {args.threshold:.0%} vs {baseline_path}:")
+        for line in regressions:
+            print(f"   {line}")
+        return 1
+
+    print(f"\n✅ No regressions beyond {args.threshold:.0%} vs {baseline_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,10 @@
+"""
+Latency statistics shared by the benchmark and load-generation tools.
+"""
+from typing import List
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    # Nearest-rank percentile on an already sorted list
+    index = min(len(sorted_values) - 1, max(0, int(round(q * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
@@ -0,0 +1,64 @@
+"""
+Canned Balanced Teacher judgments for offline benchmarking.
+
+The scores are a deterministic function of the prompt, so repeated runs
+exercise the same downstream code paths (guardrails, scoring formula).
+"""
+import asyncio
+import hashlib
+import re
+from typing import Any, Dict, List, Optional
+
+_ANSWER_ID = re.compile(r"\[answer_id: (\S+)\]")
+
+
+def _score(seed: str) -> float:
+    digest = hashlib.sha256(seed.encode("utf-8")).digest()
+    return round(0.3 + 0.7 * digest[0] / 255, 2)
+
+
+def balanced_judgment(seed: str) -> Dict[str, Any]:
+    """
+    One schema-valid BALANCED_TEACHER_PROMPT response object.
+    """
+    return {
+        "concept":      _score("concept" + seed),
+        "completeness": _score("completeness" + seed),
+        "clarity":      _score("clarity" + seed),
+        "feedback":     "Covers the main idea; one supporting point is missing.",
+        "reasoning":    "Stubbed judgment for benchmarking.",
+    }
+
+
+def judgment_for_prompt(prompt: str) -> Any:
+    """
+    The response a well-behaved model would give to `prompt`: an object for
+    single-answer prompts, an array for packed (BALANCED_TEACHER_PACKED_PROMPT)
+    ones.
+    """
+    answer_ids = _ANSWER_ID.findall(prompt)
+    if not answer_ids:
+        return balanced_judgment(prompt)
+    judgments: List[Dict[str, Any]] = []
+    for answer_id in answer_ids:
+        judgments.append({"answer_id": answer_id, **balanced_judgment(prompt + answer_id)})
+    return judgments
+
+
+class StubLLMClient:
+    """
+    Drop-in replacement for LLMClient: same send_prompt() signature, no
+    network, no cache, optional fixed latency.
+    """
+
+    def __init__(self, model: str = "stub/balanced-teacher", latency_ms: float = 0.0):
+        self.model = model
+        self.latency_ms = latency_ms
+        self.calls = 0
+
+    async def send_prompt(self, prompt: str, retries: Optional[int] = None, use_cache: bool = True,
+                          max_tokens: int = 500, template: str = "unknown") -> Any:
+        self.calls += 1
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+        return judgment_for_prompt(prompt)
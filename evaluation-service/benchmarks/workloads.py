@@ -0,0 +1,72 @@
+"""
+Benchmark workloads built from phase1_final_dataset.csv.
+
+Real exam answers are not all one length: the mix below spans one-word
+answers up to multi-paragraph ones (which hit the models' truncation
+limits), so per-stage numbers reflect what the service actually sees.
+"""
+import csv
+import random
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+DATASET = Path(__file__).resolve().parents[1] / "phase1_final_dataset.csv"
+
+# name → (share of the workload, how many dataset answers are joined)
+LENGTH_MIX: Dict[str, Tuple[float, Tuple[int, int]]] = {
+    "short":  (0.25, (0, 0)),    # 1-3 words, e.g. "Islamabad"
+    "medium": (0.45, (1, 1)),    # one dataset answer, ~8-15 words
+    "long":   (0.20, (4, 8)),    # ~50-100 words
+    "essay":  (0.10, (15, 25)),  # ~200+ words, past the NLI token limit
+}
+
+
+@dataclass
+class Sample:
+    question: str
+    student_answer: str
+    reference_answer: str
+    total_marks: float
+    length: str
+
+
+def load_dataset(path: Path = DATASET) -> Dict[str, List[dict]]:
+    by_question: Dict[str, List[dict]] = {}
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            by_question.setdefault(row["question_id"], []).append(row)
+    return by_question
+
+
+def build_workload(size: int, seed: int = 0, path: Path = DATASET) -> List[Sample]:
+    """
+    `size` samples drawn with LENGTH_MIX proportions. Deterministic per seed,
+    so runs (and baselines) compare like with like.
+    """
+    rng = random.Random(seed)
+    by_question = load_dataset(path)
+    lengths = list(LENGTH_MIX)
+    weights = [LENGTH_MIX[name][0] for name in lengths]
+
+    samples = []
+    for _ in range(size):
+        rows = by_question[rng.choice(sorted(by_question))]
+        reference = max(rows, key=lambda r: float(r["human_score"]))["student_answer"]
+        length = rng.choices(lengths, weights)[0]
+        low, high = LENGTH_MIX[length][1]
+
+        if length == "short":
+            words = rng.choice(rows)["student_answer"].rstrip(".").split()
+            answer = " ".join(words[: rng.randint(1, 3)])
+        else:
+            answer = " ".join(rng.choice(rows)["student_answer"] for _ in range(rng.randint(low, high)))
+
+        samples.append(Sample(
+            question=rows[0]["question"],
+            student_answer=answer,
+            reference_answer=reference,
+            total_marks=float(rows[0]["max_score"]),
+            length=length,
+        ))
+    return samples
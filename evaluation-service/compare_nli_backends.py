@@ -0,0 +1,130 @@
+"""
+Parity and latency check for the NLIEngine inference backends.
+
+Scores (premise, hypothesis) pairs built from phase1_final_dataset.csv with
+the eager torch backend and the ONNX Runtime backend (fp32 and int8), then
+reports how far the ONNX scores drift from torch and whether any drift
+changes a decision the pipeline takes on the NLI score (kill-switch, zones,
+short-answer boost), plus per-call latency.
+
+Usage:
+    python compare_nli_backends.py [--dataset phase1_final_dataset.csv]
+                                   [--runs 3] [--tolerance 0.05] [--output report.json]
+
+Exits with status 1 if a backend exceeds the tolerance or flips a decision.
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+
+import pandas as pd
+
+from app.engines.nli_engine import NLIEngine
+
+# NLI thresholds used by EvaluationService (kill-switch, weak/entailment
+# zone boundary, short-answer boost).
+DECISION_THRESHOLDS = (0.1, 0.4, 0.7)
+
+
+def build_pairs(dataset: str):
+    """
+    Each question's best-scored answer is the premise, every answer in the
+    dataset a hypothesis — same-question pairs exercise entailment, the
+    cross-question ones contradiction / neutral.
+    """
+    df = pd.read_csv(dataset)
+    best = df.loc[df.groupby("question_id")["human_score"].idxmax()]
+    return [
+        (premise, hypothesis)
+        for premise in best["student_answer"]
+        for hypothesis in df["student_answer"]
+    ]
+
+
+def decisions(score: float):
+    return tuple(score >= t for t in DECISION_THRESHOLDS)
+
+
+def time_backend(engine: NLIEngine, pairs, runs: int) -> dict:
+    single = []
+    for _ in range(runs):
+        for pair in pairs:
+            started = time.perf_counter()
+            engine.evaluate_pairs([pair])
+            single.append((time.perf_counter() - started) * 1000)
+
+    batched = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        engine.evaluate_pairs(pairs)
+        batched.append((time.perf_counter() - started) * 1000)
+
+    single.sort()
+    return {
+        "single_p50_ms": round(statistics.median(single), 2),
+        "single_p95_ms": round(single[int(0.95 * (len(single) - 1))], 2),
+        "batch_ms":      round(statistics.median(batched), 2),
+        "batch_size":    len(pairs),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dataset", default="phase1_final_dataset.csv")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--tolerance", type=float, default=0.05,
+                        help="max allowed |onnx - torch| entailment difference")
+    parser.add_argument("--output", help="write the report as JSON to this path")
+    args = parser.parse_args()
+
+    pairs = build_pairs(args.dataset)
+    print(f"Scoring {len(pairs)} pairs from {args.dataset}")
+
+    backends = {
+        "torch":     NLIEngine(backend="torch"),
+        "onnx-fp32": NLIEngine(backend="onnx", quantize=False),
+        "onnx-int8": NLIEngine(backend="onnx", quantize=True),
+    }
+    for engine in backends.values():
+        engine.loader.ensure_loaded()
+
+    reference = backends["torch"].evaluate_pairs(pairs)
+    report = {"pairs": len(pairs), "tolerance": args.tolerance, "backends": {}}
+    failed = False
+
+    for name, engine in backends.items():
+        scores = reference if name == "torch" else engine.evaluate_pairs(pairs)
+        diffs  = [abs(a - b) for a, b in zip(scores, reference)]
+        flips  = sum(decisions(a) != decisions(b) for a, b in zip(scores, reference))
+
+        entry = {
+            "max_abs_diff":   round(max(diffs), 4),
+            "mean_abs_diff":  round(statistics.mean(diffs), 4),
+            "exact_match":    round(sum(d == 0 for d in diffs) / len(diffs), 4),
+            "decision_flips": flips,
+            "load_seconds":   engine.loader.load_seconds,
+            **time_backend(engine, pairs, args.runs),
+        }
+        report["backends"][name] = entry
+        if entry["max_abs_diff"] > args.tolerance or flips:
+            failed = True
+
+        print(
+            f"{name:<10} max|Δ|={entry['max_abs_diff']:.4f} mean|Δ|={entry['mean_abs_diff']:.4f} "
+            f"flips={flips:<3} single p50={entry['single_p50_ms']}ms p95={entry['single_p95_ms']}ms "
+            f"batch({len(pairs)})={entry['batch_ms']}ms"
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.output}")
+
+    print("❌ Parity check FAILED" if failed else "✅ Parity check passed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
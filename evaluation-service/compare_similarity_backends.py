@@ -0,0 +1,147 @@
+"""
+Parity report for the SimilarityEngine backends and embedding storage dtypes.
+
+Scores (student_answer, reference) pairs built from phase1_final_dataset.csv
+with every backend (torch, ONNX fp32, ONNX int8) × storage dtype (float32,
+float16, int8) and compares each against torch + float32:
+
+  • score drift (max / mean |Δ|) and band flips (Noise / Partial / Full),
+  • pairs within ±margin of NOISE_THRESHOLD / FULL_THRESHOLD (at risk),
+  • encode latency (single pair and whole batch),
+  • bytes per stored embedding and model size on disk.
+
+Usage:
+    python compare_similarity_backends.py [--dataset phase1_final_dataset.csv]
+                                          [--runs 3] [--output report.json]
+
+Exits with status 1 if any configuration flips a band.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+import pandas as pd
+
+from app.engines.onnx_backend import onnx_model_path
+from app.engines.similarity_engine import FULL_THRESHOLD, NOISE_THRESHOLD, SimilarityEngine
+
+CONFIGS = [
+    (backend, quantize, dtype)
+    for backend, quantize in (("torch", False), ("onnx", False), ("onnx", True))
+    for dtype in ("float32", "float16", "int8")
+]
+
+
+def build_pairs(dataset: str):
+    """
+    References are each question's text (the run_phase1 baseline) and its
+    best-scored answer; every answer in the dataset is scored against every
+    reference, so all three bands are represented.
+    """
+    df = pd.read_csv(dataset)
+    best = df.loc[df.groupby("question_id")["human_score"].idxmax()]
+    references = list(dict.fromkeys(list(df["question"]) + list(best["student_answer"])))
+    return [(student, reference) for reference in references for student in df["student_answer"]]
+
+
+def config_name(backend: str, quantize: bool, dtype: str) -> str:
+    model = "torch" if backend == "torch" else ("onnx-int8" if quantize else "onnx-fp32")
+    return f"{model}/{dtype}"
+
+
+def model_size_mb(engine: SimilarityEngine):
+    if engine.backend != "onnx":
+        return None
+    path = onnx_model_path(engine.MODEL_NAME, engine.quantize)
+    return round(os.path.getsize(path) / (1024 * 1024), 2) if path.exists() else None
+
+
+def time_engine(engine: SimilarityEngine, pairs, runs: int) -> dict:
+    single = []
+    for _ in range(runs):
+        engine.reference_cache.clear()
+        for pair in pairs:
+            started = time.perf_counter()
+            engine.evaluate_pairs([pair])
+            single.append((time.perf_counter() - started) * 1000)
+
+    batched = []
+    for _ in range(runs):
+        engine.reference_cache.clear()
+        started = time.perf_counter()
+        engine.evaluate_pairs(pairs)
+        batched.append((time.perf_counter() - started) * 1000)
+
+    single.sort()
+    return {
+        "single_p50_ms": round(statistics.median(single), 2),
+        "single_p95_ms": round(single[int(0.95 * (len(single) - 1))], 2),
+        "batch_ms":      round(statistics.median(batched), 2),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dataset", default="phase1_final_dataset.csv")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--margin", type=float, default=0.01,
+                        help="distance to a band threshold counted as at-risk")
+    parser.add_argument("--output", help="write the report as JSON to this path")
+    args = parser.parse_args()
+
+    pairs = build_pairs(args.dataset)
+    print(f"Scoring {len(pairs)} pairs from {args.dataset}")
+
+    report = {"pairs": len(pairs), "configs": {}}
+    baseline = None
+    failed = False
+
+    for backend, quantize, dtype in CONFIGS:
+        name   = config_name(backend, quantize, dtype)
+        engine = SimilarityEngine(backend=backend, quantize=quantize, storage_dtype=dtype)
+        engine.loader.ensure_loaded()
+
+        results = engine.evaluate_pairs(pairs)
+        if baseline is None:
+            baseline = results
+
+        diffs = [abs(score - base) for (score, _), (base, _) in zip(results, baseline)]
+        flips = sum(band != base for (_, band), (_, base) in zip(results, baseline))
+        at_risk = sum(
+            min(abs(base - NOISE_THRESHOLD), abs(base - FULL_THRESHOLD)) <= args.margin
+            for base, _ in baseline
+        )
+
+        entry = {
+            "max_abs_diff":         round(max(diffs), 4),
+            "mean_abs_diff":        round(statistics.mean(diffs), 4),
+            "band_flips":           flips,
+            "pairs_near_threshold": at_risk,
+            "bytes_per_embedding":  int(engine.to_storage(engine._encode(["x"])[0]).nbytes),
+            "model_size_mb":        model_size_mb(engine),
+            "load_seconds":         engine.loader.load_seconds,
+            **time_engine(engine, pairs, args.runs),
+        }
+        report["configs"][name] = entry
+        failed = failed or flips > 0
+
+        print(
+            f"{name:<18} max|Δ|={entry['max_abs_diff']:.4f} mean|Δ|={entry['mean_abs_diff']:.4f} "
+            f"flips={flips:<3} {entry['bytes_per_embedding']:>5} B/emb "
+            f"single p50={entry['single_p50_ms']}ms batch={entry['batch_ms']}ms"
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.output}")
+
+    print("❌ Band parity FAILED" if failed else "✅ Band parity passed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
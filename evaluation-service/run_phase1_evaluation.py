@@ -1,46 +1,223 @@
+"""
+Grades a dataset CSV through a running evaluation service.
+
+The input is streamed in chunks and each chunk is graded with bounded
+async concurrency. Every graded row is appended to the output CSV and its
+row id to a checkpoint file as soon as it completes, so an interrupted run
+picks up where it stopped. Failed rows are not checkpointed; run again to
+retry them. MAE against the human scores is reported at the end.
+
+Input columns: question_id, question, student_answer, human_score,
+max_score (plus an optional reference_answer).
+
+Usage:
+    python run_phase1_evaluation.py
+    python run_phase1_evaluation.py --input big.csv --output big_scored.csv --concurrency 16
+    python run_phase1_evaluation.py --restart      # delete the output and checkpoint, grade everything again
+"""
+import argparse
+import asyncio
+import csv
+import os
+import random
+from pathlib import Path
+from typing import List, Optional, Set
+
+import httpx
 import pandas as pd
-import requests
-import time
 
-API_URL = "http://127.0.0.1:8000/evaluate/"
+API_URL = "http://127.0.0.1:8001/evaluate/"
+
+# Statuses worth retrying: rate limiting and transient server errors
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+def load_checkpoint(path: Path) -> Set[int]:
+    if not path.exists():
+        return set()
+    with open(path, encoding="utf-8") as f:
+        return {int(line) for line in f if line.strip()}
 
-# Load dataset
-df = pd.read_csv("phase1_final_dataset.csv")
 
-system_scores = []
+def seed_checkpoint(output: Path, checkpoint: Path) -> int:
+    """
+    Rebuilds a missing checkpoint from the row ids already graded in
+    `output`, so a lost checkpoint never costs a re-grade. Returns how many
+    ids were recovered; raises ValueError if `output` was not written by
+    this script.
+    """
+    try:
+        graded = pd.read_csv(output, usecols=["row_id", "system_score", "grade"])
+    except (ValueError, pd.errors.ParserError) as e:
+        raise ValueError(f"{output} is not a graded output of this script ({e})") from e
+    # A crash can leave a torn last line; only complete rows count
+    row_ids = graded.dropna()["row_id"].astype(int).unique()
+    with open(checkpoint, "w", encoding="utf-8") as f:
+        f.writelines(f"{row_id}\n" for row_id in row_ids)
+    return len(row_ids)
 
-for idx, row in df.iterrows():
+
+def build_payload(row: pd.Series) -> dict:
     payload = {
-        "evaluations": [
-            {
-                "student_id": f"S{idx}",
-                "question_id": row["question_id"],
-                "question_type": "descriptive",
-                "question": row["question"],
-                "student_answer": row["student_answer"],
-                "model_answer": row["question"],  # simple baseline
-                "rubric": {
-                    "content": int(row["max_score"])
-                },
-                "max_score": int(row["max_score"])
-            }
-        ]
+        "question":       row["question"],
+        "student_answer": row["student_answer"],
+        "total_marks":    float(row["max_score"]),
+        "rubric":         {"concept": 0.6, "completeness": 0.2, "clarity": 0.2},
     }
+    reference = row.get("reference_answer")
+    if isinstance(reference, str) and reference.strip():
+        payload["reference_answer"] = reference
+    return payload
+
+
+async def grade_row(http: httpx.AsyncClient, url: str, row_id: int, row: pd.Series,
+                    retries: int) -> Optional[dict]:
+    """
+    Returns the service's EvaluationResponse for one row, or None when it
+    still fails after `retries` retries.
+    """
+    payload = build_payload(row)
+    for attempt in range(retries + 1):
+        try:
+            response = await http.post(url, json=payload)
+            if response.status_code == 200:
+                return response.json()
+            error = f"HTTP {response.status_code}: {response.text[:200]}"
+            if response.status_code not in RETRYABLE_STATUS:
+                break
+        except httpx.HTTPError as e:
+            error = f"{type(e).__name__}: {e}"
+        if attempt < retries:
+            await asyncio.sleep(min(30.0, 2 ** attempt) * random.uniform(0.5, 1.5))
+    print(f"❌ Error at row {row_id}: {error}")
+    return None
+
+
+class ResultWriter:
+    """
+    Appends graded rows to the output CSV and their ids to the checkpoint,
+    flushing each, so a crash loses at most the rows in flight.
+    """
+
+    def __init__(self, output: Path, checkpoint: Path, columns: List[str]):
+        self.columns = ["row_id", *columns, "system_score", "grade"]
+        new_file = not output.exists() or output.stat().st_size == 0
+        self._output = open(output, "a", newline="", encoding="utf-8")
+        self._writer = csv.writer(self._output)
+        if new_file:
+            self._writer.writerow(self.columns)
+        self._checkpoint = open(checkpoint, "a", encoding="utf-8")
+
+    def write(self, row_id: int, row: pd.Series, result: dict) -> None:
+        self._writer.writerow([row_id, *row.tolist(), result["final_score"], result["grade"]])
+        self._output.flush()
+        self._checkpoint.write(f"{row_id}\n")
+        self._checkpoint.flush()
+
+    def close(self) -> None:
+        for f in (self._output, self._checkpoint):
+            os.fsync(f.fileno())
+            f.close()
+
+
+async def grade_chunk(http: httpx.AsyncClient, url: str, chunk: pd.DataFrame, writer: ResultWriter,
+                      semaphore: asyncio.Semaphore, retries: int) -> int:
+    async def one(row_id: int, row: pd.Series) -> bool:
+        async with semaphore:
+            result = await grade_row(http, url, row_id, row, retries)
+        if result is None:
+            return False
+        writer.write(row_id, row, result)
+        return True
+
+    outcomes = await asyncio.gather(*(one(row_id, row) for row_id, row in chunk.iterrows()))
+    return sum(outcomes)
+
+
+async def run(args: argparse.Namespace, checkpoint: Path) -> None:
+    done = load_checkpoint(checkpoint)
+    if done:
+        print(f"↻ Resuming: {len(done)} row(s) already graded")
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    writer = None
+    graded = failed = 0
+
+    async with httpx.AsyncClient(timeout=args.timeout, limits=limits) as http:
+        try:
+            # Row ids are 0-based data-row positions, stable across runs
+            for chunk in pd.read_csv(args.input, chunksize=args.chunk_size):
+                if writer is None:
+                    writer = ResultWriter(Path(args.output), checkpoint, list(chunk.columns))
+                pending = chunk[~chunk.index.isin(done)]
+                if pending.empty:
+                    continue
+                ok = await grade_chunk(http, args.url, pending, writer, semaphore, args.retries)
+                graded += ok
+                failed += len(pending) - ok
+                print(f"… rows {chunk.index[0]}–{chunk.index[-1]}: {ok}/{len(pending)} graded "
+                      f"({len(done) + graded} total)")
+        finally:
+            if writer is not None:
+                writer.close()
+
+    print(f"✅ Graded {graded} row(s) this run" + (f", {failed} failed — run again to retry" if failed else ""))
+
+
+def finalize(output: Path) -> None:
+    """
+    Orders the incrementally written output by row id (dropping rows graded
+    twice across a crash) and reports calculate_mae.py's metrics.
+    """
+    df = pd.read_csv(output)
+    df = df.drop_duplicates("row_id", keep="last").sort_values("row_id")
+    df.to_csv(output, index=False)
+
+    df["absolute_error"] = abs(df["human_score"] - df["system_score"])
+    mae = df["absolute_error"].mean()
+    normalised = (df["absolute_error"] / df["max_score"]).mean()
+
+    print(f"📄 Output file: {output} ({len(df)} rows)")
+    print("📊 Mean Absolute Error (MAE):", round(mae, 3))
+    print("📊 MAE as a fraction of max score:", round(normalised, 3))
+    if "question_id" in df.columns:
+        per_question = df.groupby("question_id")["absolute_error"].mean().round(3)
+        print("📊 MAE per question:")
+        for question_id, value in per_question.items():
+            print(f"   {question_id}: {value}")
 
-    response = requests.post(API_URL, json=payload)
 
-    if response.status_code != 200:
-        print(f"❌ Error at row {idx}: {response.text}")
-        system_scores.append(None)
-        continue
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--input", default="phase1_final_dataset.csv")
+    parser.add_argument("--output", default="phase1_with_system_scores.csv")
+    parser.add_argument("--checkpoint", help="completed row ids (default: <output>.checkpoint)")
+    parser.add_argument("--url", default=API_URL)
+    parser.add_argument("--concurrency", type=int, default=8, help="requests in flight")
+    parser.add_argument("--chunk-size", type=int, default=500, help="CSV rows read at a time")
+    parser.add_argument("--retries", type=int, default=3, help="retries per row on 429/5xx/network errors")
+    parser.add_argument("--timeout", type=float, default=120.0, help="per-request timeout, in seconds")
+    parser.add_argument("--restart", action="store_true", help="delete previous output and checkpoint")
+    args = parser.parse_args()
 
-    result = response.json()["results"][0]
-    system_scores.append(result["obtained_marks"])
+    output = Path(args.output)
+    checkpoint = Path(args.checkpoint or f"{args.output}.checkpoint")
+    if args.restart:
+        for path in (output, checkpoint):
+            path.unlink(missing_ok=True)
+    elif not checkpoint.exists() and output.exists() and output.stat().st_size > 0:
+        # Never delete graded rows without --restart: resume from the output itself
+        try:
+            recovered = seed_checkpoint(output, checkpoint)
+        except ValueError as e:
+            parser.error(f"{e}. Pass --restart to overwrite it, or choose another --output.")
+        print(f"↻ No checkpoint found: {recovered} graded row(s) recovered from {output}")
 
-    time.sleep(1)  # rate limit safety
+    asyncio.run(run(args, checkpoint))
+    if output.exists():
+        finalize(output)
 
-df["system_score"] = system_scores
-df.to_csv("phase1_with_system_scores.csv", index=False)
 
-print("✅ Phase-1 evaluation completed.")
-print("📄 Output file created: phase1_with_system_scores.csv")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# Tests import the service as `app.…` from evaluation-service/, however pytest is started
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+
+class FakeClock:
+    """
+    Stand-in for the `time` module of the code under test: time() and
+    monotonic() return `now`, which the test moves forward by hand.
+    """
+
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def perf_counter(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+# Signals the fake engines report for an answer without an entry in `signals`
+DEFAULT_SIGNALS = (0.6, "Partial", 0.6)  # similarity, band, NLI entailment
+
+
+@pytest.fixture
+def signals() -> dict:
+    """
+    student_answer → (similarity, band, nli) reported by the `service`
+    fixture's fake engines; an exception in place of the tuple is raised.
+    """
+    return {}
+
+
+@pytest.fixture
+def service(signals, monkeypatch):
+    """
+    EvaluationService with the similarity / NLI engines replaced by
+    lookups in `signals` and the LLM by benchmarks.stub_llm.StubLLMClient,
+    so the pipeline runs without models or network.
+    """
+    from app.services.evaluation_service import EvaluationService
+    from benchmarks.stub_llm import StubLLMClient
+
+    def lookup(student_answer):
+        found = signals.get(student_answer, DEFAULT_SIGNALS)
+        if isinstance(found, Exception):
+            raise found
+        return found
+
+    async def similarity(student_answer, reference_answer):
+        score, band, _ = lookup(student_answer)
+        return score, band
+
+    async def nli(question, student_answer, reference_answer):
+        return lookup(student_answer)[2]
+
+    service = EvaluationService()
+    service.llm_judge.client = StubLLMClient()
+    monkeypatch.setattr(service.similarity_engine, "evaluate_with_band_async", similarity)
+    monkeypatch.setattr(service.nli_engine, "evaluate_async", nli)
+    return service
+
+
+@pytest.fixture
+def api(service, monkeypatch):
+    """
+    TestClient for the /evaluate routes, served by the `service` fixture.
+    The routes are mounted on a bare app, skipping main's model-loading lifespan.
+    """
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from app.api import evaluation_routes
+
+    monkeypatch.setattr(evaluation_routes, "evaluation_service", service)
+    app = FastAPI()
+    app.include_router(evaluation_routes.router, prefix="/evaluate")
+    with TestClient(app) as client:
+        yield client
@@ -0,0 +1,82 @@
+import asyncio
+
+from app.api import evaluation_routes
+from app.schemas.evaluation_schemas import BatchEvaluationItem
+
+QUESTION  = "What is the capital of Pakistan?"
+REFERENCE = "Islamabad is the capital of Pakistan."
+
+
+def _item(item_id, student_answer, **overrides):
+    fields = {
+        "item_id":          item_id,
+        "question":         QUESTION,
+        "reference_answer": REFERENCE,
+        "student_answer":   student_answer,
+        "rubric":           {"concept": 0.6, "completeness": 0.2, "clarity": 0.2},
+        "total_marks":      5,
+    }
+    fields.update(overrides)
+    return BatchEvaluationItem(**fields)
+
+
+def test_results_keep_the_input_order(service, signals):
+    # The short-circuited item finishes first, the LLM-graded ones after it
+    signals["Lahore"] = (0.1, "Noise", 0.5)
+    items = [
+        _item("a", "Islamabad is the capital city"),
+        _item("b", "Lahore"),
+        _item("c", "The capital is Islamabad"),
+    ]
+
+    results = asyncio.run(service.evaluate_batch(items))
+
+    assert [result.item_id for result in results] == ["a", "b", "c"]
+    assert [result.result.decision_path for result in results] == ["llm", "noise_short_answer", "llm"]
+
+
+def test_a_failing_item_does_not_fail_the_rest(service, signals):
+    signals["The engine breaks on this one"] = RuntimeError("similarity engine down")
+    items = [
+        _item("ok-1", "Islamabad is the capital city"),
+        _item("broken", "The engine breaks on this one"),
+        _item("unknown", "Islamabad", question=None, question_id="unregistered-question"),
+        _item("ok-2", "The capital is Islamabad"),
+    ]
+
+    results = asyncio.run(service.evaluate_batch(items))
+
+    assert [result.status for result in results] == ["ok", "error", "error", "ok"]
+    assert "similarity engine down" in results[1].error
+    assert "unregistered-question" in results[2].error
+    assert results[0].result is not None and results[3].result is not None
+
+
+def test_an_empty_batch_grades_nothing(service):
+    assert asyncio.run(service.evaluate_batch([])) == []
+    assert service.llm_judge.client.calls == 0
+
+
+def test_batch_route_reports_counts_in_order(api, signals):
+    signals["The engine breaks on this one"] = RuntimeError("similarity engine down")
+    items = [_item("a", "Islamabad is the capital city"), _item("b", "The engine breaks on this one")]
+
+    response = api.post("/evaluate/batch", json={"evaluations": [item.model_dump() for item in items]})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [result["item_id"] for result in body["results"]] == ["a", "b"]
+    assert (body["succeeded"], body["failed"]) == (1, 1)
+
+
+def test_batches_over_the_size_cap_are_rejected_before_grading(api, service, monkeypatch):
+    monkeypatch.setattr(evaluation_routes, "MAX_BATCH_SIZE", 2)
+    items = [_item(str(n), "Islamabad is the capital city").model_dump() for n in range(3)]
+
+    for path in ("/evaluate/batch", "/evaluate/batch/stream"):
+        response = api.post(path, json={"evaluations": items})
+        assert response.status_code == 413
+        assert "max 2" in response.json()["detail"]
+
+    assert api.post("/evaluate/batch", json={"evaluations": items[:2]}).status_code == 200
+    assert service.llm_judge.client.calls == 1  # only the accepted batch, packed into one request
@@ -0,0 +1,155 @@
+import asyncio
+import json
+
+import pytest
+
+from app.schemas.evaluation_schemas import BatchEvaluationItem
+
+QUESTIONS = {
+    "capital": ("What is the capital of Pakistan?", "Islamabad is the capital of Pakistan."),
+    "river":   ("Which is the longest river of Pakistan?", "The Indus is the longest river of Pakistan."),
+}
+
+
+def _item(item_id, student_answer, question="capital", **overrides):
+    text, reference = QUESTIONS[question]
+    fields = {
+        "item_id":          item_id,
+        "question":         text,
+        "reference_answer": reference,
+        "student_answer":   student_answer,
+        "rubric":           {"concept": 0.6, "completeness": 0.2, "clarity": 0.2},
+        "total_marks":      5,
+    }
+    fields.update(overrides)
+    return BatchEvaluationItem(**fields)
+
+
+def _stream(service, items):
+    async def collect():
+        return [entry async for entry in service.evaluate_batch_stream(items)]
+
+    return asyncio.run(collect())
+
+
+def _body(items):
+    return {"evaluations": [item.model_dump() for item in items]}
+
+
+def _sse_events(text):
+    events = []
+    for block in text.split("\n\n"):
+        if not block:
+            continue
+        event, data = block.split("\n")
+        assert event.startswith("event: ") and data.startswith("data: ")
+        events.append((event[len("event: "):], json.loads(data[len("data: "):])))
+    return events
+
+
+# ── Service: grouping, completion order, errors ──────────────────────────────
+def test_answers_are_packed_per_question_and_pack_size(service, monkeypatch):
+    monkeypatch.setattr(service, "LLM_PACK_SIZE", 2)
+    items = [_item(f"c{n}", f"Islamabad is the answer {n}") for n in range(3)]
+    items += [_item(f"r{n}", f"The Indus river {n}", question="river") for n in range(2)]
+
+    results = _stream(service, items)
+
+    # capital: 3 answers → 2 requests of ≤2; river: 2 answers → 1 request
+    assert service.llm_judge.client.calls == 3
+    assert sorted(index for index, _ in results) == list(range(5))
+    assert all(result.status == "ok" and result.result.decision_path == "llm" for _, result in results)
+
+
+def test_answers_with_different_marks_are_not_packed_together(service):
+    items = [_item("five", "Islamabad is the capital"), _item("ten", "Islamabad is the capital", total_marks=10)]
+
+    _stream(service, items)
+
+    assert service.llm_judge.client.calls == 2
+
+
+def test_without_packing_every_answer_gets_its_own_request(service, monkeypatch):
+    monkeypatch.setattr(service, "LLM_PACKING_ENABLED", False)
+    items = [_item(f"c{n}", f"Islamabad is the answer {n}") for n in range(3)]
+
+    _stream(service, items)
+
+    assert service.llm_judge.client.calls == 3
+
+
+def test_results_are_yielded_as_they_finish(service, signals):
+    service.llm_judge.client.latency_ms = 20
+    signals["Lahore"] = (0.1, "Noise", 0.5)
+    signals["The engine breaks on this one"] = RuntimeError("similarity engine down")
+    items = [
+        _item("llm", "Islamabad is the capital city"),
+        _item("short", "Lahore"),
+        _item("broken", "The engine breaks on this one"),
+    ]
+
+    results = _stream(service, items)
+
+    # Layer 1-2 outcomes (short-circuit, failure) come out before the LLM-graded answer
+    assert [index for index, _ in results][-1] == 0
+    by_id = {result.item_id: result for _, result in results}
+    assert by_id["short"].result.decision_path == "noise_short_answer"
+    assert by_id["broken"].status == "error" and "similarity engine down" in by_id["broken"].error
+    assert by_id["llm"].status == "ok"
+
+
+# ── Route: NDJSON / SSE framing ──────────────────────────────────────────────
+def test_stream_route_sends_ndjson_lines_then_a_summary(api, signals):
+    signals["The engine breaks on this one"] = RuntimeError("similarity engine down")
+    items = [_item("a", "Islamabad is the capital city"), _item("b", "The engine breaks on this one")]
+
+    response = api.post("/evaluate/batch/stream", json=_body(items))
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted((line["index"], line["item_id"], line["status"]) for line in lines[:-1]) == [
+        (0, "a", "ok"),
+        (1, "b", "error"),
+    ]
+    assert lines[-1] == {"done": True, "succeeded": 1, "failed": 1, "error": None}
+
+
+@pytest.mark.parametrize("request_options", [
+    {"params": {"format": "sse"}},
+    {"headers": {"Accept": "text/event-stream"}},
+])
+def test_stream_route_sends_server_sent_events(api, request_options):
+    items = [_item("a", "Islamabad is the capital city"), _item("b", "The capital is Islamabad")]
+
+    response = api.post("/evaluate/batch/stream", json=_body(items), **request_options)
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = _sse_events(response.text)
+    assert [event for event, _ in events] == ["result", "result", "done"]
+    assert sorted(data["item_id"] for _, data in events[:-1]) == ["a", "b"]
+    assert events[-1][1]["succeeded"] == 2
+
+
+def test_stream_route_rejects_an_unknown_format(api):
+    response = api.post("/evaluate/batch/stream", params={"format": "xml"}, json=_body([_item("a", "Islamabad")]))
+
+    assert response.status_code == 400
+
+
+def test_stream_route_reports_a_failed_batch_in_band(api, service, monkeypatch):
+    grade = service.evaluate_batch_stream
+
+    async def broken(items):
+        async for entry in grade(items[:1]):
+            yield entry
+        raise RuntimeError("grading machinery failed")
+
+    monkeypatch.setattr(service, "evaluate_batch_stream", broken)
+    items = [_item("a", "Islamabad is the capital city"), _item("b", "The capital is Islamabad")]
+
+    events = _sse_events(api.post("/evaluate/batch/stream", params={"format": "sse"}, json=_body(items)).text)
+
+    assert [event for event, _ in events] == ["result", "error"]
+    assert events[-1][1]["succeeded"] == 1
+    assert "grading machinery failed" in events[-1][1]["error"]
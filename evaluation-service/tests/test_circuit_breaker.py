@@ -0,0 +1,114 @@
+import pytest
+
+from app.engines.llm import resilience
+from app.engines.llm.resilience import CircuitBreaker
+
+
+@pytest.fixture
+def breaker(clock, monkeypatch):
+    monkeypatch.setattr(resilience, "time", clock)
+    return CircuitBreaker(enabled=True, window=4, min_calls=4, failure_ratio=0.5, cooldown=30)
+
+
+def _trip(breaker):
+    for failed in (True, False, True, False):
+        breaker.record(breaker.allow(), failed)
+
+
+def test_stays_closed_until_enough_calls_have_failed(breaker):
+    for _ in range(3):
+        breaker.record(breaker.allow(), True)
+    assert breaker.state == CircuitBreaker.CLOSED  # below min_calls
+
+    breaker.record(breaker.allow(), False)
+    assert breaker.state == CircuitBreaker.OPEN  # 3/4 failed
+
+
+def test_ignores_outcomes_without_a_verdict(breaker):
+    for _ in range(10):
+        breaker.record(breaker.allow(), None)
+    breaker.record(breaker.allow(), True)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_open_rejects_until_the_cooldown_then_lets_one_probe_through(breaker, clock):
+    _trip(breaker)
+    assert breaker.allow() is None
+
+    clock.advance(30)
+    probe = breaker.allow()
+    assert probe is not None and probe.probe
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow() is None  # one probe at a time
+
+
+def test_a_successful_probe_closes_and_forgets_old_failures(breaker, clock):
+    _trip(breaker)
+    clock.advance(30)
+
+    breaker.record(breaker.allow(), False)
+
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record(breaker.allow(), True)
+    assert breaker.state == CircuitBreaker.CLOSED and breaker.allow() is not None
+
+
+def test_a_failed_probe_reopens_for_another_cooldown(breaker, clock):
+    _trip(breaker)
+    clock.advance(30)
+
+    breaker.record(breaker.allow(), True)
+
+    assert breaker.state == CircuitBreaker.OPEN
+    clock.advance(29)
+    assert breaker.allow() is None
+    clock.advance(1)
+    assert breaker.allow() is not None
+
+
+def test_a_late_completion_from_before_the_trip_does_not_end_half_open(breaker, clock):
+    late = breaker.allow()  # admitted while closed, still in flight
+    _trip(breaker)
+    clock.advance(30)
+    probe = breaker.allow()
+
+    breaker.record(late, False)
+
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow() is None  # the probe is still the one in flight
+    breaker.record(probe, True)
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_a_late_cancelled_attempt_does_not_free_the_probe(breaker, clock):
+    late = breaker.allow()
+    _trip(breaker)
+    clock.advance(30)
+    probe = breaker.allow()
+
+    breaker.record(late, None)
+    assert breaker.allow() is None
+
+    # The probe's own cancellation lets the next call probe instead
+    breaker.record(probe, None)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow().probe
+
+
+def test_stale_failures_do_not_count_towards_the_next_trip(breaker, clock):
+    late = [breaker.allow() for _ in range(4)]
+    _trip(breaker)
+    clock.advance(30)
+    breaker.record(breaker.allow(), False)  # probe closes the circuit
+
+    for ticket in late:
+        breaker.record(ticket, True)
+
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_disabled_breaker_always_allows():
+    breaker = CircuitBreaker(enabled=False, window=2, min_calls=1, failure_ratio=0.1, cooldown=30)
+    for _ in range(5):
+        breaker.record(breaker.allow(), True)
+    assert breaker.allow() is not None and breaker.state == CircuitBreaker.CLOSED
@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+
+from app.engines.embedding_cache import EmbeddingCache
+from app.engines.similarity_engine import SimilarityEngine
+
+
+def _vector(value, size=4, dtype=np.float32):
+    return np.full(size, value, dtype=dtype)
+
+
+def test_least_recently_used_entry_is_evicted_first():
+    cache = EmbeddingCache("test", max_entries=2)
+    cache.put("a", _vector(1))
+    cache.put("b", _vector(2))
+    cache.get("a")  # "b" is now the least recently used
+
+    cache.put("c", _vector(3))
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.stats()["entries"] == 2
+
+
+def test_byte_cap_evicts_until_the_cache_fits():
+    cache = EmbeddingCache("test", max_entries=100, max_bytes=40)  # two 16-byte vectors fit
+    for text in ("a", "b", "c"):
+        cache.put(text, _vector(1))
+
+    assert cache.missing(["a", "b", "c"]) == ["a"]
+    assert cache.stats()["bytes"] == 32
+
+
+def test_a_vector_larger_than_the_byte_cap_is_not_cached():
+    cache = EmbeddingCache("test", max_bytes=40)
+    cache.put("small", _vector(1))
+
+    cache.put("huge", _vector(1, size=64))
+
+    assert cache.get("huge") is None
+    assert cache.get("small") is not None  # nothing was evicted to make room
+
+
+def test_replacing_an_entry_keeps_the_byte_count_exact():
+    cache = EmbeddingCache("test")
+    cache.put("a", _vector(1, size=8))
+    cache.put("a", _vector(1, size=2))
+
+    assert cache.stats()["bytes"] == 8
+    cache.clear()
+    assert cache.stats()["bytes"] == 0 and cache.stats()["entries"] == 0
+
+
+def test_hits_and_misses_are_counted_but_missing_does_not_count():
+    cache = EmbeddingCache("test")
+    cache.put("a", _vector(1))
+
+    cache.get("a")
+    cache.get("b")
+    cache.missing(["a", "b"])
+
+    assert (cache.stats()["hits"], cache.stats()["misses"]) == (1, 1)
+
+
+@pytest.mark.parametrize("storage_dtype, bytes_per_value", [("float32", 4), ("float16", 2), ("int8", 1)])
+def test_bytes_follow_the_storage_dtype(storage_dtype, bytes_per_value):
+    engine = SimilarityEngine(storage_dtype=storage_dtype)
+    embedding = np.linspace(-1, 1, 384, dtype=np.float32)
+    stored = engine.to_storage(embedding)
+
+    engine.reference_cache.put("reference", stored)
+
+    assert stored.dtype == np.dtype(storage_dtype)
+    assert engine.reference_cache.stats()["bytes"] == 384 * bytes_per_value
+
+
+def test_int8_storage_scales_to_the_full_range_and_keeps_zero_vectors():
+    engine = SimilarityEngine(storage_dtype="int8")
+
+    stored = engine.to_storage(np.array([0.5, -0.25, 0.0], dtype=np.float32))
+
+    assert stored.tolist() == [127, -64, 0]
+    assert engine.to_storage(np.zeros(3, dtype=np.float32)).tolist() == [0, 0, 0]
+
+
+def test_stored_vectors_never_alias_the_encoded_batch():
+    engine = SimilarityEngine(storage_dtype="float32")
+    batch = np.ones((2, 4), dtype=np.float32)
+
+    stored = engine.to_storage(batch[0])
+    batch[0] = 0
+
+    assert stored.tolist() == [1, 1, 1, 1]
@@ -0,0 +1,80 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.engines.llm import client as client_module
+from app.engines.llm.client import LLMClient
+from app.engines.llm.rate_limiter import AdaptiveRateLimiter
+from app.engines.llm.resilience import CircuitBreaker
+
+HEDGE_DELAY = 0.05
+
+
+class FakeHTTP:
+    """
+    httpx.AsyncClient stand-in: the n-th POST takes latencies[n] seconds.
+    """
+
+    def __init__(self, *latencies):
+        self.latencies = list(latencies)
+        self.posts = 0
+
+    async def post(self, url, headers=None, json=None):
+        latency = self.latencies[min(self.posts, len(self.latencies) - 1)]
+        self.posts += 1
+        await asyncio.sleep(latency)
+        return httpx.Response(200, json={"post": self.posts})
+
+
+@pytest.fixture
+def limiter(monkeypatch):
+    limiter = AdaptiveRateLimiter(rate=0, initial=1, minimum=1, maximum=1)
+    monkeypatch.setattr(client_module, "llm_limiter", limiter)
+    monkeypatch.setattr(client_module, "llm_breaker", CircuitBreaker(enabled=False))
+    monkeypatch.setattr(client_module.llm_latency, "hedge_delay", lambda: HEDGE_DELAY)
+    return limiter
+
+
+def _send(http):
+    return LLMClient(model="m")._post_hedged(http, {}, {}, client_module.llm_breaker.allow())
+
+
+def test_a_slow_request_is_hedged_and_the_faster_answer_wins(limiter):
+    limiter.maximum = limiter.limit = 2
+    http = FakeHTTP(1.0, 0.0)
+
+    response = asyncio.run(_send(http))
+
+    assert http.posts == 2
+    assert response.json() == {"post": 2}
+
+
+def test_time_queued_behind_the_limiter_does_not_trigger_a_hedge(limiter):
+    async def scenario():
+        http = FakeHTTP(0.02)
+        async with limiter.slot():  # another request holds the only slot
+            request = asyncio.create_task(_send(http))
+            await asyncio.sleep(HEDGE_DELAY * 3)
+        await request
+        return http.posts
+
+    assert asyncio.run(scenario()) == 1
+
+
+def test_no_hedge_while_requests_are_waiting_for_the_limiter(limiter):
+    async def scenario():
+        http = FakeHTTP(HEDGE_DELAY * 4)
+        request = asyncio.create_task(_send(http))
+        await asyncio.sleep(0.01)  # request is now in flight, holding the slot
+
+        async def queued():
+            async with limiter.slot():
+                pass
+
+        waiting = asyncio.create_task(queued())
+        await request
+        await waiting
+        return http.posts
+
+    assert asyncio.run(scenario()) == 1
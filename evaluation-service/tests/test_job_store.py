@@ -0,0 +1,93 @@
+from app.schemas.evaluation_schemas import BatchEvaluationItem, BatchItemResult
+from app.services.job_queue import JobStore
+
+
+def _items(count):
+    return [
+        BatchEvaluationItem(item_id=f"i{n}", question="Q?", student_answer=f"answer {n}", rubric={"concept": 1.0})
+        for n in range(count)
+    ]
+
+
+def _ok(item_id):
+    return BatchItemResult(item_id=item_id, status="ok")
+
+
+def _error(item_id):
+    return BatchItemResult(item_id=item_id, status="error", error="boom")
+
+
+def test_claim_takes_pending_items_in_order_and_only_once(tmp_path):
+    store = JobStore(path=str(tmp_path / "jobs.sqlite3"))
+    job_id = store.create(_items(3), webhook_url=None)
+
+    first = store.claim(2)
+    second = store.claim(2)
+
+    assert [(j, position, item.item_id) for j, position, item in first] == [(job_id, 0, "i0"), (job_id, 1, "i1")]
+    assert [(position, item.item_id) for _, position, item in second] == [(2, "i2")]
+    assert store.claim(2) == []
+    assert store.get(job_id).status == "running"
+    store.close()
+
+
+def test_complete_finishes_the_job_once_every_item_is_graded(tmp_path):
+    store = JobStore(path=str(tmp_path / "jobs.sqlite3"))
+    job_id = store.create(_items(3), webhook_url=None)
+    claimed = store.claim(3)
+
+    # Out of order: results are stored by position, not arrival
+    assert store.complete([(job_id, 2, _error("i2")), (job_id, 0, _ok("i0"))]) == []
+    assert store.complete([(job_id, 1, _ok("i1"))]) == [job_id]
+
+    job = store.get(job_id)
+    assert len(claimed) == 3
+    assert (job.status, job.total, job.completed, job.succeeded, job.failed) == ("completed", 3, 3, 2, 1)
+    assert [r.item_id for r in job.results] == ["i0", "i1", "i2"]
+    assert job.finished_at is not None
+    assert store.get(job_id, include_results=False).results is None
+    store.close()
+
+
+def test_recover_requeues_items_left_running(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    store = JobStore(path=path)
+    job_id = store.create(_items(2), webhook_url=None)
+    store.claim(2)
+    store.close()
+
+    # A new process reopening the store picks the interrupted items up again
+    reopened = JobStore(path=path)
+    assert reopened.pending_count() == 0
+    assert reopened.recover() == 2
+    assert [position for _, position, _ in reopened.claim(5)] == [0, 1]
+    assert reopened.get(job_id).completed == 0
+    reopened.close()
+
+
+def test_recover_purges_finished_jobs_past_the_ttl(tmp_path):
+    store = JobStore(path=str(tmp_path / "jobs.sqlite3"), ttl_seconds=-1)
+    job_id = store.create(_items(1), webhook_url=None)
+    store.claim(1)
+    store.complete([(job_id, 0, _ok("i0"))])
+
+    store.recover()
+
+    assert store.get(job_id) is None
+    store.close()
+
+
+def test_webhook_status_follows_the_job(tmp_path):
+    store = JobStore(path=str(tmp_path / "jobs.sqlite3"))
+    job_id = store.create(_items(1), webhook_url="https://example.com/hook")
+    assert store.get(job_id).webhook_status == "pending"
+    assert store.undelivered_webhooks() == []
+
+    store.claim(1)
+    store.complete([(job_id, 0, _ok("i0"))])
+    assert store.undelivered_webhooks() == [job_id]
+
+    store.set_webhook_status(job_id, "delivered")
+    assert store.undelivered_webhooks() == []
+    assert store.get(job_id).webhook_status == "delivered"
+    store.close()
@@ -0,0 +1,104 @@
+import pytest
+
+from app.engines.llm import cache
+from app.engines.llm.cache import LLMResponseCache
+
+
+@pytest.fixture
+def make_cache(tmp_path, clock, monkeypatch):
+    monkeypatch.setattr(cache, "time", clock)
+    created = []
+
+    def make(**overrides):
+        settings = {"ttl_seconds": 3600, "max_entries": 100, "enabled": True, "touch_interval": 60}
+        settings.update(overrides)
+        instance = LLMResponseCache(path=str(tmp_path / f"cache{len(created)}.sqlite3"), **settings)
+        created.append(instance)
+        return instance
+
+    yield make
+    for instance in created:
+        instance.close()
+
+
+def _last_access(instance, key):
+    with instance._db.lock:
+        return instance._db.connection().execute(
+            "SELECT last_access FROM llm_cache WHERE key = ?", (key,)
+        ).fetchone()[0]
+
+
+def test_key_covers_model_prompt_and_parameters():
+    key = LLMResponseCache.make_key("m", "prompt", {"temperature": 0, "max_tokens": 500})
+
+    assert key == LLMResponseCache.make_key("m", "prompt", {"max_tokens": 500, "temperature": 0})
+    assert key != LLMResponseCache.make_key("m2", "prompt", {"temperature": 0, "max_tokens": 500})
+    assert key != LLMResponseCache.make_key("m", "prompt", {"temperature": 0, "max_tokens": 800})
+
+
+def test_round_trip_and_miss(make_cache):
+    instance = make_cache()
+    instance.set("k", "m", '{"concept": 1}')
+
+    assert instance.get("k") == '{"concept": 1}'
+    assert instance.get("other") is None
+
+
+def test_disabled_cache_stores_nothing(make_cache):
+    instance = make_cache(enabled=False)
+    instance.set("k", "m", "content")
+
+    assert instance.get("k") is None
+
+
+def test_entries_expire_after_the_ttl(make_cache, clock):
+    instance = make_cache(ttl_seconds=100)
+    instance.set("k", "m", "content")
+
+    clock.advance(100)
+    assert instance.get("k") == "content"
+    clock.advance(1)
+    assert instance.get("k") is None
+
+
+def test_hits_only_touch_last_access_once_per_interval(make_cache, clock):
+    instance = make_cache(touch_interval=60)
+    instance.set("k", "m", "content")
+    written = clock.now
+
+    clock.advance(30)
+    instance.get("k")
+    assert _last_access(instance, "k") == written
+
+    clock.advance(31)
+    instance.get("k")
+    assert _last_access(instance, "k") == clock.now
+
+
+def test_eviction_drops_the_least_recently_used_beyond_max_entries(make_cache, clock, monkeypatch):
+    monkeypatch.setattr(cache, "EVICT_EVERY_WRITES", 1)
+    instance = make_cache(max_entries=2, touch_interval=0)
+    instance.set("old", "m", "1")
+    clock.advance(1)
+    instance.set("recent", "m", "2")
+    clock.advance(1)
+    instance.get("old")  # now the most recently used
+    clock.advance(1)
+
+    instance.set("new", "m", "3")
+
+    assert instance.get("recent") is None
+    assert instance.get("old") == "1" and instance.get("new") == "3"
+
+
+def test_eviction_purges_expired_entries(make_cache, clock, monkeypatch):
+    monkeypatch.setattr(cache, "EVICT_EVERY_WRITES", 1)
+    instance = make_cache(ttl_seconds=10)
+    instance.set("stale", "m", "1")
+    clock.advance(11)
+
+    instance.set("fresh", "m", "2")
+
+    with instance._db.lock:
+        keys = [row[0] for row in instance._db.connection().execute("SELECT key FROM llm_cache")]
+    assert keys == ["fresh"]
@@ -0,0 +1,111 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.engines.micro_batcher import MicroBatcher
+
+
+class BlockingBatch:
+    """
+    batch_fn that echoes its items, but holds every forward pass until the
+    test sets `release`, so a batch can be caught mid-inference.
+    """
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.started = threading.Event()
+        self.batches = []
+
+    def __call__(self, items):
+        self.batches.append(list(items))
+        self.started.set()
+        self.release.wait(timeout=5)
+        return [item * 10 for item in items]
+
+
+def test_items_are_batched_and_resolved_in_order():
+    async def scenario():
+        batcher = MicroBatcher("test", lambda items: [item * 10 for item in items], max_batch_size=4, max_wait_ms=20)
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(6)))
+        await batcher.close()
+        return results
+
+    assert asyncio.run(scenario()) == [0, 10, 20, 30, 40, 50]
+
+
+def test_close_fails_running_and_queued_requests():
+    fn = BlockingBatch()
+
+    async def scenario():
+        batcher = MicroBatcher("test", fn, max_batch_size=2, max_wait_ms=0)
+        callers = [asyncio.create_task(batcher.submit(i)) for i in range(5)]
+        await asyncio.to_thread(fn.started.wait, 5)
+        queued = batcher.queue_depth()
+
+        await asyncio.wait_for(batcher.close(), timeout=2)
+        outcomes = await asyncio.wait_for(asyncio.gather(*callers, return_exceptions=True), timeout=2)
+        fn.release.set()
+        return queued, outcomes
+
+    queued, outcomes = asyncio.run(scenario())
+
+    assert queued == 3
+    assert len(outcomes) == 5
+    assert all(isinstance(outcome, RuntimeError) for outcome in outcomes)
+
+
+def test_close_fails_a_batch_still_collecting():
+    async def scenario():
+        batcher = MicroBatcher("test", lambda items: items, max_batch_size=8, max_wait_ms=10_000)
+        caller = asyncio.create_task(batcher.submit(1))
+        await asyncio.sleep(0.01)
+        assert batcher.queue_depth() == 0  # taken by the worker, waiting for more
+
+        await batcher.close()
+        return await asyncio.wait_for(asyncio.gather(caller, return_exceptions=True), timeout=2)
+
+    (outcome,) = asyncio.run(scenario())
+
+    assert isinstance(outcome, RuntimeError)
+
+
+def test_close_fails_callers_blocked_on_a_full_queue():
+    fn = BlockingBatch()
+
+    async def scenario():
+        batcher = MicroBatcher("test", fn, max_batch_size=1, max_wait_ms=0, max_queue_size=1)
+        callers = [asyncio.create_task(batcher.submit(i)) for i in range(4)]
+        await asyncio.to_thread(fn.started.wait, 5)
+        await asyncio.sleep(0.01)  # one running, one queued, two blocked in put()
+
+        await batcher.close()
+        outcomes = await asyncio.wait_for(asyncio.gather(*callers, return_exceptions=True), timeout=2)
+        fn.release.set()
+        return outcomes
+
+    outcomes = asyncio.run(scenario())
+
+    assert all(isinstance(outcome, RuntimeError) for outcome in outcomes)
+
+
+def test_batcher_restarts_after_close():
+    async def scenario():
+        batcher = MicroBatcher("test", lambda items: [item + 1 for item in items], max_wait_ms=0)
+        await batcher.close()
+        first = await batcher.submit(1)
+        await batcher.close()
+        return first, await batcher.submit(2)
+
+    assert asyncio.run(scenario()) == (2, 3)
+
+
+@pytest.mark.parametrize("results", [[], [1, 2, 3]])
+def test_wrong_result_count_fails_the_batch(results):
+    async def scenario():
+        batcher = MicroBatcher("test", lambda items: results, max_batch_size=2, max_wait_ms=20)
+        outcomes = await asyncio.gather(batcher.submit(1), batcher.submit(2), return_exceptions=True)
+        await batcher.close()
+        return outcomes
+
+    assert all(isinstance(outcome, RuntimeError) for outcome in asyncio.run(scenario()))
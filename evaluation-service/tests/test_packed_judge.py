@@ -0,0 +1,89 @@
+import asyncio
+
+from app.engines.llm.judge import LLMJudge
+
+PACKED = "BALANCED_TEACHER_PACKED_PROMPT"
+SIGNALS = {"similarity": 0.6, "nli": 0.5, "depth": {"depth_score": 0.5}}
+
+
+class FakeClient:
+    """
+    LLMClient stand-in: the packed call returns (or raises) `packed`,
+    single-answer calls return a fixed judgment.
+    """
+
+    def __init__(self, packed):
+        self.packed = packed
+        self.calls = []
+
+    async def send_prompt(self, prompt, use_cache=True, max_tokens=500, template="unknown", retries=None):
+        self.calls.append(template)
+        if template == PACKED:
+            if isinstance(self.packed, Exception):
+                raise self.packed
+            return self.packed
+        return {"concept": 0.1, "completeness": 0.1, "clarity": 0.1, "feedback": "single"}
+
+
+def _element(answer_id, concept=0.9, **overrides):
+    element = {"answer_id": answer_id, "concept": concept, "completeness": 0.5, "clarity": 0.5, "feedback": answer_id}
+    element.update(overrides)
+    return element
+
+
+def _grade(packed, count=3):
+    judge = LLMJudge()
+    judge.client = FakeClient(packed)
+    answers = [
+        {"student_answer": f"student answer number {n} here", "similarity_band": "Partial", "signals": SIGNALS}
+        for n in range(count)
+    ]
+    results = asyncio.run(judge.evaluate_balanced_packed("Q?", "Reference.", 5, answers))
+    return results, judge.client.calls
+
+
+def test_a_complete_array_grades_every_answer_in_one_call_in_input_order():
+    results, calls = _grade([_element("A3", 0.3), _element("A1", 0.1), _element("A2", 0.2)])
+
+    assert calls == [PACKED]
+    assert [r["concept"] for r in results] == [0.1, 0.2, 0.3]
+    assert [r["feedback"] for r in results] == ["A1", "A2", "A3"]
+
+
+def test_missing_or_malformed_elements_fall_back_to_single_calls():
+    results, calls = _grade([_element("A1"), _element("A2", concept="high"), _element("A9")])
+
+    assert calls == [PACKED, "BALANCED_TEACHER_PROMPT", "BALANCED_TEACHER_PROMPT"]
+    assert [r["feedback"] for r in results] == ["A1", "single", "single"]
+
+
+def test_a_duplicated_answer_id_keeps_the_first_element():
+    results, calls = _grade([_element("A1", 0.7), _element("A1", 0.2), _element("A2"), _element("A3")])
+
+    assert calls == [PACKED]
+    assert results[0]["concept"] == 0.7
+
+
+def test_a_response_that_is_not_an_array_re_grades_everything_singly():
+    results, calls = _grade({"concept": 1.0})
+
+    assert calls.count("BALANCED_TEACHER_PROMPT") == 3
+    assert all(r["feedback"] == "single" for r in results)
+
+
+def test_a_failed_packed_request_fails_every_slot_without_single_calls():
+    failure = RuntimeError("provider down")
+
+    results, calls = _grade(failure)
+
+    assert calls == [PACKED]
+    assert results == [failure, failure, failure]
+
+
+def test_validate_packed_element_rejects_non_finite_and_boolean_scores():
+    assert LLMJudge._validate_packed_element(_element("A1"))[0] == "A1"
+    assert LLMJudge._validate_packed_element(_element(" A1 "))[0] == "A1"
+    assert LLMJudge._validate_packed_element(_element("A1", concept=float("nan"))) is None
+    assert LLMJudge._validate_packed_element(_element("A1", concept=True)) is None
+    assert LLMJudge._validate_packed_element(_element("A1", feedback=None)) is None
+    assert LLMJudge._validate_packed_element(["A1"]) is None
@@ -0,0 +1,159 @@
+import sqlite3
+import threading
+
+import numpy as np
+import pytest
+
+from app.schemas.evaluation_schemas import EvaluationRequest, QuestionRegistration
+from app.services.question_bank import (
+    QuestionBank,
+    QuestionConflictError,
+    ReferenceArtifacts,
+    UnknownQuestionError,
+)
+
+RUBRIC = {"concept": 0.6, "completeness": 0.2, "clarity": 0.2}
+
+
+def _question(question_id, reference, **overrides):
+    fields = {
+        "question_id":      question_id,
+        "question":         f"Question {question_id}?",
+        "reference_answer": reference,
+        "total_marks":      5,
+        "rubric":           RUBRIC,
+    }
+    fields.update(overrides)
+    return QuestionRegistration(**fields)
+
+
+def _artifacts(reference):
+    return ReferenceArtifacts(
+        reference=reference,
+        similarity_version="sim-v1",
+        embedding=np.ones(4, dtype=np.float32),
+        tokens=frozenset(reference.lower().split()),
+        nli_version="nli-v1",
+        premise_ids=[1, 2, 3],
+    )
+
+
+def _stored_references(path):
+    with sqlite3.connect(path) as conn:
+        return {row[0] for row in conn.execute("SELECT reference FROM reference_artifacts")}
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "questions.sqlite3")
+
+
+@pytest.fixture
+def bank(path):
+    bank = QuestionBank(path=path)
+    yield bank
+    bank.close()
+
+
+# ── resolve ──────────────────────────────────────────────────────────────────
+def test_resolve_fills_missing_fields_from_the_registered_question(bank):
+    bank.save_questions("e1", [_question("q1", "Reference one.")])
+
+    request = bank.resolve(EvaluationRequest(question_id="q1", student_answer="An answer."))
+
+    assert (request.question, request.reference_answer, request.total_marks) == ("Question q1?", "Reference one.", 5)
+    assert request.rubric.concept == 0.6 and request.exam_id == "e1"
+
+
+def test_resolve_keeps_the_fields_the_request_sends(bank):
+    bank.save_questions("e1", [_question("q1", "Reference one.")])
+
+    request = bank.resolve(EvaluationRequest(
+        question_id="q1", student_answer="An answer.", question="Own question?", total_marks=10,
+    ))
+
+    assert (request.question, request.total_marks) == ("Own question?", 10)
+    assert request.reference_answer == "Reference one."
+
+
+def test_resolve_rejects_an_unknown_question_id(bank):
+    with pytest.raises(UnknownQuestionError, match="'missing' is not registered"):
+        bank.resolve(EvaluationRequest(question_id="missing", student_answer="An answer."))
+
+
+def test_resolve_rejects_a_request_without_question_or_id(bank):
+    with pytest.raises(UnknownQuestionError, match="no question"):
+        bank.resolve(EvaluationRequest(student_answer="An answer.", rubric=RUBRIC))
+
+
+# ── Re-registration and orphaned references ──────────────────────────────────
+def test_reregistering_deletes_questions_left_out_of_the_exam(bank, path):
+    bank.save_questions("e1", [_question("q1", "Reference one."), _question("q2", "Reference two.")])
+
+    bank.save_questions("e1", [_question("q1", "Reference one.")])
+
+    assert bank.get("q2") is None
+    assert [stored.registration.question_id for stored in bank.exam("e1")] == ["q1"]
+    reloaded = QuestionBank(path=path)
+    reloaded.load()
+    assert reloaded.get("q2") is None and reloaded.get("q1") is not None
+    reloaded.close()
+
+
+def test_references_no_question_uses_any_more_are_orphaned(bank, path):
+    bank.save_questions("e1", [
+        _question("q1", "Changed reference."),
+        _question("q2", "Dropped reference."),
+        _question("q3", "Shared reference."),
+    ])
+    bank.save_questions("e2", [_question("q4", "Shared reference.")])
+    bank.save_artifacts([_artifacts(r) for r in ("Changed reference.", "Dropped reference.", "Shared reference.")])
+
+    # q1 gets a new answer, q2 and q3 are dropped; q4 still uses the shared one
+    orphaned = bank.save_questions("e1", [_question("q1", "New reference.")])
+
+    assert sorted(orphaned) == ["Changed reference.", "Dropped reference."]
+    assert _stored_references(path) == {"Shared reference."}
+    assert sorted(bank.references()) == ["New reference.", "Shared reference."]
+
+
+def test_reregistering_an_unchanged_exam_orphans_nothing(bank, path):
+    questions = [_question("q1", "Reference one."), _question("q2", "Reference one.")]
+    bank.save_questions("e1", questions)
+    bank.save_artifacts([_artifacts("Reference one.")])
+
+    assert bank.save_questions("e1", questions) == []
+    assert _stored_references(path) == {"Reference one."}
+
+
+# ── Question ids owned by another exam ───────────────────────────────────────
+def test_a_question_id_of_another_exam_conflicts_and_saves_nothing(bank):
+    bank.save_questions("e1", [_question("q1", "Reference one.")])
+
+    with pytest.raises(QuestionConflictError, match="q1"):
+        bank.save_questions("e2", [_question("q2", "Reference two."), _question("q1", "Reference one.")])
+
+    assert bank.get("q2") is None
+    assert bank.get("q1").exam_id == "e1"
+
+
+def test_concurrent_exams_cannot_both_claim_a_question_id(bank):
+    start = threading.Barrier(8)
+    winners, conflicts = [], []
+
+    def register(exam_id):
+        start.wait()
+        try:
+            bank.save_questions(exam_id, [_question("shared", f"Reference of {exam_id}.")])
+            winners.append(exam_id)
+        except QuestionConflictError:
+            conflicts.append(exam_id)
+
+    threads = [threading.Thread(target=register, args=(f"e{n}",)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(winners) == 1 and len(conflicts) == 7
+    assert bank.get("shared").exam_id == winners[0]
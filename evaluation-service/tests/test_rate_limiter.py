@@ -0,0 +1,119 @@
+import time
+import asyncio
+from contextlib import AsyncExitStack
+from email.utils import formatdate
+
+import pytest
+
+from app.engines.llm import rate_limiter
+from app.engines.llm.rate_limiter import AdaptiveRateLimiter, backoff_delay, parse_retry_after
+
+
+def _limiter(**overrides):
+    # rate=0 turns the token bucket off, leaving only the AIMD window
+    settings = {"rate": 0, "initial": 4, "minimum": 1, "maximum": 8, "decrease": 0.5}
+    settings.update(overrides)
+    return AdaptiveRateLimiter(**settings)
+
+
+def test_concurrency_is_capped_at_the_window():
+    async def scenario():
+        limiter = _limiter(initial=2)
+        async with AsyncExitStack() as stack:
+            await stack.enter_async_context(limiter.slot())
+            second = await stack.enter_async_context(limiter.slot())
+
+            async def third():
+                async with limiter.slot():
+                    return limiter.in_flight
+
+            waiting = asyncio.create_task(third())
+            await asyncio.sleep(0.01)
+            blocked = not waiting.done()
+            second.succeeded()
+            await stack.aclose()
+            return blocked, await waiting
+
+    blocked, in_flight_when_admitted = asyncio.run(scenario())
+
+    assert blocked
+    assert in_flight_when_admitted == 1
+
+
+def test_each_success_grows_the_window_by_one_over_the_limit():
+    async def scenario():
+        limiter = _limiter(initial=4)
+        async with limiter.slot() as slot:
+            slot.succeeded()
+        return limiter.limit
+
+    assert asyncio.run(scenario()) == pytest.approx(4.25)
+
+
+def test_the_window_never_exceeds_the_maximum():
+    async def scenario():
+        limiter = _limiter(initial=8, maximum=8)
+        async with limiter.slot() as slot:
+            slot.succeeded()
+        return limiter.limit
+
+    assert asyncio.run(scenario()) == 8
+
+
+def test_throttles_from_one_round_decrease_the_window_once():
+    async def scenario():
+        limiter = _limiter(initial=8)
+        async with AsyncExitStack() as stack:
+            slots = [await stack.enter_async_context(limiter.slot()) for _ in range(3)]
+            for slot in slots:
+                slot.throttled("429")
+        after_burst = limiter.limit
+
+        # A request sent under the new limit may decrease it again
+        async with limiter.slot() as slot:
+            slot.throttled("429")
+        return after_burst, limiter.limit
+
+    assert asyncio.run(scenario()) == (4, 2)
+
+
+def test_the_window_never_drops_below_the_minimum():
+    async def scenario():
+        limiter = _limiter(initial=2, minimum=2)
+        async with limiter.slot() as slot:
+            slot.throttled("503")
+        return limiter.limit
+
+    assert asyncio.run(scenario()) == 2
+
+
+def test_retry_after_pauses_every_new_request(clock, monkeypatch):
+    monkeypatch.setattr(rate_limiter, "time", clock)
+
+    async def scenario():
+        limiter = _limiter()
+        async with limiter.slot() as slot:
+            slot.throttled("429", retry_after=5)
+        return limiter
+
+    limiter = asyncio.run(scenario())
+
+    assert limiter._paused_until == clock.now + 5
+
+
+def test_backoff_honours_retry_after_and_caps_the_exponential(monkeypatch):
+    monkeypatch.setattr(rate_limiter.random, "uniform", lambda low, high: high)
+
+    assert backoff_delay(0) == rate_limiter.BACKOFF_BASE
+    assert backoff_delay(3) == rate_limiter.BACKOFF_BASE * 8
+    assert backoff_delay(50) == rate_limiter.BACKOFF_MAX
+    assert backoff_delay(0, retry_after=2) == 2 + rate_limiter.BACKOFF_BASE
+    assert backoff_delay(0, retry_after=10_000) == rate_limiter.BACKOFF_MAX + rate_limiter.BACKOFF_BASE
+
+
+def test_parse_retry_after_accepts_seconds_and_http_dates():
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after("-1") == 0.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+    assert 55 <= parse_retry_after(formatdate(time.time() + 60, usegmt=True)) <= 60
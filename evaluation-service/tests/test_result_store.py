@@ -0,0 +1,149 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.schemas.evaluation_schemas import EvaluationRequest, EvaluationResponse
+from app.services.result_store import IdempotencyConflictError, ResultStore
+
+VERSION = "v1"
+
+
+def _request(**overrides):
+    fields = {
+        "question":       "What is photosynthesis?",
+        "student_answer": "Plants turn light into chemical energy.",
+        "rubric":         {"concept": 0.6, "completeness": 0.2, "clarity": 0.2},
+        "total_marks":    5,
+    }
+    fields.update(overrides)
+    return EvaluationRequest(**fields)
+
+
+def _response(score=4.0, decision_path="llm"):
+    return EvaluationResponse(
+        final_score=score,
+        percentage=score * 20,
+        grade="A",
+        feedback="Good.",
+        rubric_breakdown={"conceptual_understanding": 0.8, "completeness_length": 0.8, "language_clarity": 0.8},
+        metrics={"llm": 0.8, "nli": 0.7, "similarity": 0.9},
+        confidence=1.0,
+        decision_path=decision_path,
+    )
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ResultStore(path=str(tmp_path / "results.sqlite3"), enabled=True)
+    yield store
+    asyncio.run(store.close())
+
+
+def test_same_idempotency_key_and_submission_returns_the_stored_result(store):
+    request = _request(idempotency_key="k1")
+    asyncio.run(store.save(request, _response(score=4.0), VERSION))
+
+    found = asyncio.run(store.lookup(_request(idempotency_key="k1"), VERSION))
+
+    assert found is not None and found.final_score == 4.0
+
+
+def test_reusing_an_idempotency_key_for_another_submission_conflicts(store):
+    asyncio.run(store.save(_request(idempotency_key="k1"), _response(), VERSION))
+
+    with pytest.raises(IdempotencyConflictError):
+        asyncio.run(store.lookup(_request(idempotency_key="k1", student_answer="Something else."), VERSION))
+
+
+def test_lookup_many_reports_a_conflict_in_its_slot(store):
+    asyncio.run(store.save(_request(idempotency_key="k1"), _response(), VERSION))
+    batch = [
+        _request(idempotency_key="k1"),
+        _request(idempotency_key="k1", student_answer="Something else."),
+        _request(idempotency_key="k2"),
+        _request(),
+    ]
+
+    found = asyncio.run(store.lookup_many(batch, VERSION))
+
+    assert isinstance(found[0], EvaluationResponse)
+    assert isinstance(found[1], IdempotencyConflictError)
+    assert found[2] is None and found[3] is None
+
+
+def test_natural_key_matches_only_the_same_answer_and_pipeline_version(store):
+    ids = {"student_id": "s1", "question_id": "q1"}
+    asyncio.run(store.save(_request(**ids), _response(), VERSION))
+
+    assert asyncio.run(store.lookup(_request(**ids), VERSION)) is not None
+    assert asyncio.run(store.lookup(_request(**ids, student_answer="A new answer."), VERSION)) is None
+    assert asyncio.run(store.lookup(_request(**ids), "v2")) is None
+
+
+def test_fresh_grades_and_transient_failures_bypass_the_store(store):
+    asyncio.run(store.save(_request(idempotency_key="k1"), _response(), VERSION))
+    asyncio.run(store.save(_request(idempotency_key="k2"), _response(decision_path="llm_error"), VERSION))
+    asyncio.run(store.save(_request(), _response(), VERSION))  # no key: nothing to find it by
+
+    assert asyncio.run(store.lookup(_request(idempotency_key="k1", bypass_llm_cache=True), VERSION)) is None
+    assert asyncio.run(store.lookup(_request(idempotency_key="k2"), VERSION)) is None
+    assert len(asyncio.run(store.query(pipeline_version=VERSION))) == 1
+
+
+def test_write_behind_rows_are_visible_before_and_after_the_flush(tmp_path):
+    async def scenario():
+        store = ResultStore(path=str(tmp_path / "results.sqlite3"), enabled=True)
+        await store.start()
+        await store.save(_request(student_id="s1", question_id="q1", exam_id="e1"), _response(), VERSION)
+        before = await store.lookup(_request(student_id="s1", question_id="q1"), VERSION)
+        queued = len(await store.query(exam_id="e1"))
+        await store.flush()
+        after = await store.query(exam_id="e1")
+        await store.close()
+        return before, queued, after
+
+    before, queued, after = asyncio.run(scenario())
+
+    assert before is not None
+    assert queued == 0  # the query API reads the disk; the route flushes first
+    assert [(r.student_id, r.question_id) for r in after] == [("s1", "q1")]
+
+
+def test_save_without_a_flusher_writes_off_the_event_loop(store, monkeypatch):
+    writers = []
+    write = store._write
+    monkeypatch.setattr(store, "_write", lambda rows: (writers.append(threading.current_thread()), write(rows)))
+
+    asyncio.run(store.save(_request(idempotency_key="k1"), _response(), VERSION))
+
+    assert writers and writers[0] is not threading.main_thread()
+    assert len(asyncio.run(store.query())) == 1
+
+
+def test_a_natural_key_collision_keeps_the_other_rows_idempotency_key(store):
+    ids = {"student_id": "s1", "question_id": "q1"}
+    asyncio.run(store.save(_request(**ids, idempotency_key="k1"), _response(score=3.0), VERSION))
+    # Same submission re-graded under a second key: both keys must keep answering
+    asyncio.run(store.save(_request(**ids, idempotency_key="k2", bypass_llm_cache=True), _response(score=4.0), VERSION))
+
+    rows = asyncio.run(store.query())
+
+    assert sorted(row.idempotency_key for row in rows) == ["k1", "k2"]
+    assert all(row.result.final_score == 4.0 for row in rows)
+    assert asyncio.run(store.lookup(_request(idempotency_key="k2"), VERSION)).final_score == 4.0
+    with pytest.raises(IdempotencyConflictError):
+        asyncio.run(store.lookup(_request(idempotency_key="k1", student_answer="Something else."), VERSION))
+
+
+def test_a_regrade_under_the_same_key_supersedes_the_stored_result(store):
+    ids = {"student_id": "s1", "question_id": "q1", "idempotency_key": "k1"}
+    asyncio.run(store.save(_request(**ids), _response(score=3.0), VERSION))
+    asyncio.run(store.save(_request(**ids, student_answer="A new answer."), _response(score=4.0), VERSION))
+
+    rows = asyncio.run(store.query())
+
+    assert [(row.idempotency_key, row.result.final_score) for row in rows] == [("k1", 4.0)]
+    # The old answer's natural key no longer points at the new grade
+    assert asyncio.run(store.lookup(_request(student_id="s1", question_id="q1"), VERSION)) is None
+    assert asyncio.run(store.lookup(_request(student_id="s1", question_id="q1", student_answer="A new answer."), VERSION)) is not None
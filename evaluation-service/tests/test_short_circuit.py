@@ -0,0 +1,86 @@
+import asyncio
+
+import pytest
+
+from app.schemas.evaluation_schemas import EvaluationRequest
+from app.services import evaluation_service as evaluation_module
+from app.services.evaluation_service import EvaluationService
+
+
+def _grade(service, student_answer):
+    request = EvaluationRequest(
+        question="What is the capital of Pakistan?",
+        reference_answer="Islamabad is the capital of Pakistan.",
+        student_answer=student_answer,
+        rubric={"concept": 0.6, "completeness": 0.2, "clarity": 0.2},
+        total_marks=5,
+    )
+    return asyncio.run(service.evaluate_student_answer(request))
+
+
+def test_kill_switch_threshold_is_pinned():
+    assert EvaluationService.NLI_KILL_SWITCH == 0.1
+
+
+@pytest.mark.parametrize("nli", [0.0, 0.0999])
+def test_nli_below_the_kill_switch_scores_zero_without_the_llm(service, signals, nli):
+    signals["Karachi is the capital"] = (0.9, "Full", nli)
+
+    response = _grade(service, "Karachi is the capital")
+
+    assert service.llm_judge.client.calls == 0
+    assert response.decision_path == "nli_kill_switch"
+    assert (response.final_score, response.percentage) == (0.0, 0.0)
+    assert response.feedback == EvaluationService.SHORT_CIRCUIT_FEEDBACK["nli_kill_switch"]
+    assert (response.metrics.llm, response.metrics.nli, response.metrics.similarity) == (0.0, nli, 0.9)
+
+
+def test_nli_at_the_kill_switch_still_reaches_the_llm(service, signals):
+    signals["Islamabad is the capital"] = (0.9, "Full", 0.1)
+
+    response = _grade(service, "Islamabad is the capital")
+
+    assert service.llm_judge.client.calls == 1
+    assert response.decision_path == "llm"
+
+
+@pytest.mark.parametrize("answer", ["Lahore", "Lahore city", "It is Lahore"])
+def test_noise_band_with_up_to_three_words_scores_zero_without_the_llm(service, signals, answer):
+    signals[answer] = (0.1, "Noise", 0.5)
+
+    response = _grade(service, answer)
+
+    assert service.llm_judge.client.calls == 0
+    assert response.decision_path == "noise_short_answer"
+    assert response.final_score == 0.0
+    assert response.feedback == EvaluationService.SHORT_CIRCUIT_FEEDBACK["noise_short_answer"]
+
+
+def test_noise_band_with_four_words_still_reaches_the_llm(service, signals):
+    signals["I think it's Lahore"] = (0.1, "Noise", 0.5)
+
+    response = _grade(service, "I think it's Lahore")
+
+    assert service.llm_judge.client.calls == 1
+    assert response.decision_path == "llm"
+
+
+def test_a_short_answer_outside_the_noise_band_still_reaches_the_llm(service, signals):
+    signals["Islamabad"] = (0.31, "Partial", 0.5)
+
+    response = _grade(service, "Islamabad")
+
+    assert service.llm_judge.client.calls == 1
+    assert response.decision_path == "llm"
+
+
+def test_short_circuits_can_be_switched_off(service, signals, monkeypatch):
+    monkeypatch.setattr(evaluation_module, "SHORT_CIRCUIT_ENABLED", False)
+    signals["Karachi"] = (0.1, "Noise", 0.0)
+
+    response = _grade(service, "Karachi")
+
+    # The LLM is asked, but the kill-switch still zeroes the concept score
+    assert service.llm_judge.client.calls == 1
+    assert response.decision_path == "llm"
+    assert response.final_score == 0.0
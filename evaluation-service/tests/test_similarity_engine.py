@@ -0,0 +1,105 @@
+import numpy as np
+import pytest
+
+from app.engines.similarity_engine import FULL_THRESHOLD, NOISE_THRESHOLD, SimilarityEngine
+
+REFERENCE = "Photosynthesis turns light into chemical energy."
+
+
+def _at_cosine(cosine, size=8):
+    # Unit vector at the given cosine to the first axis (REFERENCE's embedding)
+    vector = np.zeros(size, dtype=np.float32)
+    vector[0], vector[1] = cosine, np.sqrt(max(0.0, 1 - cosine ** 2))
+    return vector
+
+
+def _engine(embeddings, storage_dtype="float32"):
+    """
+    SimilarityEngine whose encoder looks texts up in `embeddings` (and
+    counts its calls) instead of running MiniLM.
+    """
+    engine = SimilarityEngine(storage_dtype=storage_dtype)
+    engine.encoded = []
+
+    def encode(texts):
+        engine.encoded.append(list(texts))
+        return np.stack([embeddings[text] for text in texts]).astype(np.float32)
+
+    engine._encode = encode
+    return engine
+
+
+def _scalar_band(engine, student, reference):
+    # Rule 4 as evaluate_with_band() scored one pair before vectorisation
+    score = round(float((engine._cosine_similarity(student, reference) + 1) / 2), 3)
+    band = engine.classify(score)
+    return (0.0 if band == "Noise" else score), band
+
+
+def test_thresholds_are_pinned():
+    assert (NOISE_THRESHOLD, FULL_THRESHOLD) == (0.3, 0.7)
+
+
+@pytest.mark.parametrize("cosine, expected", [
+    (0.4,   (0.7, "Full")),       # exactly FULL_THRESHOLD
+    (0.398, (0.699, "Partial")),
+    (-0.4,  (0.3, "Partial")),    # exactly NOISE_THRESHOLD
+    (-0.402, (0.0, "Noise")),     # 0.299, floored to zero
+    (1.0,   (1.0, "Full")),
+    (-1.0,  (0.0, "Noise")),
+])
+def test_band_edges(cosine, expected):
+    engine = _engine({REFERENCE: _at_cosine(1.0), "answer": _at_cosine(cosine)})
+
+    assert engine.evaluate_pairs([("answer", REFERENCE)]) == [expected]
+
+
+def test_batch_matches_the_scalar_scoring_pair_by_pair():
+    rng = np.random.default_rng(7)
+    references = [f"reference {n}" for n in range(5)]
+    students = [f"answer {n}" for n in range(60)]
+    embeddings = {text: rng.normal(size=384).astype(np.float32) for text in references + students}
+    # Answers near (or opposite) the references, so every band is represented
+    for n, student in enumerate(students[:40]):
+        sign = 1 if n < 30 else -1
+        noise = rng.normal(scale=0.3 * (n % 8), size=384)
+        embeddings[student] = (sign * embeddings[references[n % 5]] + noise).astype(np.float32)
+    engine = _engine(embeddings)
+    pairs = [(student, references[n % 5]) for n, student in enumerate(students)]
+
+    batched = engine.evaluate_pairs(pairs)
+
+    expected = [_scalar_band(engine, embeddings[s], embeddings[r]) for s, r in pairs]
+    assert batched == expected
+    assert {band for _, band in batched} == {"Noise", "Partial", "Full"}
+
+
+def test_a_zero_vector_scores_like_cosine_zero():
+    engine = _engine({REFERENCE: _at_cosine(1.0), "blank": np.zeros(8, dtype=np.float32)})
+
+    assert engine.evaluate_pairs([("blank", REFERENCE)]) == [(0.5, "Partial")]
+    assert _scalar_band(engine, np.zeros(8, dtype=np.float32), _at_cosine(1.0)) == (0.5, "Partial")
+
+
+def test_one_encode_per_batch_and_cached_references_are_not_re_encoded():
+    embeddings = {REFERENCE: _at_cosine(1.0), "a": _at_cosine(0.9), "b": _at_cosine(0.1)}
+    engine = _engine(embeddings)
+
+    first = engine.evaluate_pairs([("a", REFERENCE), ("b", REFERENCE), ("a", REFERENCE)])
+    second = engine.evaluate_pairs([("b", REFERENCE)])
+
+    assert engine.encoded == [["a", "b", REFERENCE], ["b"]]
+    assert first[0] == first[2] and second == [first[1]]
+
+
+@pytest.mark.parametrize("storage_dtype", ["float16", "int8"])
+def test_reduced_precision_storage_keeps_the_bands(storage_dtype):
+    cosines = [0.95, 0.6, 0.42, 0.0, -0.38, -0.8]
+    embeddings = {REFERENCE: _at_cosine(1.0), **{f"a{c}": _at_cosine(c) for c in cosines}}
+    pairs = [(f"a{c}", REFERENCE) for c in cosines]
+
+    exact = _engine(embeddings).evaluate_pairs(pairs)
+    stored = _engine(embeddings, storage_dtype).evaluate_pairs(pairs)
+
+    assert [band for _, band in stored] == [band for _, band in exact]
+    assert all(abs(a - b) <= 0.01 for (a, _), (b, _) in zip(stored, exact))